@@ -1,4 +1,6 @@
-from typing import List, Dict, Any
+import asyncio
+from collections import OrderedDict
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.tools import BaseTool
 from langchain.agents import AgentExecutor, create_react_agent
@@ -18,6 +20,29 @@ from app.core.config import settings
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 
+# (domain, concept, 학습 수준) -> 마지막 내부 검색 결과가 충분했는지
+_internal_outcomes: "OrderedDict[Tuple[str, str, Optional[str]], bool]" = OrderedDict()
+
+
+def _is_sufficient(results: List[LearningMaterialSearchResult]) -> bool:
+    if len(results) < settings.learning_agent_fanout_min_results:
+        return False
+    return max(mat.score for mat in results) >= settings.learning_agent_fanout_min_score
+
+
+def _remember_outcome(key: Tuple[str, str, Optional[str]], sufficient: bool) -> None:
+    _internal_outcomes[key] = sufficient
+    _internal_outcomes.move_to_end(key)
+    while len(_internal_outcomes) > settings.learning_agent_fanout_outcome_cache_size:
+        _internal_outcomes.popitem(last=False)
+
+
+def _cancel_speculative(task: asyncio.Task) -> None:
+    """추측 실행한 외부 검색을 취소하고, 이미 실패했다면 그 예외를 회수합니다."""
+    task.cancel()
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+
 class LearningAgent:
     def __init__(self, learning_service: LearningService):
         self.learning_service = learning_service
@@ -62,7 +87,9 @@ class LearningAgent:
             agent=agent, tools=self.tools, verbose=True, handle_parsing_errors=True
         )
 
-    async def run(self, preprocessed_data: ExplanationRequest) -> Dict[str, Any]:
+    async def _gather_learning_materials(
+        self, preprocessed_data: ExplanationRequest
+    ) -> List[LearningMaterialSearchResult]:
         agent_input = {
             "input": f"Find learning materials for the concept: {preprocessed_data.problem_info.concept}. "
             f"User's learning experience: {preprocessed_data.user_info.learning_experience}. "
@@ -82,51 +109,76 @@ class LearningAgent:
             problem_info=preprocessed_data.problem_info,
         )
 
-        initial_search_results: List[LearningMaterialSearchResult] = await self.tools[
-            0
-        ].arun(
-            {
-                "user_info": learning_search_tool_input.user_info.dict(),
-                "low_understanding_attempts_summary": [
-                    s.dict()
-                    for s in learning_search_tool_input.low_understanding_attempts_summary
-                ],
-                "best_attempt_text": learning_search_tool_input.best_attempt_text,
-                "problem_info": learning_search_tool_input.problem_info.dict(),
-            }
+        search_args = {
+            "user_info": learning_search_tool_input.user_info.dict(),
+            "low_understanding_attempts_summary": [
+                s.dict()
+                for s in learning_search_tool_input.low_understanding_attempts_summary
+            ],
+            "best_attempt_text": learning_search_tool_input.best_attempt_text,
+            "problem_info": learning_search_tool_input.problem_info.dict(),
+        }
+        google_tool_input = GoogleSearchToolInput(
+            concept=preprocessed_data.problem_info.concept,
+            domain=preprocessed_data.problem_info.domain,
         )
-        final_learning_materials = initial_search_results
-
-        if not initial_search_results:
-            google_tool_input = GoogleSearchToolInput(
-                concept=preprocessed_data.problem_info.concept,
-                domain=preprocessed_data.problem_info.domain,
-            )
-            google_search_results: List[
-                LearningMaterialSearchResult
-            ] = await self.tools[1].arun(
-                {
-                    "concept": google_tool_input.concept,
-                    "domain": google_tool_input.domain,
-                }
-            )
-
-            final_search_results: List[LearningMaterialSearchResult] = await self.tools[
+        google_args = {
+            "concept": google_tool_input.concept,
+            "domain": google_tool_input.domain,
+        }
+        outcome_key = (
+            preprocessed_data.problem_info.domain,
+            preprocessed_data.problem_info.concept,
+            preprocessed_data.user_info.learning_experience,
+        )
+
+        # 최근 내부 검색 결과가 부족했던 개념만 외부 검색을 미리 함께 시작
+        # (처음 보는 개념은 내부 결과를 먼저 확인해 Google API 할당량을 아낌)
+        external_task = None
+        if settings.learning_agent_fanout_enabled and _internal_outcomes.get(outcome_key) is False:
+            external_task = asyncio.create_task(self.tools[1].arun(google_args))
+        try:
+            initial_search_results: List[LearningMaterialSearchResult] = await self.tools[
                 0
-            ].arun(
-                {
-                    "user_info": learning_search_tool_input.user_info.dict(),
-                    "low_understanding_attempts_summary": [
-                        s.dict()
-                        for s in learning_search_tool_input.low_understanding_attempts_summary
-                    ],
-                    "best_attempt_text": learning_search_tool_input.best_attempt_text,
-                    "problem_info": learning_search_tool_input.problem_info.dict(),
-                }
-            )
-            final_learning_materials = final_search_results
-
-        explanation_tool_input = ExplanationGeneratorToolInput(
+            ].arun(search_args)
+        except BaseException:
+            if external_task:
+                _cancel_speculative(external_task)
+            raise
+
+        sufficient = _is_sufficient(initial_search_results)
+        _remember_outcome(outcome_key, sufficient)
+        if sufficient:
+            if external_task:
+                _cancel_speculative(external_task)
+                print("[LearningAgent] Internal results sufficient, cancelled speculative external search")
+            return initial_search_results
+
+        if external_task is None:
+            external_task = asyncio.create_task(self.tools[1].arun(google_args))
+        try:
+            google_search_results: List[LearningMaterialSearchResult] = await external_task
+        except Exception as e:
+            # 외부 검색 실패(할당량, 네트워크, 크롤링)로 내부 검색 결과까지 버리지 않음
+            print(f"[LearningAgent] External search failed, using internal results only: {e}")
+            return initial_search_results
+        print(
+            f"[LearningAgent] Internal results weak ({len(initial_search_results)}), "
+            f"using {len(google_search_results)} freshly crawled chunks"
+        )
+
+        # 새로 수집한 청크는 색인 반영을 기다려 다시 검색하지 않고 메모리에서 바로 사용
+        seen = {mat.content_text for mat in initial_search_results}
+        return initial_search_results + [
+            mat for mat in google_search_results if mat.content_text not in seen
+        ]
+
+    def _explanation_tool_input(
+        self,
+        preprocessed_data: ExplanationRequest,
+        final_learning_materials: List[LearningMaterialSearchResult],
+    ) -> ExplanationGeneratorToolInput:
+        return ExplanationGeneratorToolInput(
             learning_materials=[mat.dict() for mat in final_learning_materials],
             user_info=preprocessed_data.user_info,
             problem_info=preprocessed_data.problem_info,
@@ -135,6 +187,12 @@ class LearningAgent:
             ],
             best_attempt_text=preprocessed_data.best_attempt_text,
         )
+
+    async def run(self, preprocessed_data: ExplanationRequest) -> Dict[str, Any]:
+        final_learning_materials = await self._gather_learning_materials(preprocessed_data)
+        explanation_tool_input = self._explanation_tool_input(
+            preprocessed_data, final_learning_materials
+        )
         generated_explanation: str = await self.tools[2].arun(
             {
                 "learning_materials": explanation_tool_input.learning_materials,
@@ -146,3 +204,12 @@ class LearningAgent:
         )
 
         return {"explanation": generated_explanation}
+
+    async def astream(self, preprocessed_data: ExplanationRequest) -> AsyncIterator[str]:
+        """run과 같은 자료 검색 후 설명을 토큰 단위로 내보냅니다."""
+        final_learning_materials = await self._gather_learning_materials(preprocessed_data)
+        explanation_tool_input = self._explanation_tool_input(
+            preprocessed_data, final_learning_materials
+        )
+        async for text in self.tools[2].astream_explanation(explanation_tool_input):
+            yield text
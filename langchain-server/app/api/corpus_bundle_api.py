@@ -0,0 +1,58 @@
+"""
+교재 코퍼스 번들 내보내기 / 가져오기 API
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.services.corpus_bundle_service import (
+    CorpusBundleError,
+    export_bundle,
+    import_bundle,
+    resolve_corpus_key,
+)
+
+router = APIRouter()
+
+
+class CorpusBundleImportResponse(BaseModel):
+    corpus_key: str
+    chunk_count: int
+    embedding_model: str
+    embedding_dimension: int
+    loaded: bool
+    book_ids: List[str] = []
+
+
+@router.get("/corpus-bundles/{book_id}")
+def handle_export_corpus_bundle(book_id: str):
+    """bookId가 참조하는 코퍼스를 zip 번들로 내려줍니다."""
+    try:
+        corpus_key = resolve_corpus_key(book_id)
+        data = export_bundle(corpus_key)
+    except CorpusBundleError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(
+        content=data,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{corpus_key[:16]}.corpus.zip"'},
+    )
+
+
+@router.post("/corpus-bundles", response_model=CorpusBundleImportResponse)
+async def handle_import_corpus_bundle(
+    request: Request,
+    bookId: Optional[List[str]] = Query(default=None),
+    force: bool = False,
+):
+    """요청 본문(zip 번들)을 임베딩 호출 없이 적재합니다."""
+    data = await request.body()
+    try:
+        # 동기 ES 클라이언트와 코퍼스 적재 대기(claim)가 이벤트 루프를 막지 않도록 스레드에서 실행
+        result = await run_in_threadpool(import_bundle, data, book_ids=bookId, force=force)
+    except CorpusBundleError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return CorpusBundleImportResponse(**result)
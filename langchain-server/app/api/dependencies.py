@@ -1,4 +1,5 @@
 from app.core.elasticsearch_client import ElasticsearchClient
+from app.repository.factory import create_learning_material_repository
 from app.repository.learning_material_repository import LearningMaterialRepository
 from app.services.embedding_service import EmbeddingService
 from elasticsearch import AsyncElasticsearch
@@ -14,4 +15,4 @@ async def get_learning_material_repository(
 ) -> LearningMaterialRepository:
     embedding_service = EmbeddingService()
     await embedding_service.ainitialize()
-    return LearningMaterialRepository(es_client, embedding_service)
+    return create_learning_material_repository(es_client, embedding_service)
@@ -2,9 +2,11 @@ from app.repository.learning_material_repository import LearningMaterialReposito
 from app.schemas.request.learning import ExplanationRequest
 from app.schemas.response.learning import ExplanationApiResponse
 from app.services.learning_service import LearningService
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from app.api.dependencies import get_learning_material_repository
 from app.agents.learning_agent import LearningAgent
+from app.services.explanation_cache import explanation_cache
+from app.utils.streaming import stream_events
 import traceback
 
 router = APIRouter()
@@ -16,9 +18,8 @@ def get_learning_service(
     return LearningService(repo)
 
 
-async def get_learning_agent(
-    learning_service: LearningService = Depends(get_learning_service),
-) -> LearningAgent:
+async def create_learning_agent(learning_service: LearningService) -> LearningAgent:
+    """캐시 미스일 때만 호출 (LLM/도구 초기화는 캐시 적중 시 필요 없음)"""
     agent = LearningAgent(learning_service)
     await agent.ainitialize()
     return agent
@@ -32,12 +33,23 @@ async def get_learning_agent(
 async def get_explanation(
     request: ExplanationRequest,
     learning_service: LearningService = Depends(get_learning_service),
-    learning_agent: LearningAgent = Depends(get_learning_agent),
 ):
     try:
         print("🟢 요청 받음:", request.dict())
+        explanation_cache.record_feedback(request)
+        cached, key_embedding = await explanation_cache.lookup(
+            request, learning_service.embedding_service
+        )
+        if cached is not None:
+            return {
+                "message": "Explanation generation process completed",
+                "result": {"explanation": cached},
+            }
+
         preprocessed_data = await learning_service.preprocess_learning_request(request)
+        learning_agent = await create_learning_agent(learning_service)
         agent_result = await learning_agent.run(preprocessed_data)
+        explanation_cache.store(request, key_embedding, agent_result["explanation"])
 
         return {
             "message": "Explanation generation process completed",
@@ -50,3 +62,47 @@ async def get_explanation(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred during explanation generation: {e}",
         )
+
+
+@router.post("/explanation/stream")
+async def stream_explanation(
+    request: ExplanationRequest,
+    http_request: Request,
+    learning_service: LearningService = Depends(get_learning_service),
+):
+    """
+    /explanation의 스트리밍 버전 (Accept: text/event-stream이면 SSE, 아니면 NDJSON)
+
+    이벤트: start → delta(설명 조각, 여러 번) → done(result.explanation에 전체 설명)
+    """
+
+    async def events():
+        yield {"type": "start"}
+        print("🟢 스트리밍 요청 받음:", request.dict())
+        explanation_cache.record_feedback(request)
+        cached, key_embedding = await explanation_cache.lookup(
+            request, learning_service.embedding_service
+        )
+        if cached is not None:
+            yield {"type": "delta", "text": cached}
+            yield {
+                "type": "done",
+                "message": "Explanation generation process completed",
+                "result": {"explanation": cached},
+            }
+            return
+
+        preprocessed_data = await learning_service.preprocess_learning_request(request)
+        learning_agent = await create_learning_agent(learning_service)
+        parts = []
+        async for text in learning_agent.astream(preprocessed_data):
+            parts.append(text)
+            yield {"type": "delta", "text": text}
+        explanation_cache.store(request, key_embedding, "".join(parts))
+        yield {
+            "type": "done",
+            "message": "Explanation generation process completed",
+            "result": {"explanation": "".join(parts)},
+        }
+
+    return stream_events(http_request, events())
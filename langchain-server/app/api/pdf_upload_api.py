@@ -9,6 +9,8 @@ from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from app.services.pdf_service import get_pdf_service
 from app.services.question_generator_service import question_generator_service
+from app.core.corpus_registry import content_hash, corpus_registry
+from elasticsearch import NotFoundError
 from app.schemas.response.chat import AiMessageResponse
 from app.schemas.enum import ChatState
 
@@ -27,6 +29,7 @@ class PdfUploadResponse(BaseModel):
     bookId: int
     userId: int
     chunks_created: Optional[int] = 0
+    deduplicated: Optional[bool] = False
 
 @router.post("/pdf-upload", response_model=PdfUploadResponse)
 def handle_pdf_upload(request: PdfUploadRequest):
@@ -38,6 +41,27 @@ def handle_pdf_upload(request: PdfUploadRequest):
         
         # Base64를 PDF 파일로 변환
         pdf_bytes = base64.b64decode(request.pdf_base64)
+        corpus_hash = content_hash(pdf_bytes)
+        corpus_registry.ensure_index()
+
+        # 같은 PDF가 이미 적재되어 있으면 참조만 추가 (추출/임베딩 생략)
+        corpus = corpus_registry.get(corpus_hash)
+        if corpus_registry.is_reusable(corpus, request.max_pages):
+            try:
+                corpus_registry.attach(request.bookId, corpus_hash)
+                question_generator_service.register_book(request.bookId, corpus_hash)
+                print(f"♻️ 동일 PDF 재사용: {corpus_hash[:12]} (BookId: {request.bookId})")
+                return PdfUploadResponse(
+                    success=True,
+                    message="이미 처리된 PDF입니다. 기존 임베딩을 재사용합니다.",
+                    bookId=request.bookId,
+                    userId=request.userId,
+                    chunks_created=corpus.get("chunk_count", 0),
+                    deduplicated=True
+                )
+            except NotFoundError:
+                # 확인 직후 GC로 삭제된 경우: 새로 적재
+                pass
         
         # 임시 파일로 저장
         with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
@@ -50,7 +74,8 @@ def handle_pdf_upload(request: PdfUploadRequest):
                 temp_pdf_path, 
                 request.bookId, 
                 request.userId,
-                request.max_pages
+                request.max_pages,
+                corpus_hash
             )
             
             return PdfUploadResponse(
@@ -70,10 +95,24 @@ def handle_pdf_upload(request: PdfUploadRequest):
         print(f"❌ PDF 업로드 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=f"PDF 업로드 중 오류가 발생했습니다: {str(e)}")
 
-def process_pdf_and_create_embeddings(pdf_path: str, book_id: int, user_id: int, max_pages: int = 20) -> int:
+def process_pdf_and_create_embeddings(
+    pdf_path: str, book_id: int, user_id: int, max_pages: int = 20, corpus_hash: Optional[str] = None
+) -> int:
     """
     PDF를 처리하고 벡터 스토어에 임베딩을 생성합니다.
+    같은 내용(corpus_hash)의 PDF는 한 번만 적재되고, bookId는 코퍼스를 참조합니다.
     """
+    if corpus_hash is None:
+        with open(pdf_path, "rb") as f:
+            corpus_hash = content_hash(f.read())
+    corpus_registry.ensure_index()
+
+    if not corpus_registry.claim(corpus_hash, max_pages):
+        # 다른 요청이 같은 PDF 적재를 끝냄
+        corpus_registry.attach(book_id, corpus_hash)
+        question_generator_service.register_book(book_id, corpus_hash)
+        return corpus_registry.get(corpus_hash).get("chunk_count", 0)
+
     try:
         # PDF에서 텍스트 추출 및 청킹
         pdf_service = get_pdf_service()
@@ -84,17 +123,20 @@ def process_pdf_and_create_embeddings(pdf_path: str, book_id: int, user_id: int,
         
         print(f"✅ PDF 청킹 완료: {len(chunks)}개 청크 생성")
         
-        # 벡터 스토어 설정
-        index_name = f"java_learning_docs_book_{book_id}"
-        success = question_generator_service.setup_vector_store(chunks, index_name)
+        # 공용 청크 인덱스에 코퍼스 해시로 저장 (교재별 인덱스를 만들지 않음)
+        success = question_generator_service.setup_corpus_vector_store(chunks, corpus_hash)
         
         if not success:
             raise Exception("벡터 스토어 설정에 실패했습니다.")
         
-        print(f"✅ 벡터 스토어 설정 완료: {index_name}")
+        corpus_registry.mark_ready(corpus_hash, len(chunks))
+        corpus_registry.attach(book_id, corpus_hash)
+        question_generator_service.register_book(book_id, corpus_hash)
+        print(f"✅ 벡터 스토어 설정 완료: book_id={book_id}, corpus={corpus_hash[:12]}")
         
         return len(chunks)
         
     except Exception as e:
         print(f"❌ PDF 처리 오류: {str(e)}")
+        corpus_registry.release(corpus_hash)
         raise e
\ No newline at end of file
@@ -1,7 +1,44 @@
 from fastapi import APIRouter
 
+from app.core.llm_gateway import llm_gateway
+from app.generators.structured_question import structured_output_stats
+from app.repository.materialized_top_k import materialized_top_k
+from app.services.explanation_cache import explanation_cache
+from app.services.external_indexer import external_indexer
+from app.services.search_result_cache import search_result_cache
+from app.utils.context_assembler import context_assembly_stats
+
 router = APIRouter()
 
 @router.get("/ping")
 def ping():
-     return {"status": "ok"}
\ No newline at end of file
+     return {"status": "ok"}
+
+
+@router.get("/ping/search-cache")
+def search_cache_stats():
+    """검색 결과 캐시(엔드포인트별 적중률), 사전 계산 top-k, 설명 의미 캐시, 외부 자료 색인 대기열 상태"""
+    return {
+        "search_result_cache": search_result_cache.stats(),
+        "materialized_top_k": materialized_top_k.stats(),
+        "explanation_cache": explanation_cache.stats(),
+        "external_indexer": external_indexer.stats(),
+    }
+
+
+@router.get("/ping/question-generation")
+def question_generation_stats():
+    """구조화 출력 문제 생성의 파싱 실패율 / 수정 요청 / 최종 실패 집계"""
+    return structured_output_stats.as_dict()
+
+
+@router.get("/ping/context-assembly")
+def context_assembly():
+    """프롬프트 종류별 컨텍스트 조립 전/후 토큰 수와 절감량"""
+    return {name: stats.as_dict() for name, stats in context_assembly_stats.items()}
+
+
+@router.get("/ping/llm-cache")
+def llm_cache_stats():
+    """LLM 게이트웨이 응답 캐시 적중률과 디스크 사용량"""
+    return llm_gateway.cache.stats()
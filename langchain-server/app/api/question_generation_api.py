@@ -7,8 +7,17 @@ from app.schemas.response.chat import AiMessageResponse, GeneratingQuestionRespo
 from app.schemas.enum import ChatState
 from app.services.question_generator_service import question_generator_service
 from app.services.pdf_service import pdf_service
-from fastapi import APIRouter, HTTPException
+from app.services.question_bank_service import (
+    question_bank_service,
+    validate_generated_question,
+)
+from app.services.question_session_cache import question_session_cache
+from app.core.config import settings
+from app.utils.streaming import stream_events
+from fastapi import APIRouter, HTTPException, Request
+import asyncio
 import os
+import re
 
 router = APIRouter()
 
@@ -16,6 +25,169 @@ router = APIRouter()
 current_question_answer = {}
 
 
+def _strip_answer_info(content):
+    """문제 텍스트에서 정답 정보와 마크다운 코드 블록을 제거합니다."""
+    final_content = re.sub(r'\[정답 정보:.*?\]', '', content, flags=re.DOTALL).strip()
+    final_content = re.sub(r'정답 정보:.*?$', '', final_content, flags=re.DOTALL).strip()
+    final_content = re.sub(r'\[정답.*?\]', '', final_content, flags=re.DOTALL).strip()
+    final_content = re.sub(r'정답.*?$', '', final_content, flags=re.DOTALL).strip()
+    return final_content.replace('```', '')
+
+
+def _question_content(question, options):
+    """사용자에게 보여 줄 문제 텍스트 (객관식이면 보기 포함, 정답 정보 제외)"""
+    if options and len(options) > 0:
+        content = f"{question}\n\n"
+        for i, option in enumerate(options, 1):
+            content += f"{i}. {option}\n"
+        return content
+    return f"{question}"
+
+
+def _question_from_bank_or_generate(user, chapter_num, query, vector_store, difficulty="보통"):
+    """
+    챕터 요청이면 문제 은행에서 사용자가 아직 받지 않은 문제를 바로 꺼내고,
+    없으면 생성한 뒤 검증을 통과한 문제를 은행에 저장합니다. 어느 경우든
+    남은 문제가 watermark 아래면 백그라운드 보충을 예약합니다.
+    """
+    result, bank_key = _question_from_bank(user, chapter_num, query, vector_store, difficulty)
+    if result is None:
+        result = _generate_for_session(user, query, vector_store, difficulty)
+        _after_generation(user, bank_key, query, result)
+    if bank_key:
+        question_bank_service.schedule_refill(bank_key, user.userId, vector_store, query)
+    return result
+
+
+def _question_from_bank(user, chapter_num, query, vector_store, difficulty="보통"):
+    """문제 은행에서 꺼낸 문제(없으면 None)와 생성 결과를 저장할 은행 키를 반환합니다."""
+    bank_key = None
+    if chapter_num and settings.question_bank_enabled:
+        bank_key = (question_generator_service.store_key(vector_store), chapter_num, difficulty)
+        try:
+            banked = question_bank_service.take(bank_key, user.userId)
+        except Exception as e:
+            print(f"⚠️ 문제 은행 조회 실패, 바로 생성: {e}")
+            banked, bank_key = None, None
+        if banked:
+            print(f"📦 문제 은행에서 제공: {banked['id'][:12]}")
+            return {
+                "success": True,
+                "question": banked["question"],
+                "correct_answer": banked["correct_answer"],
+                "explanation": banked["explanation"],
+                "options": banked["options"],
+            }, bank_key
+    return None, bank_key
+
+
+def _after_generation(user, bank_key, query, result):
+    """생성한 문제를 은행에 저장합니다. (챕터 요청인 경우)"""
+    if bank_key:
+        question = validate_generated_question(result)
+        try:
+            if question:
+                question_bank_service.add(bank_key, query, question, served_to=[user.userId])
+        except Exception as e:
+            print(f"⚠️ 문제 은행 저장 실패: {e}")
+
+
+def _generate_for_session(user, query, vector_store, difficulty="보통"):
+    """문제를 배치로 생성해 첫 문제를 돌려주고 나머지는 세션의 추가 문제용으로 보관합니다."""
+    batch = question_generator_service.generate_questions_batch(
+        query=query,
+        count=settings.question_batch_size,
+        difficulty=difficulty,
+        vector_store=vector_store,
+    )
+    return _keep_for_session(user, batch)
+
+
+def _keep_for_session(user, batch):
+    """배치 결과의 첫 문제를 돌려주고 나머지는 세션의 추가 문제용으로 보관합니다."""
+    if batch.get("success"):
+        questions = batch["questions"]
+        question_session_cache.put((user.userId, user.bookId), questions[1:])
+        print(f"📦 세션에 추가 문제 {len(questions) - 1}개 보관")
+        return questions[0]
+    # 스키마 검증과 한 번의 수정 요청까지 실패한 경우 (임시 선택지를 만들지 않음)
+    return {"success": False, "message": batch.get("message", "문제 생성에 실패했습니다.")}
+
+
+def _prepare_question_request(user):
+    """
+    사용자 입력을 챕터 내용과 검색 쿼리로 매핑하고 문제를 생성할 벡터 스토어를 준비합니다.
+
+    Returns:
+        (raw_input, chapter_num, mapped_content, query, vector_store)
+    """
+    # 사용자 입력을 챕터 내용으로 매핑 - 향상된 시스템 사용
+    from app.utils.chapter_mapper import (
+        map_chapter_to_content, 
+        enhance_query_for_search, 
+        extract_chapter_info,
+        get_enhanced_chapter_content
+    )
+    
+    raw_input = user.content if user.content else "Java 프로그래밍"
+    
+    # 챕터 번호 추출 시도
+    chapter_num, _ = extract_chapter_info(raw_input)
+    
+    if chapter_num:
+        # 정밀한 키워드 기반 매핑 사용
+        mapped_content = get_enhanced_chapter_content(chapter_num)
+        print(f"🔥 정밀 키워드 시스템 사용 - 챕터 {chapter_num}")
+    else:
+        # 기존 매핑 시스템 사용
+        mapped_content = map_chapter_to_content(raw_input)
+        print(f"🔄 기본 매핑 시스템 사용")
+    
+    query = enhance_query_for_search(mapped_content)
+    
+    print(f"📝 원본 입력: {raw_input}")
+    print(f"📝 매핑된 내용: {mapped_content}")
+    print(f"📝 최종 쿼리: {query}")
+    
+    # 업로드된 교재 청크가 있으면 해당 교재로 검색, 없으면 기본 교재 사용
+    # (레지스트리에 준비된 핸들이 있으면 추가 ES 호출 없음)
+    print(f"🔍 기존 벡터 스토어 확인 중...")
+    vector_store = question_generator_service.get_vector_store(user.bookId)
+    if vector_store is None:
+        print(f"📄 PDF 처리 필요 - 첫 번째 실행")
+        # PDF 처리 및 청킹 (한 번만)
+        pdf_path = "/app/javajungsuk4_sample.pdf"
+        if os.path.exists(pdf_path):
+            print(f"📄 PDF 파일 처리 중: {pdf_path}")
+            
+            # 성능 최적화: 페이지 수를 대폭 줄임
+            max_pages_to_process = 50  # 기본값을 줄임 (빠른 처리를 위해)
+            if chapter_num:
+                from app.utils.chapter_mapper import get_chapter_definitions
+                chapter_defs = get_chapter_definitions()
+                if chapter_num in chapter_defs:
+                    chapter_start_page = chapter_defs[chapter_num].get("start", 50)
+                    chapter_end_page = chapter_defs[chapter_num]["end"]
+                    # 해당 챕터만 처리 (시작-끝 페이지)
+                    max_pages_to_process = min(chapter_end_page - chapter_start_page + 20, 50)
+                    print(f"🎯 챕터 {chapter_num} 기준 PDF 처리: {max_pages_to_process}페이지까지")
+            
+            chunks = pdf_service().process_pdf_and_create_chunks(pdf_path, max_pages=max_pages_to_process)
+            print(f"📊 실제 처리한 페이지 수: {max_pages_to_process}")
+            print(f"✅ PDF 처리 완료: {len(chunks) if chunks else 0}개 청크")
+            
+            if chunks:
+                # 벡터 스토어 설정 (한 번만)
+                print(f"🔧 벡터 스토어 설정 중...")
+                vector_store = question_generator_service.setup_vector_store(chunks)
+                print(f"✅ 벡터 스토어 설정: {'성공' if vector_store else '실패'}")
+        else:
+            print(f"❌ PDF 파일을 찾을 수 없음: {pdf_path}")
+    else:
+        print(f"🚀 기존 벡터 스토어 사용 - PDF 처리 생략")
+    return raw_input, chapter_num, mapped_content, query, vector_store
+
+
 @router.post("/generating-question", response_model=GeneratingQuestionResponse)
 async def handle_generating_question(user: UserMessageRequest):
     """RAG와 로컬 임베딩을 모두 사용한 문제 생성 처리"""
@@ -31,81 +203,12 @@ async def handle_generating_question(user: UserMessageRequest):
         print(f"📊 ChatState: {user.chatState}")
         print("=" * 80)
         
-        # 사용자 입력을 챕터 내용으로 매핑 - 향상된 시스템 사용
-        from app.utils.chapter_mapper import (
-            map_chapter_to_content, 
-            enhance_query_for_search, 
-            extract_chapter_info,
-            get_enhanced_chapter_content
-        )
-        
-        raw_input = user.content if user.content else "Java 프로그래밍"
-        
-        # 챕터 번호 추출 시도
-        chapter_num, _ = extract_chapter_info(raw_input)
-        
-        if chapter_num:
-            # 정밀한 키워드 기반 매핑 사용
-            mapped_content = get_enhanced_chapter_content(chapter_num)
-            print(f"🔥 정밀 키워드 시스템 사용 - 챕터 {chapter_num}")
-        else:
-            # 기존 매핑 시스템 사용
-            mapped_content = map_chapter_to_content(raw_input)
-            print(f"🔄 기본 매핑 시스템 사용")
-        
-        query = enhance_query_for_search(mapped_content)
-        
-        print(f"📝 원본 입력: {raw_input}")
-        print(f"📝 매핑된 내용: {mapped_content}")
-        print(f"📝 최종 쿼리: {query}")
-        
-        # 기존 벡터 스토어가 있는지 확인 (성능 최적화)
-        print(f"🔍 기존 벡터 스토어 확인 중...")
-        if not question_generator_service.has_vector_store():
-            print(f"📄 PDF 처리 필요 - 첫 번째 실행")
-            # PDF 처리 및 청킹 (한 번만)
-            pdf_path = "/app/javajungsuk4_sample.pdf"
-            if os.path.exists(pdf_path):
-                print(f"📄 PDF 파일 처리 중: {pdf_path}")
-                
-                # 성능 최적화: 페이지 수를 대폭 줄임
-                max_pages_to_process = 50  # 기본값을 줄임 (빠른 처리를 위해)
-                if chapter_num:
-                    from app.utils.chapter_mapper import get_chapter_definitions
-                    chapter_defs = get_chapter_definitions()
-                    if chapter_num in chapter_defs:
-                        chapter_start_page = chapter_defs[chapter_num].get("start", 50)
-                        chapter_end_page = chapter_defs[chapter_num]["end"]
-                        # 해당 챕터만 처리 (시작-끝 페이지)
-                        max_pages_to_process = min(chapter_end_page - chapter_start_page + 20, 50)
-                        print(f"🎯 챕터 {chapter_num} 기준 PDF 처리: {max_pages_to_process}페이지까지")
-                
-                chunks = pdf_service().process_pdf_and_create_chunks(pdf_path, max_pages=max_pages_to_process)
-                print(f"📊 실제 처리한 페이지 수: {max_pages_to_process}")
-                print(f"✅ PDF 처리 완료: {len(chunks) if chunks else 0}개 청크")
-                
-                if chunks:
-                    # 벡터 스토어 설정 (한 번만)
-                    print(f"🔧 벡터 스토어 설정 중...")
-                    success = question_generator_service.setup_vector_store(chunks)
-                    print(f"✅ 벡터 스토어 설정: {'성공' if success else '실패'}")
-                else:
-                    success = False
-            else:
-                print(f"❌ PDF 파일을 찾을 수 없음: {pdf_path}")
-                success = False
-        else:
-            print(f"🚀 기존 벡터 스토어 사용 - PDF 처리 생략")
-            success = question_generator_service.connect_to_existing_vector_store()
-            
-        if success:
+        raw_input, chapter_num, mapped_content, query, vector_store = _prepare_question_request(user)
+
+        if vector_store is not None:
             # 문제 생성
             print(f"🎯 문제 생성 중...")
-            result = question_generator_service.generate_question_with_rag(
-                query=query,
-                difficulty="보통",
-                question_type="객관식"
-            )
+            result = _question_from_bank_or_generate(user, chapter_num, query, vector_store)
             print(f"✅ 문제 생성 완료: {result.get('success', False)}")
             
             if result.get("success", False):
@@ -117,15 +220,10 @@ async def handle_generating_question(user: UserMessageRequest):
                 options = result.get("options", [])
                 
                 # 문제 텍스트 생성 (정답 정보는 제외)
-                if options and len(options) > 0:
-                    # 객관식인 경우 선택지 포함
-                    content = f"{question}\n\n"
-                    for i, option in enumerate(options, 1):
-                        content += f"{i}. {option}\n"
+                content = _question_content(question, options)
+                if options:
                     print(f"✅ 선택지 포함된 문제 생성 완료")
                 else:
-                    # 주관식인 경우 문제만
-                    content = f"{question}"
                     print(f"⚠️ 선택지가 없어 주관식으로 생성됨")
                 
                 # 정답 정보를 세션에 저장
@@ -140,15 +238,8 @@ async def handle_generating_question(user: UserMessageRequest):
             content = "문서 설정에 실패했습니다."
             print(f"❌ 벡터 스토어 설정 실패")
         
-        # 최종 응답에서 정답 정보 제거
-        import re
-        final_content = re.sub(r'\[정답 정보:.*?\]', '', content, flags=re.DOTALL).strip()
-        final_content = re.sub(r'정답 정보:.*?$', '', final_content, flags=re.DOTALL).strip()
-        final_content = re.sub(r'\[정답.*?\]', '', final_content, flags=re.DOTALL).strip()
-        final_content = re.sub(r'정답.*?$', '', final_content, flags=re.DOTALL).strip()
-
-        # 마크다운 코드 블록 제거
-        final_content = final_content.replace('```', '')
+        # 최종 응답에서 정답 정보와 마크다운 코드 블록 제거
+        final_content = _strip_answer_info(content)
 
         print(f"🔍 최종 응답 content: {final_content}")
 
@@ -173,6 +264,77 @@ async def handle_generating_question(user: UserMessageRequest):
         raise HTTPException(status_code=500, detail=f"문제 생성 중 오류가 발생했습니다: {str(e)}")
 
 
+@router.post("/generating-question/stream")
+async def stream_generating_question(user: UserMessageRequest, request: Request):
+    """
+    /generating-question의 스트리밍 버전 (Accept: text/event-stream이면 SSE, 아니면 NDJSON)
+
+    이벤트: start → stem(문제 본문 조각) → options(보기) → question(검증된 최종 문제) → done
+    stem/options는 검증 전 미리보기이므로 화면은 question 이벤트로 확정합니다.
+    정답과 해설은 스트림에 보내지 않고 서버(current_question_answer)에만 저장합니다.
+    """
+
+    async def events():
+        global current_question_answer
+        current_question_answer = {}
+        yield {"type": "start"}
+
+        raw_input, chapter_num, mapped_content, query, vector_store = await asyncio.to_thread(
+            _prepare_question_request, user
+        )
+        if vector_store is None:
+            yield {"type": "error", "message": "문서 설정에 실패했습니다."}
+            return
+
+        # 문제 은행 조회/저장은 동기 ES 클라이언트를 쓰므로 다른 스트림을 막지 않도록 스레드에서 실행
+        result, bank_key = await asyncio.to_thread(
+            _question_from_bank, user, chapter_num, query, vector_store
+        )
+        if result is None:
+            batch = {"success": False, "questions": []}
+            async for event, value in question_generator_service.astream_questions_batch(
+                query=query,
+                count=settings.question_batch_size,
+                vector_store=vector_store,
+            ):
+                if event == "stem":
+                    yield {"type": "stem", "text": value}
+                elif event == "options":
+                    yield {"type": "options", "options": value}
+                else:
+                    batch = value
+            result = _keep_for_session(user, batch)
+            await asyncio.to_thread(_after_generation, user, bank_key, query, result)
+        if bank_key:
+            question_bank_service.schedule_refill(bank_key, user.userId, vector_store, query)
+
+        if not result.get("success", False):
+            yield {"type": "error", "message": result.get("message", "문제 생성에 실패했습니다.")}
+            return
+
+        current_question_answer = {
+            "answer": result.get("correct_answer", ""),
+            "explanation": result.get("explanation", ""),
+        }
+        response = GeneratingQuestionResponse(
+            userId=user.userId,
+            bookId=user.bookId,
+            content=_strip_answer_info(
+                _question_content(result["question"], result.get("options", []))
+            ),
+            messageType="TEXT",
+            sender="AI",
+            chatState=ChatState.GENERATING_QUESTION_WITH_RAG,
+            domain="Java Programming",
+            concept=(mapped_content if mapped_content else raw_input)[:200],
+            problemText=result["question"],
+        )
+        yield {"type": "question", **response.model_dump(mode="json", exclude={"correctAnswer"})}
+        yield {"type": "done"}
+
+    return stream_events(request, events())
+
+
 @router.post("/generating-additional-question", response_model=GeneratingQuestionResponse)
 async def handle_generating_additional_question(user: UserMessageRequest):
     """추가 문제 생성 처리"""
@@ -186,12 +348,14 @@ async def handle_generating_additional_question(user: UserMessageRequest):
         # 기존 문제와 유사한 추가 문제 생성
         query = user.content if user.content else "Java 프로그래밍"
         
-        # 추가 문제 생성 (객관식으로 통일)
-        result = question_generator_service.generate_question_with_rag(
-            query=query,
-            difficulty="보통",
-            question_type="객관식"  # 객관식으로 통일
-        )
+        # 같은 세션에서 미리 생성해 둔 문제가 있으면 바로 사용, 없으면 배치 생성 (객관식으로 통일)
+        result = question_session_cache.pop((user.userId, user.bookId))
+        if result is not None:
+            print(f"📦 세션에 보관된 추가 문제 사용")
+        else:
+            result = _generate_for_session(
+                user, query, question_generator_service.get_vector_store(user.bookId)
+            )
         
         # 결과가 딕셔너리인 경우 처리
         if isinstance(result, dict):
@@ -214,15 +378,8 @@ async def handle_generating_additional_question(user: UserMessageRequest):
             # 문자열인 경우 그대로 사용
             content = str(result)
         
-        # 최종 응답에서 정답 정보 제거
-        import re
-        final_content = re.sub(r'\[정답 정보:.*?\]', '', content, flags=re.DOTALL).strip()
-        final_content = re.sub(r'정답 정보:.*?$', '', final_content, flags=re.DOTALL).strip()
-        final_content = re.sub(r'\[정답.*?\]', '', final_content, flags=re.DOTALL).strip()
-        final_content = re.sub(r'정답.*?$', '', final_content, flags=re.DOTALL).strip()
-
-        # 마크다운 코드 블록 제거
-        final_content = final_content.replace('```', '')
+        # 최종 응답에서 정답 정보와 마크다운 코드 블록 제거
+        final_content = _strip_answer_info(content)
 
         print(f"🔍 최종 응답 content: {final_content}")
         
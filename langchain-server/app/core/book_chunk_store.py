@@ -0,0 +1,204 @@
+"""
+여러 교재의 청크를 하나의 인덱스에 저장하는 벡터 스토어
+
+교재마다 인덱스(java_learning_docs_book_{id})를 만들면 교재 수만큼 HNSW 그래프와
+샤드가 생겨 클러스터 메모리가 교재 수에 비례해 늘어납니다. 여기서는 모든 청크를
+하나의 인덱스에 book_id와 함께 저장하고, book_id를 routing 값으로 사용해
+한 교재의 청크가 한 샤드에 모이도록 합니다. 검색은 book_id로 pre-filter한 kNN입니다.
+
+업로드 PDF는 내용 해시 코퍼스(corpus_registry)로 저장되므로 이 경우 book_id 필드에는
+bookId 대신 코퍼스 해시가 들어갑니다. (여러 bookId가 같은 청크를 공유)
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from elasticsearch import NotFoundError
+from elasticsearch.helpers import bulk
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from app.core.config import settings
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.core.index_manager import IndexManager
+from app.utils.vector import dense_vector_index_options
+
+
+def book_chunk_index_body() -> Dict[str, Any]:
+    vector_mapping: Dict[str, Any] = {
+        "type": "dense_vector",
+        "dims": settings.book_chunk_embedding_dimension,
+        "index": True,
+        "similarity": "cosine",
+    }
+    index_options = dense_vector_index_options(settings.elasticsearch_vector_index_type)
+    if index_options:
+        vector_mapping["index_options"] = index_options
+    return {
+        "settings": {
+            **IndexManager.base_index_settings(),
+            "number_of_shards": settings.elasticsearch_book_chunks_shards,
+        },
+        "mappings": {
+            "_meta": {
+                "embedding_model": settings.book_chunk_embedding_model,
+                "embedding_dimension": settings.book_chunk_embedding_dimension,
+            },
+            "_routing": {"required": True},
+            "properties": {
+                "book_id": {"type": "keyword"},
+                "chunk_index": {"type": "integer"},
+                "text": {"type": "text"},
+                "vector": vector_mapping,
+                "metadata": {
+                    "properties": {
+                        "page_number": {"type": "integer"},
+                        "word_count": {"type": "integer"},
+                        "source": {"type": "keyword"},
+                    }
+                },
+            },
+        },
+    }
+
+
+def ensure_book_chunk_index() -> str:
+    index = settings.elasticsearch_index_book_chunks
+
+    def create():
+        es = ElasticsearchClient.get_sync_client()
+        if not es.indices.exists(index=index):
+            es.indices.create(index=index, body=book_chunk_index_body())
+            print(f"✅ 교재 청크 인덱스 생성: {index}")
+
+    IndexManager.ensure_index_sync(index, create)
+    return index
+
+
+class BookChunkStore(VectorStore):
+    """한 교재(book_id)에 묶인 공용 청크 인덱스 뷰"""
+
+    def __init__(self, embedding: Embeddings, book_id: Any, index_name: Optional[str] = None):
+        self.embedding = embedding
+        self.book_id = str(book_id)
+        self.index_name = index_name or settings.elasticsearch_index_book_chunks
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    @property
+    def client(self):
+        return ElasticsearchClient.get_sync_client()
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        # 미리 계산된 벡터(list 또는 NumPy 배열)가 있으면 임베딩 호출 생략
+        vectors = kwargs.get("vectors")
+        if vectors is None:
+            vectors = self.embedding.embed_documents(texts)
+        start = kwargs.get("start_index", 0)
+        ids = [f"{self.book_id}-{start + i}" for i in range(len(texts))]
+        actions = [
+            {
+                "_op_type": "index",
+                "_index": self.index_name,
+                "_id": doc_id,
+                "_routing": self.book_id,
+                "_source": {
+                    "book_id": self.book_id,
+                    "chunk_index": start + i,
+                    "text": text,
+                    "vector": vector,
+                    "metadata": metadata,
+                },
+            }
+            for i, (doc_id, text, vector, metadata) in enumerate(
+                zip(ids, texts, vectors, metadatas)
+            )
+        ]
+        bulk(ElasticsearchClient.for_bulk(self.client), actions, refresh="wait_for")
+        return ids
+
+    def delete_book(self) -> int:
+        try:
+            response = self.client.delete_by_query(
+                index=self.index_name,
+                routing=self.book_id,
+                body={"query": {"term": {"book_id": self.book_id}}},
+                conflicts="proceed",
+                refresh=True,
+            )
+        except NotFoundError as e:
+            if not IndexManager.forget_if_missing(self.index_name, e):
+                raise
+            # 인덱스가 밖에서 삭제됨: 이어지는 add_texts 전에 매핑과 함께 다시 생성
+            if self.index_name == settings.elasticsearch_index_book_chunks:
+                ensure_book_chunk_index()
+            return 0
+        return response.get("deleted", 0)
+
+    def count(self) -> int:
+        response = self.client.count(
+            index=self.index_name,
+            routing=self.book_id,
+            body={"query": {"term": {"book_id": self.book_id}}},
+        )
+        return response["count"]
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        try:
+            response = self._knn_search(embedding, k)
+        except NotFoundError as e:
+            IndexManager.forget_if_missing(self.index_name, e)
+            raise
+        return [
+            Document(
+                page_content=hit["_source"]["text"],
+                metadata={**hit["_source"].get("metadata", {}), "book_id": self.book_id},
+            )
+            for hit in response["hits"]["hits"]
+        ]
+
+    def _knn_search(self, embedding: List[float], k: int) -> Dict[str, Any]:
+        return self.client.search(
+            index=self.index_name,
+            routing=self.book_id,
+            knn={
+                "field": "vector",
+                "query_vector": embedding,
+                "k": k,
+                "num_candidates": max(50, k * 10),
+                "filter": {"term": {"book_id": self.book_id}},
+            },
+            source=["text", "metadata", "book_id"],
+            size=k,
+        )
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(
+            self.embedding.embed_query(query), k=k, **kwargs
+        )
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any,
+    ) -> "BookChunkStore":
+        book_id = kwargs.pop("book_id")
+        ensure_book_chunk_index()
+        store = cls(embedding=embedding, book_id=book_id)
+        # 같은 교재를 다시 올리면 이전 청크를 지우고 새로 색인
+        store.delete_book()
+        store.add_texts(texts, metadatas, **kwargs)
+        return store
@@ -21,8 +21,158 @@ class Settings(BaseSettings):
     google_cse_id: str
 
     embedding_model_name: str = "gemini-embedding-001"
+    # Matryoshka 방식으로 앞쪽 차원만 잘라 사용 (768 / 1536 / 3072)
+    embedding_dimension: int = 3072
+    embedding_normalize: bool = True
     elasticsearch_index_learning_materials: str = "learning_materials"
     elasticsearch_index_user_feedback: str = "user_concept_understanding_feedback"
 
+    # content_embedding 벡터 인덱스 옵션
+    # index_type: hnsw | int8_hnsw | bbq_hnsw (bbq_hnsw는 ES 8.18 이상)
+    elasticsearch_vector_similarity: str = "dot_product"
+    elasticsearch_vector_index_type: str = "int8_hnsw"
+    elasticsearch_vector_hnsw_m: int = 16
+    elasticsearch_vector_hnsw_ef_construction: int = 100
+    # 양자화 검색 결과를 원본 float 벡터로 재채점
+    elasticsearch_knn_rescore: bool = False
+    elasticsearch_knn_rescore_oversample: float = 2.0
+
+    # 모든 교재 청크를 담는 공용 인덱스 (book_id routing)
+    elasticsearch_index_book_chunks: str = "book_chunks"
+    elasticsearch_book_chunks_shards: int = 1
+    book_chunk_embedding_model: str = "models/embedding-001"
+    book_chunk_embedding_dimension: int = 768
+    # PDF 내용 해시 기반 코퍼스 (같은 PDF는 한 번만 임베딩)
+    elasticsearch_index_book_corpora: str = "book_corpora"
+    corpus_ingest_wait_seconds: float = 300.0
+    # 교재별 검색 핸들 캐시 (LRU)
+    vector_store_registry_max_books: int = 64
+    vector_store_missing_ttl_seconds: float = 60.0
+
+    # ES 클라이언트 (커넥션 풀 / 압축 / 재시도 / 타임아웃 / 스니핑)
+    elasticsearch_connections_per_node: int = 10
+    elasticsearch_http_compress: bool = True
+    elasticsearch_request_timeout: float = 10.0
+    elasticsearch_bulk_request_timeout: float = 60.0
+    elasticsearch_max_retries: int = 3
+    elasticsearch_retry_on_timeout: bool = True
+    elasticsearch_retry_on_status: str = "429,502,503,504"
+    # Docker 네트워크에서는 노드가 내부 주소를 광고하므로 기본값은 끔
+    elasticsearch_sniff_on_start: bool = False
+    elasticsearch_sniff_on_node_failure: bool = False
+    elasticsearch_min_delay_between_sniffing: float = 60.0
+
+    # orjson 직렬화 (NumPy 배열 직접 직렬화). orjson이 없으면 무시됨
+    elasticsearch_fast_serializer: bool = True
+
+    # 동시 검색을 _msearch 한 번으로 묶는 배처 (창 길이 ms, 최대 묶음 크기)
+    elasticsearch_msearch_batching: bool = True
+    elasticsearch_msearch_window_ms: float = 3.0
+    elasticsearch_msearch_max_batch: int = 32
+
+    # 인덱스 템플릿 / 대량 색인 설정
+    elasticsearch_number_of_shards: int = 1
+    elasticsearch_number_of_replicas: int = 0
+    elasticsearch_refresh_interval: str = "1s"
+    # HNSW 그래프(vex)와 양자화 벡터(veq)를 페이지 캐시에 미리 적재
+    elasticsearch_preload_extensions: str = "vex,veq"
+    elasticsearch_bulk_refresh_interval: str = "-1"
+    # 이 건수 이상을 한 번에 저장할 때만 refresh_interval을 전환
+    elasticsearch_bulk_ingestion_threshold: int = 200
+    elasticsearch_force_merge_after_bulk: bool = False
+    elasticsearch_force_merge_max_segments: int = 1
+
+    # 효과 카운터 write-behind 버퍼
+    effectiveness_flush_interval_seconds: float = 5.0
+    effectiveness_max_pending: int = 1000
+    effectiveness_retry_on_conflict: int = 3
+
+    # effectiveness_score(rank_feature) 계산 / 검색 반영
+    effectiveness_understanding_score_max: int = 5
+    effectiveness_prior_mean: float = 0.5
+    effectiveness_prior_weight: int = 5
+    effectiveness_rank_pivot: float = 1.0
+    # 0이면 kNN/BM25 점수에 효과 점수를 섞지 않음
+    effectiveness_rank_boost: float = 0.0
+
+    # (concept, difficulty_level)별 상위 k개 사전 계산 테이블
+    materialized_topk_enabled: bool = True
+    materialized_topk_size: int = 10
+    # 갱신 후 재계산까지 대기(효과 카운터 flush 이후에 다시 계산되도록)
+    materialized_topk_rebuild_delay_seconds: float = 10.0
+    materialized_topk_max_age_seconds: float = 600.0
+    # 테이블에 유지할 최대 (concept, difficulty) 키 수 (초과 시 가장 오래 조회되지 않은 키 제거)
+    materialized_topk_max_entries: int = 1000
+    # 문제 텍스트에서 concept 단어를 뺀 토큰이 이 수 이하이면 테이블에서 응답
+    materialized_topk_generic_max_tokens: int = 3
+
+    # 한 번의 LLM 호출로 생성할 문제 수 (남은 문제는 세션의 추가 문제 요청에 사용)
+    question_batch_size: int = 4
+    question_session_ttl_seconds: float = 1800.0
+    question_session_max_sessions: int = 1000
+
+    # 챕터·난이도별 사전 생성 문제 은행
+    elasticsearch_index_question_bank: str = "question_bank"
+    question_bank_enabled: bool = True
+    # 사용자가 아직 받지 않은 문제가 이 수 아래면 보충
+    question_bank_low_watermark: int = 3
+    question_bank_refill_batch: int = 5
+    # 동시에 Gemini 생성을 돌리는 백그라운드 작업자 수
+    question_bank_workers: int = 2
+
+    # 낮은 이해도 시도 요약: 한 번의 호출에 넣을 최대 시도 수 / 요약 캐시 크기
+    summary_batch_max_items: int = 20
+    summary_cache_max_entries: int = 2048
+    # 요약 응답에서 빠진 시도는 원문을 이 길이로 줄여 사용
+    summary_fallback_max_chars: int = 300
+
+    # 프롬프트 컨텍스트 조립: 프롬프트별 토큰 예산(추정치), MMR 관련도 가중치, 거의 같은 구절 기준
+    context_token_budget_question: int = 1500
+    context_token_budget_explanation: int = 2000
+    # 문제 생성 시 MMR 선택 전에 가져올 청크 수
+    context_retrieval_k: int = 8
+    context_mmr_lambda: float = 0.7
+    context_near_duplicate_threshold: float = 0.8
+
+    # 설명 생성 자료 수집: 최근 내부 검색이 부족했던 개념은 외부 검색(Google + 크롤링)을 동시에 시작하고
+    # 내부 결과가 충분하면(결과 수, 최고 점수) 취소. 기본값은 기존 동작과 같음(내부 결과가 없을 때만 외부 검색)
+    learning_agent_fanout_enabled: bool = True
+    learning_agent_fanout_min_results: int = 1
+    learning_agent_fanout_min_score: float = 0.0
+    learning_agent_fanout_outcome_cache_size: int = 1000
+
+    # 외부 자료 백그라운드 색인: 작업자 수 / 실패 시 재시도 횟수와 첫 대기 시간(이후 2배씩)
+    external_index_workers: int = 2
+    external_index_max_retries: int = 3
+    external_index_retry_base_seconds: float = 5.0
+
+    # 개념 설명 의미 캐시: (concept, 문제, 오답) 임베딩 유사도 + 학습 수준이 같으면 설명 재사용
+    explanation_cache_enabled: bool = True
+    explanation_cache_similarity_threshold: float = 0.95
+    explanation_cache_ttl_seconds: float = 86400.0
+    explanation_cache_max_entries: int = 2000
+    # 이해도 점수(1~5)가 이 학생 수 이상 모였는데 평균이 기준 미만이면 제거
+    explanation_cache_min_samples: int = 2
+    explanation_cache_min_average_score: float = 3.0
+
+    # LLM 게이트웨이 정확 일치 응답 캐시 (디스크, 크기 초과 시 오래 사용하지 않은 응답부터 삭제)
+    llm_cache_enabled: bool = True
+    llm_cache_dir: str = "./cache/llm"
+    llm_cache_max_bytes: int = 256 * 1024 * 1024
+
+    # 학습 자료 검색 결과 TTL 캐시
+    search_cache_enabled: bool = True
+    search_cache_ttl_seconds: float = 30.0
+    search_cache_max_entries: int = 1024
+
+    # 재색인 작업 체크포인트 저장 위치
+    reindex_checkpoint_dir: str = "./cache/reindex"
+
+    # 학습 자료 검색 백엔드: "elasticsearch" 또는 "local"(NumPy kNN + BM25, ES 불필요)
+    retrieval_backend: str = "elasticsearch"
+    local_index_dir: str = "./cache/local_index"
+    # "none"(float32) 또는 "int8"(행별 scale, 메모리 1/4)
+    local_index_quantization: str = "none"
+
 
 settings = Settings()
@@ -0,0 +1,279 @@
+"""
+업로드 PDF의 내용 해시(SHA-256) 기반 코퍼스 레지스트리
+
+같은 교재 PDF를 여러 사용자가 서로 다른 bookId로 올려도 추출·청킹·임베딩은
+한 번만 합니다. 청크는 공용 청크 인덱스에 내용 해시를 키(routing)로 저장되고,
+book_corpora 인덱스의 코퍼스 문서가 이를 참조하는 bookId 목록(ref_count)을 가집니다.
+참조가 0이 된 코퍼스는 collect_garbage()로 청크와 함께 삭제합니다.
+"""
+import hashlib
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from elasticsearch import ConflictError, NotFoundError
+
+from app.core.book_chunk_store import ensure_book_chunk_index
+from app.core.config import settings
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.core.index_manager import IndexManager
+
+INGESTING = "ingesting"
+READY = "ready"
+FAILED = "failed"
+
+ATTACH_SCRIPT = """
+if (ctx._source.book_ids == null) { ctx._source.book_ids = []; }
+if (!ctx._source.book_ids.contains(params.book_id)) { ctx._source.book_ids.add(params.book_id); }
+ctx._source.ref_count = ctx._source.book_ids.size();
+ctx._source.updated_at = params.now;
+"""
+
+DETACH_SCRIPT = """
+if (ctx._source.book_ids == null) { ctx._source.book_ids = []; }
+ctx._source.book_ids.removeIf(id -> id == params.book_id);
+ctx._source.ref_count = ctx._source.book_ids.size();
+ctx._source.updated_at = params.now;
+"""
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class CorpusRegistry:
+    def __init__(self, index_name: Optional[str] = None):
+        self.index_name = index_name or settings.elasticsearch_index_book_corpora
+
+    @property
+    def client(self):
+        return ElasticsearchClient.get_sync_client()
+
+    def ensure_index(self) -> None:
+        def create():
+            if not self.client.indices.exists(index=self.index_name):
+                self.client.indices.create(
+                    index=self.index_name,
+                    body={
+                        "settings": IndexManager.base_index_settings(),
+                        "mappings": {
+                            "properties": {
+                                "content_hash": {"type": "keyword"},
+                                "status": {"type": "keyword"},
+                                "book_ids": {"type": "keyword"},
+                                "ref_count": {"type": "integer"},
+                                "chunk_count": {"type": "integer"},
+                                "max_pages": {"type": "integer"},
+                                "created_at": {"type": "date"},
+                                "updated_at": {"type": "date"},
+                            }
+                        },
+                    },
+                )
+                print(f"✅ 코퍼스 인덱스 생성: {self.index_name}")
+
+        IndexManager.ensure_index_sync(self.index_name, create)
+        ensure_book_chunk_index()
+
+    def get(self, corpus_hash: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.client.get(index=self.index_name, id=corpus_hash)["_source"]
+        except NotFoundError as e:
+            if IndexManager.forget_if_missing(self.index_name, e):
+                # 인덱스가 밖에서 삭제됨: 이어지는 create가 동적 매핑으로 만들지 않도록 다시 생성
+                self.ensure_index()
+            return None
+
+    def resolve(self, book_id: Any) -> Optional[str]:
+        """bookId가 참조하는 코퍼스 해시"""
+        if not IndexManager.index_exists_sync(self.index_name):
+            return None
+        try:
+            response = self.client.search(
+                index=self.index_name,
+                query={"term": {"book_ids": str(book_id)}},
+                source=False,
+                size=1,
+            )
+        except NotFoundError as e:
+            IndexManager.forget_if_missing(self.index_name, e)
+            return None
+        hits = response["hits"]["hits"]
+        return hits[0]["_id"] if hits else None
+
+    def is_reusable(self, corpus: Optional[Dict[str, Any]], max_pages: int) -> bool:
+        return (
+            corpus is not None
+            and corpus.get("status") == READY
+            and (corpus.get("max_pages") or 0) >= max_pages
+        )
+
+    def claim(self, corpus_hash: str, max_pages: int) -> bool:
+        """
+        코퍼스 적재 권한을 얻습니다. 다른 요청이 같은 PDF를 적재 중이면 끝날 때까지
+        기다렸다가 False를 반환합니다. 적재가 오래 멈춰 있거나 실패했으면 넘겨받습니다.
+        """
+        deadline = time.monotonic() + settings.corpus_ingest_wait_seconds
+        while True:
+            doc = {
+                "content_hash": corpus_hash,
+                "status": INGESTING,
+                "book_ids": [],
+                "ref_count": 0,
+                "chunk_count": 0,
+                "max_pages": max_pages,
+                "created_at": _now(),
+                "updated_at": _now(),
+            }
+            try:
+                self.client.create(index=self.index_name, id=corpus_hash, document=doc, refresh=True)
+                return True
+            except ConflictError:
+                pass
+
+            try:
+                while time.monotonic() < deadline:
+                    current = self.client.get(index=self.index_name, id=corpus_hash)
+                    source = current["_source"]
+                    if self.is_reusable(source, max_pages):
+                        return False
+                    if source.get("status") in (READY, FAILED):
+                        # 더 많은 페이지가 필요한 재업로드 또는 이전 적재 실패: 같은 코퍼스를 다시 적재
+                        return self._take_over(corpus_hash, current, max_pages)
+                    time.sleep(1.0)
+
+                print(f"⚠️ 코퍼스 적재 대기 시간 초과, 넘겨받음: {corpus_hash}")
+                return self._take_over(
+                    corpus_hash, self.client.get(index=self.index_name, id=corpus_hash), max_pages
+                )
+            except NotFoundError:
+                # 먼저 적재하던 요청이 실패해 코퍼스 문서를 지움: 적재 권한을 다시 요청
+                continue
+
+    def _take_over(self, corpus_hash: str, current: Dict[str, Any], max_pages: int) -> bool:
+        try:
+            self.client.update(
+                index=self.index_name,
+                id=corpus_hash,
+                doc={"status": INGESTING, "max_pages": max_pages, "updated_at": _now()},
+                if_seq_no=current["_seq_no"],
+                if_primary_term=current["_primary_term"],
+                refresh=True,
+            )
+            return True
+        except (ConflictError, NotFoundError):
+            # 다른 요청이 먼저 넘겨받았거나 문서가 지워졌으면 처음부터 다시 시도
+            return self.claim(corpus_hash, max_pages)
+
+    def mark_ready(self, corpus_hash: str, chunk_count: int) -> None:
+        self.client.update(
+            index=self.index_name,
+            id=corpus_hash,
+            doc={"status": READY, "chunk_count": chunk_count, "updated_at": _now()},
+            refresh=True,
+        )
+
+    def release(self, corpus_hash: str) -> None:
+        """
+        적재 실패 시 호출합니다. 참조가 없으면 코퍼스 문서를 지워 다음 업로드가 다시 적재하게 하고,
+        참조하는 bookId가 있으면(재적재 중 실패, 기존 청크는 이미 지워짐) FAILED로 표시해
+        다음 업로드가 기다리지 않고 바로 넘겨받게 합니다.
+        """
+        corpus = self.get(corpus_hash)
+        if corpus is None:
+            return
+        if not corpus.get("book_ids"):
+            self.client.delete(index=self.index_name, id=corpus_hash, refresh=True)
+            return
+        self.client.update(
+            index=self.index_name,
+            id=corpus_hash,
+            doc={"status": FAILED, "chunk_count": 0, "updated_at": _now()},
+            refresh=True,
+        )
+
+    def attach(self, book_id: Any, corpus_hash: str) -> None:
+        """bookId가 코퍼스를 참조하도록 합니다. 이전 코퍼스 참조는 해제합니다."""
+        book_id = str(book_id)
+        previous = self.resolve(book_id)
+        if previous == corpus_hash:
+            return
+        if previous is not None:
+            self.detach(book_id, previous)
+        # 코퍼스가 GC로 지워졌다면 NotFoundError가 그대로 올라가 호출 측에서 다시 적재
+        self.client.update(
+            index=self.index_name,
+            id=corpus_hash,
+            script={"source": ATTACH_SCRIPT, "lang": "painless", "params": {"book_id": book_id, "now": _now()}},
+            retry_on_conflict=settings.effectiveness_retry_on_conflict,
+            refresh=True,
+        )
+
+    def detach(self, book_id: Any, corpus_hash: str) -> None:
+        try:
+            self.client.update(
+                index=self.index_name,
+                id=corpus_hash,
+                script={
+                    "source": DETACH_SCRIPT,
+                    "lang": "painless",
+                    "params": {"book_id": str(book_id), "now": _now()},
+                },
+                retry_on_conflict=settings.effectiveness_retry_on_conflict,
+                refresh=True,
+            )
+        except NotFoundError:
+            pass
+
+    def collect_garbage(self, grace_seconds: float = 3600.0, dry_run: bool = False) -> List[str]:
+        """참조가 0이고 grace_seconds 동안 변경이 없던 코퍼스와 그 청크를 삭제합니다."""
+        if not IndexManager.index_exists_sync(self.index_name):
+            return []
+        cutoff = (datetime.utcnow() - timedelta(seconds=grace_seconds)).isoformat() + "Z"
+        response = self.client.search(
+            index=self.index_name,
+            query={
+                "bool": {
+                    "filter": [
+                        {"term": {"ref_count": 0}},
+                        {"range": {"updated_at": {"lt": cutoff}}},
+                    ]
+                }
+            },
+            source=False,
+            seq_no_primary_term=True,
+            size=1000,
+        )
+        collected: List[str] = []
+        for hit in response["hits"]["hits"]:
+            corpus_hash = hit["_id"]
+            if dry_run:
+                collected.append(corpus_hash)
+                continue
+            try:
+                # 코퍼스 문서를 먼저 지워 동시에 들어온 attach가 실패(→ 재적재)하도록 함
+                self.client.delete(
+                    index=self.index_name,
+                    id=corpus_hash,
+                    if_seq_no=hit["_seq_no"],
+                    if_primary_term=hit["_primary_term"],
+                    refresh=True,
+                )
+            except (ConflictError, NotFoundError):
+                continue
+            self.client.delete_by_query(
+                index=settings.elasticsearch_index_book_chunks,
+                routing=corpus_hash,
+                body={"query": {"term": {"book_id": corpus_hash}}},
+                conflicts="proceed",
+            )
+            collected.append(corpus_hash)
+        return collected
+
+
+# 싱글톤 인스턴스
+corpus_registry = CorpusRegistry()
@@ -1,15 +1,41 @@
 from app.core.config import settings
-from elasticsearch import AsyncElasticsearch
+from app.core.es_serializer import elasticsearch_serializers
+from elasticsearch import AsyncElasticsearch, Elasticsearch
+
+
+def _client_kwargs():
+    retry_on_status = [
+        int(status)
+        for status in settings.elasticsearch_retry_on_status.split(",")
+        if status.strip()
+    ]
+    kwargs = {
+        "hosts": [host.strip() for host in settings.elasticsearch_hosts.split(",")],
+        "connections_per_node": settings.elasticsearch_connections_per_node,
+        "http_compress": settings.elasticsearch_http_compress,
+        "request_timeout": settings.elasticsearch_request_timeout,
+        "max_retries": settings.elasticsearch_max_retries,
+        "retry_on_timeout": settings.elasticsearch_retry_on_timeout,
+        "retry_on_status": retry_on_status,
+        "sniff_on_start": settings.elasticsearch_sniff_on_start,
+        "sniff_on_node_failure": settings.elasticsearch_sniff_on_node_failure,
+    }
+    if settings.elasticsearch_sniff_on_start or settings.elasticsearch_sniff_on_node_failure:
+        kwargs["min_delay_between_sniffing"] = settings.elasticsearch_min_delay_between_sniffing
+    serializers = elasticsearch_serializers()
+    if serializers is not None:
+        kwargs["serializers"] = serializers
+    return kwargs
 
 
 class ElasticsearchClient:
     _client: AsyncElasticsearch = None
+    _sync_client: Elasticsearch = None
 
     @classmethod
     async def initialize(cls):
         if cls._client is None:
-            hosts = settings.elasticsearch_hosts.split(",")
-            cls._client = AsyncElasticsearch(hosts=hosts)
+            cls._client = AsyncElasticsearch(**_client_kwargs())
 
     @classmethod
     async def get_client(cls) -> AsyncElasticsearch:
@@ -17,8 +43,23 @@ class ElasticsearchClient:
             await cls.initialize()
         return cls._client
 
+    @classmethod
+    def get_sync_client(cls) -> Elasticsearch:
+        """동기 코드 경로(LangChain ElasticsearchStore 등)용 클라이언트"""
+        if cls._sync_client is None:
+            cls._sync_client = Elasticsearch(**_client_kwargs())
+        return cls._sync_client
+
+    @classmethod
+    def for_bulk(cls, client):
+        """대량 요청용: 같은 커넥션 풀을 쓰되 요청 타임아웃만 길게"""
+        return client.options(request_timeout=settings.elasticsearch_bulk_request_timeout)
+
     @classmethod
     async def close(cls):
         if cls._client:
             await cls._client.close()
             cls._client = None
+        if cls._sync_client:
+            cls._sync_client.close()
+            cls._sync_client = None
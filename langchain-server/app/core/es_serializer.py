@@ -0,0 +1,59 @@
+"""
+Elasticsearch 요청/응답 직렬화
+
+기본 JsonSerializer(표준 json 모듈)는 3072차원 벡터가 들어간 kNN 쿼리와 bulk 문서를
+인코딩/디코딩하는 데 클라이언트 CPU를 많이 씁니다. orjson이 설치되어 있으면
+json/ndjson 모두 orjson으로 처리하고, NumPy 배열은 tolist() 없이 바로 직렬화합니다.
+orjson이 없으면 기본 직렬화기를 그대로 사용합니다.
+"""
+from typing import Any, Dict, Optional
+
+from elasticsearch.serializer import JsonSerializer, NdjsonSerializer, Serializer
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson은 langsmith 의존성으로 함께 설치됨
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+)
+
+
+class _OrjsonMixin:
+    def json_dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+
+    def json_loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class OrjsonSerializer(_OrjsonMixin, JsonSerializer):
+    pass
+
+
+class OrjsonNdjsonSerializer(_OrjsonMixin, NdjsonSerializer):
+    pass
+
+
+def vectors_for_transport(vectors: Any) -> Any:
+    """
+    orjson을 쓰면 NumPy 배열을 그대로 넘기고, 아니면 list로 바꿉니다.
+    (elasticsearch 8.12 기본 직렬화기는 NumPy 2에서 np.float_ 제거로 배열 직렬화에 실패)
+    """
+    if hasattr(vectors, "tolist") and elasticsearch_serializers() is None:
+        return vectors.tolist()
+    return vectors
+
+
+def elasticsearch_serializers() -> Optional[Dict[str, Serializer]]:
+    """AsyncElasticsearch/Elasticsearch의 serializers 인자. None이면 기본값 사용"""
+    if not settings.elasticsearch_fast_serializer or orjson is None:
+        return None
+    # 호환 모드 mimetype(application/vnd.elasticsearch+json 등)은 클라이언트가 이 값으로 채움
+    return {
+        "application/json": OrjsonSerializer(),
+        "application/x-ndjson": OrjsonNdjsonSerializer(),
+    }
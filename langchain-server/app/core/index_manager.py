@@ -0,0 +1,232 @@
+"""
+인덱스 부트스트랩 관리
+
+- 서버 시작 시 인덱스 템플릿을 한 번만 등록
+- 인덱스 준비 여부를 프로세스 안에 캐시 (저장할 때마다 indices.exists 호출 방지).
+  서비스 밖에서 인덱스가 삭제되면 index_not_found 오류를 받은 곳에서 forget_if_missing()으로 지움
+- 대량 색인 동안에만 refresh_interval을 끄고, 끝나면 복구 + 선택적으로 force merge
+"""
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from elasticsearch import AsyncElasticsearch
+
+from app.core.config import settings
+from app.core.elasticsearch_client import ElasticsearchClient
+
+# ElasticsearchStore(LangChain)가 만드는 교재 청크 인덱스
+CHUNK_INDEX_PATTERN = "java_learning_docs*"
+
+
+class IndexManager:
+    _ready: Set[str] = set()
+    _templates_applied: bool = False
+    _locks: Dict[str, asyncio.Lock] = {}
+    _bulk_depth: Dict[str, int] = {}
+
+    @classmethod
+    def base_index_settings(cls) -> Dict[str, Any]:
+        index_settings: Dict[str, Any] = {
+            "number_of_shards": settings.elasticsearch_number_of_shards,
+            "number_of_replicas": settings.elasticsearch_number_of_replicas,
+            "refresh_interval": settings.elasticsearch_refresh_interval,
+        }
+        preload = [
+            ext.strip()
+            for ext in settings.elasticsearch_preload_extensions.split(",")
+            if ext.strip()
+        ]
+        if preload:
+            index_settings["store"] = {"preload": preload}
+        return index_settings
+
+    @classmethod
+    async def bootstrap(cls, learning_material_repo) -> None:
+        """서버 시작 시 한 번 호출: 템플릿 등록 후 learning_materials 준비"""
+        es = learning_material_repo.es_client
+        await cls.apply_templates(es, learning_material_repo)
+        await learning_material_repo.create_index()
+
+    @classmethod
+    async def apply_templates(cls, es: AsyncElasticsearch, learning_material_repo) -> None:
+        if cls._templates_applied:
+            return
+        templates: List[Dict[str, Any]] = [
+            {
+                "name": f"{learning_material_repo.index_name}_template",
+                "index_patterns": [f"{learning_material_repo.index_name}_v*"],
+                "template": {
+                    "settings": cls.base_index_settings(),
+                    "mappings": learning_material_repo.index_mappings(),
+                },
+            },
+            {
+                # ElasticsearchStore가 매핑을 직접 만들기 때문에 settings만 지정.
+                # refresh는 평소 값으로 두고 적재 구간(bulk_ingestion_sync)에서만 끔
+                "name": "java_learning_docs_template",
+                "index_patterns": [CHUNK_INDEX_PATTERN],
+                "template": {"settings": cls.base_index_settings()},
+            },
+        ]
+        for template in templates:
+            await es.indices.put_index_template(
+                name=template["name"],
+                body={
+                    "index_patterns": template["index_patterns"],
+                    "template": template["template"],
+                    "priority": 100,
+                },
+            )
+            print(f"[IndexManager] Applied index template: {template['name']}")
+        cls._templates_applied = True
+
+    @classmethod
+    def is_ready(cls, index: str) -> bool:
+        return index in cls._ready
+
+    @classmethod
+    def mark_ready(cls, index: str) -> None:
+        cls._ready.add(index)
+
+    @classmethod
+    def invalidate(cls, index: Optional[str] = None) -> None:
+        if index is None:
+            cls._ready.clear()
+        else:
+            cls._ready.discard(index)
+
+    @classmethod
+    def forget_if_missing(cls, index: str, error: Exception) -> bool:
+        """index_not_found 오류면 준비 캐시에서 지워 다음 ensure_index가 인덱스를 다시 만들게 합니다."""
+        if "index_not_found_exception" not in str(error):
+            return False
+        if index in cls._ready:
+            print(f"[IndexManager] {index} was deleted outside the service, will recreate")
+        cls.invalidate(index)
+        return True
+
+    @classmethod
+    async def ensure_index(
+        cls, index: str, create: Callable[[], Awaitable[None]]
+    ) -> None:
+        """준비된 인덱스면 바로 반환하고, 아니면 한 번만 create()를 실행"""
+        if index in cls._ready:
+            return
+        lock = cls._locks.setdefault(index, asyncio.Lock())
+        async with lock:
+            if index in cls._ready:
+                return
+            await create()
+            cls._ready.add(index)
+
+    @classmethod
+    def ensure_index_sync(cls, index: str, create: Callable[[], None]) -> None:
+        """동기 코드 경로용 ensure_index"""
+        if index in cls._ready:
+            return
+        create()
+        cls._ready.add(index)
+
+    @classmethod
+    def index_exists_sync(cls, index: str) -> bool:
+        """동기 코드(ElasticsearchStore 사용처)용 존재 확인. 결과는 캐시됩니다."""
+        if index in cls._ready:
+            return True
+        exists = bool(ElasticsearchClient.get_sync_client().indices.exists(index=index))
+        if exists:
+            cls._ready.add(index)
+        return exists
+
+    # ------------------------------------------------------------------
+    # 대량 색인
+    # ------------------------------------------------------------------
+    @classmethod
+    @asynccontextmanager
+    async def bulk_ingestion(
+        cls,
+        es: AsyncElasticsearch,
+        index: str,
+        force_merge: Optional[bool] = None,
+    ):
+        """
+        with 블록 동안 refresh를 끄고, 마지막 블록이 끝날 때 복구합니다.
+        같은 인덱스에 대한 대량 색인이 겹치면 가장 바깥 블록만 설정을 바꿉니다.
+        """
+        depth = cls._bulk_depth.get(index, 0)
+        cls._bulk_depth[index] = depth + 1
+        if depth == 0:
+            await es.indices.put_settings(
+                index=index,
+                body={"index": {"refresh_interval": settings.elasticsearch_bulk_refresh_interval}},
+            )
+        try:
+            yield
+        finally:
+            cls._bulk_depth[index] -= 1
+            if cls._bulk_depth[index] == 0:
+                del cls._bulk_depth[index]
+                await cls.finish_bulk_ingestion(es, index, force_merge)
+
+    @classmethod
+    async def finish_bulk_ingestion(
+        cls, es: AsyncElasticsearch, index: str, force_merge: Optional[bool] = None
+    ) -> None:
+        await es.indices.put_settings(
+            index=index,
+            body={"index": {"refresh_interval": settings.elasticsearch_refresh_interval}},
+        )
+        await es.indices.refresh(index=index)
+        if force_merge is None:
+            force_merge = settings.elasticsearch_force_merge_after_bulk
+        if force_merge:
+            await es.indices.forcemerge(
+                index=index,
+                max_num_segments=settings.elasticsearch_force_merge_max_segments,
+                wait_for_completion=False,
+            )
+
+    @classmethod
+    @contextmanager
+    def bulk_ingestion_sync(cls, index: str, force_merge: Optional[bool] = None):
+        """
+        동기 대량 색인(ElasticsearchStore.from_documents 등)용 bulk_ingestion.
+        이미 있는 인덱스면 적재 동안 refresh를 끄고, 적재가 실패해도 refresh는 복구합니다.
+        """
+        es = ElasticsearchClient.get_sync_client()
+        if es.indices.exists(index=index):
+            es.indices.put_settings(
+                index=index,
+                body={"index": {"refresh_interval": settings.elasticsearch_bulk_refresh_interval}},
+            )
+        try:
+            yield
+        except BaseException:
+            if es.indices.exists(index=index):
+                es.indices.put_settings(
+                    index=index,
+                    body={"index": {"refresh_interval": settings.elasticsearch_refresh_interval}},
+                )
+            raise
+        cls.finish_bulk_ingestion_sync(index, force_merge)
+
+    @classmethod
+    def finish_bulk_ingestion_sync(
+        cls, index: str, force_merge: Optional[bool] = None
+    ) -> None:
+        """대량 색인이 끝난 인덱스의 refresh 복구 + 선택적 force merge"""
+        es = ElasticsearchClient.get_sync_client()
+        es.indices.put_settings(
+            index=index,
+            body={"index": {"refresh_interval": settings.elasticsearch_refresh_interval}},
+        )
+        es.indices.refresh(index=index)
+        if force_merge is None:
+            force_merge = settings.elasticsearch_force_merge_after_bulk
+        if force_merge:
+            es.indices.forcemerge(
+                index=index,
+                max_num_segments=settings.elasticsearch_force_merge_max_segments,
+                wait_for_completion=False,
+            )
+        cls._ready.add(index)
@@ -0,0 +1,213 @@
+"""
+공용 LLM 게이트웨이 + 정확 일치 디스크 캐시
+
+생성기와 서비스는 ChatGoogleGenerativeAI를 직접 만들지 않고 llm_gateway.chat_model()로
+받은 CachedChatModel을 사용합니다. invoke / ainvoke / astream은 원래 모델과 같은 방식으로
+호출하고, (모델, 생성 파라미터, 호출 인자, 프롬프트)의 해시가 같으면 디스크에 저장된 응답을
+그대로 돌려줍니다. (요약, 낮은 temperature 생성, 부하 테스트 재생 등)
+
+- 저장 위치: llm_cache_dir/<해시 앞 2자리>/<해시>.json, 여러 프로세스가 공유
+- 전체 크기가 llm_cache_max_bytes를 넘으면 가장 오래 사용하지 않은 응답부터 삭제
+- 끝까지 생성된 응답(finish_reason이 STOP)만 저장. 잘린 응답은 다시 생성
+- 디스크 읽기/쓰기는 ainvoke / astream에서 스레드로 실행해 이벤트 루프를 막지 않음.
+  인덱스(디렉터리 스캔)는 시작 시 load_index()로 미리 읽어 둠
+- 같은 프롬프트에 다른 결과가 필요한 곳은 chat_model(..., cache=False)
+  또는 호출마다 invoke(..., cache=False)로 캐시를 쓰지 않음
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from app.core.config import settings
+
+MODEL_PARAMS = ("model", "temperature", "max_output_tokens", "top_p", "top_k")
+
+
+class LLMResponseCache:
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or settings.llm_cache_dir
+        self.max_bytes = max_bytes or settings.llm_cache_max_bytes
+        self._lock = threading.Lock()
+        # 키 -> 파일 크기 (오래 사용하지 않은 순)
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            entries = []
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if name.endswith(".json"):
+                        stat = os.stat(os.path.join(root, name))
+                        entries.append((stat.st_mtime, name[:-5], stat.st_size))
+            entries.sort()
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+            self._total_bytes = sum(self._index.values())
+            if entries:
+                print(
+                    f"[LLMGateway] Loaded response cache: {len(entries)} entries, "
+                    f"{self._total_bytes / 1024 / 1024:.1f}MB"
+                )
+        return self._index
+
+    def load_index(self) -> None:
+        """디스크의 캐시 인덱스를 읽습니다. (시작 시 스레드에서 호출)"""
+        with self._lock:
+            self._load_index()
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        with self._lock:
+            index = self._load_index()
+            try:
+                with open(path, encoding="utf-8") as f:
+                    content = json.load(f)["content"]
+            except (OSError, ValueError, KeyError):
+                self.misses += 1
+                return None
+            # 다른 프로세스가 저장한 항목도 인덱스에 반영하고 사용 시각을 갱신
+            index[key] = index.get(key) or os.path.getsize(path)
+            index.move_to_end(key)
+            os.utime(path)
+            self.hits += 1
+            return content
+
+    def put(self, key: str, content: str) -> None:
+        path = self._path(key)
+        data = json.dumps({"content": content, "created_at": time.time()}, ensure_ascii=False)
+        with self._lock:
+            index = self._load_index()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+            self._total_bytes += size - index.pop(key, 0)
+            index[key] = size
+            self.stores += 1
+            while self._total_bytes > self.max_bytes and len(index) > 1:
+                old_key, old_size = index.popitem(last=False)
+                self._total_bytes -= old_size
+                self.evictions += 1
+                try:
+                    os.remove(self._path(old_key))
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+
+def _finished(message) -> bool:
+    finish_reason = (getattr(message, "response_metadata", None) or {}).get("finish_reason")
+    return finish_reason in (None, "STOP", "stop")
+
+
+class CachedChatModel:
+    """ChatGoogleGenerativeAI와 같은 방식으로 호출하는 캐시 래퍼"""
+
+    def __init__(self, llm: ChatGoogleGenerativeAI, cache: LLMResponseCache, use_cache: bool = True):
+        self.llm = llm
+        self.cache = cache
+        self.use_cache = use_cache
+        self.params = {name: getattr(llm, name, None) for name in MODEL_PARAMS}
+
+    def _key(self, prompt: Any, cache: Optional[bool], kwargs: Dict[str, Any]) -> Optional[str]:
+        enabled = self.use_cache if cache is None else cache
+        if not (settings.llm_cache_enabled and enabled and isinstance(prompt, str)):
+            return None
+        payload = json.dumps(
+            {"params": self.params, "kwargs": kwargs, "prompt": prompt},
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def invoke(self, prompt: Any, cache: Optional[bool] = None, **kwargs: Any):
+        key = self._key(prompt, cache, kwargs)
+        if key:
+            content = self.cache.get(key)
+            if content is not None:
+                return AIMessage(content=content)
+        response = self.llm.invoke(prompt, **kwargs)
+        if key and isinstance(response.content, str) and _finished(response):
+            self.cache.put(key, response.content)
+        return response
+
+    async def ainvoke(self, prompt: Any, cache: Optional[bool] = None, **kwargs: Any):
+        key = self._key(prompt, cache, kwargs)
+        if key:
+            content = await asyncio.to_thread(self.cache.get, key)
+            if content is not None:
+                return AIMessage(content=content)
+        response = await self.llm.ainvoke(prompt, **kwargs)
+        if key and isinstance(response.content, str) and _finished(response):
+            await asyncio.to_thread(self.cache.put, key, response.content)
+        return response
+
+    async def astream(
+        self, prompt: Any, cache: Optional[bool] = None, **kwargs: Any
+    ) -> AsyncIterator[AIMessageChunk]:
+        """캐시 적중이면 저장된 응답을 한 조각으로 내보냅니다."""
+        key = self._key(prompt, cache, kwargs)
+        if key:
+            content = await asyncio.to_thread(self.cache.get, key)
+            if content is not None:
+                yield AIMessageChunk(content=content)
+                return
+        parts = []
+        last_chunk = None
+        async for chunk in self.llm.astream(prompt, **kwargs):
+            if isinstance(chunk.content, str):
+                parts.append(chunk.content)
+            last_chunk = chunk
+            yield chunk
+        if key and last_chunk is not None and _finished(last_chunk):
+            await asyncio.to_thread(self.cache.put, key, "".join(parts))
+
+
+class LLMGateway:
+    def __init__(self):
+        self.cache = LLMResponseCache()
+
+    def chat_model(self, cache: bool = True, **model_kwargs: Any) -> CachedChatModel:
+        """
+        Args:
+            cache: False면 이 호출처는 캐시를 쓰지 않음 (같은 프롬프트에 매번 다른 결과가 필요한 경우)
+            model_kwargs: ChatGoogleGenerativeAI 인자 (google_api_key 기본값은 설정값)
+        """
+        model_kwargs.setdefault("google_api_key", settings.gemini_api_key)
+        return CachedChatModel(ChatGoogleGenerativeAI(**model_kwargs), self.cache, use_cache=cache)
+
+
+# 싱글톤 인스턴스
+llm_gateway = LLMGateway()
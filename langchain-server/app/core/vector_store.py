@@ -6,6 +6,8 @@ from typing import List, Optional
 from langchain_community.vectorstores import ElasticsearchStore
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain.schema import Document
+from app.core.index_manager import IndexManager
+from app.core.elasticsearch_client import ElasticsearchClient
 
 class VectorStoreManager:
     """Elasticsearch 벡터 스토어 관리 클래스"""
@@ -23,16 +25,14 @@ class VectorStoreManager:
     def setup_vector_store(self, chunks: List[Document], pdf_path: str) -> bool:
         """Elasticsearch 벡터 스토어를 설정합니다."""
         try:
-            # Elasticsearch 연결 설정 (Docker 환경)
-            es_url = "http://elasticsearch:9200"
-            
             # Elasticsearch 벡터 스토어 생성
-            self.vector_store = ElasticsearchStore.from_documents(
-                documents=chunks,
-                embedding=self.embeddings,
-                es_url=es_url,
-                index_name=self.index_name
-            )
+            with IndexManager.bulk_ingestion_sync(self.index_name):
+                self.vector_store = ElasticsearchStore.from_documents(
+                    documents=chunks,
+                    embedding=self.embeddings,
+                    es_connection=ElasticsearchClient.get_sync_client(),
+                    index_name=self.index_name
+                )
             
             print(f"✅ Elasticsearch 벡터 스토어 설정 완료: {self.index_name}")
             return True
@@ -0,0 +1,115 @@
+"""
+교재별 검색 핸들 레지스트리
+
+QuestionGeneratorService가 vector_store 하나를 바꿔 끼우면 다른 교재의 업로드가
+진행 중인 문제 생성 요청의 검색 대상을 바꿔버립니다. 여기서는 book_id마다
+준비된 검색 핸들을 따로 보관하고(LRU), 처음 조회될 때만 연결·확인합니다.
+청크가 없는 교재도 잠시 기억해 두어 요청마다 count를 다시 보내지 않습니다.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from langchain_core.vectorstores import VectorStore
+
+from app.core.config import settings
+
+READY = "ready"
+MISSING = "missing"
+FAILED = "failed"
+
+
+@dataclass
+class RetrieverHandle:
+    key: Hashable
+    state: str
+    store: Optional[VectorStore] = None
+    checked_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+
+class VectorStoreRegistry:
+    def __init__(self, max_size: Optional[int] = None, missing_ttl: Optional[float] = None):
+        self.max_size = max_size or settings.vector_store_registry_max_books
+        self.missing_ttl = (
+            missing_ttl
+            if missing_ttl is not None
+            else settings.vector_store_missing_ttl_seconds
+        )
+        self._handles: "OrderedDict[Hashable, RetrieverHandle]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connect_locks: Dict[Hashable, threading.Lock] = {}
+
+    def _cached(self, key: Hashable) -> Optional[RetrieverHandle]:
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is None:
+                return None
+            if not handle.ready and time.monotonic() - handle.checked_at > self.missing_ttl:
+                del self._handles[key]
+                return None
+            self._handles.move_to_end(key)
+            return handle
+
+    def _put(self, handle: RetrieverHandle) -> RetrieverHandle:
+        with self._lock:
+            self._handles[handle.key] = handle
+            self._handles.move_to_end(handle.key)
+            while len(self._handles) > self.max_size:
+                evicted, _ = self._handles.popitem(last=False)
+                self._connect_locks.pop(evicted, None)
+        return handle
+
+    def get(
+        self,
+        key: Hashable,
+        connect: Callable[[], Optional[VectorStore]],
+    ) -> RetrieverHandle:
+        """
+        캐시된 핸들을 반환하고, 없으면 connect()로 한 번만 연결합니다.
+        connect()는 검색할 데이터가 없으면 None을 반환합니다.
+        """
+        handle = self._cached(key)
+        if handle is not None:
+            return handle
+        with self._lock:
+            connect_lock = self._connect_locks.setdefault(key, threading.Lock())
+        with connect_lock:
+            # 같은 교재를 동시에 조회한 요청은 먼저 연결한 결과를 재사용
+            handle = self._cached(key)
+            if handle is not None:
+                return handle
+            try:
+                store = connect()
+            except Exception as e:
+                print(f"[VectorStoreRegistry] Connect failed for {key}: {e}")
+                return self._put(RetrieverHandle(key=key, state=FAILED))
+            state = READY if store is not None else MISSING
+            return self._put(RetrieverHandle(key=key, state=state, store=store))
+
+    def register(self, key: Hashable, store: VectorStore) -> RetrieverHandle:
+        """적재가 끝난 스토어를 바로 준비 상태로 등록합니다."""
+        return self._put(RetrieverHandle(key=key, state=READY, store=store))
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._handles.clear()
+            else:
+                self._handles.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            states: Dict[str, int] = {}
+            for handle in self._handles.values():
+                states[handle.state] = states.get(handle.state, 0) + 1
+            return {"size": len(self._handles), "max_size": self.max_size, "states": states}
+
+
+# 싱글톤 인스턴스
+vector_store_registry = VectorStoreRegistry()
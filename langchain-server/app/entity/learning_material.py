@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict
 from datetime import datetime
+from app.utils.effectiveness import compute_effectiveness_score
 
 
 @dataclass
@@ -16,6 +17,11 @@ class LearningMaterial:
     source: Optional[str] = None
     tags: List[str] = field(default_factory=list)
 
+    success_count: int = 0
+    total_attempts_count: int = 0
+    average_understanding_score: Optional[float] = None
+    effectiveness_score: Optional[float] = None
+
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
 
@@ -29,6 +35,12 @@ class LearningMaterial:
             del doc["id"]
         if "score" in doc:
             del doc["score"]
+        if doc.get("effectiveness_score") is None:
+            doc["effectiveness_score"] = compute_effectiveness_score(
+                self.success_count,
+                self.total_attempts_count,
+                self.average_understanding_score,
+            )
         return doc
 
     @classmethod
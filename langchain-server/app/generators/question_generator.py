@@ -3,15 +3,16 @@
 """
 
 from typing import List, Dict, Any, Optional
-import json
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.core.llm_gateway import llm_gateway
+from app.generators.structured_question import generate_structured_questions
+from app.schemas.generated_question import GeneratedQuestion, QUESTION_BATCH_RESPONSE_SCHEMA
 
 class QuestionGenerator:
     """문제 생성기"""
     
     def __init__(self, llm=None, retriever=None):
         if llm is None:
-            self.llm = ChatGoogleGenerativeAI(
+            self.llm = llm_gateway.chat_model(
                 model="gemini-1.5-flash",
                 temperature=0.7,
                 max_tokens=2000
@@ -39,66 +40,34 @@ class QuestionGenerator:
 [난이도]: {difficulty}
 
 다음 JSON 형식으로 문제를 생성해주세요:
-{{
-    "question": "문제 내용 (정답 정보는 포함하지 마세요)",
-    "options": ["보기1", "보기2", "보기3", "보기4"],
-    "correct_answer": 1,
-    "explanation": "정답 설명",
-    "quality_score": 0.8,
-    "chapter": "챕터명",
-    "concept_keywords": ["키워드1", "키워드2"]
-}}
+{{"questions": [{{"question": "문제 내용", "options": ["보기1", "보기2", "보기3", "보기4"], "answer_index": 1, "explanation": "정답 설명"}}]}}
 
 주의사항:
 1. 문제는 명확하고 이해하기 쉬워야 합니다
-2. 보기는 모두 타당해야 하며, 정답이 명확해야 합니다
-3. 설명은 학습에 도움이 되도록 상세해야 합니다
-4. quality_score는 0.0~1.0 사이의 값입니다
+2. 보기는 서로 다른 4개이며 모두 타당해야 하고, 정답이 명확해야 합니다
+3. answer_index는 정답 보기 번호(1~4)입니다
+4. 설명은 학습에 도움이 되도록 상세해야 합니다
 5. 문제 내용에 정답 정보나 "[정답 정보: ...]" 같은 텍스트를 포함하지 마세요
-
-JSON:
 """
             
-            # LLM으로 문제 생성
-            response = self.llm.invoke(prompt)
-            response_text = response.content.strip()
-            print("\n[일반 문제 LLM 응답 전체 출력]====================\n", response_text, "\n==============================\n")
-            # JSON 파싱
-            try:
-                # JSON 부분만 추출
-                if "```json" in response_text:
-                    json_start = response_text.find("```json") + 7
-                    json_end = response_text.find("```", json_start)
-                    response_text = response_text[json_start:json_end].strip()
-                elif "```" in response_text:
-                    json_start = response_text.find("```") + 3
-                    json_end = response_text.find("```", json_start)
-                    response_text = response_text[json_start:json_end].strip()
-                
-                question_data = json.loads(response_text)
-                
-                # 필수 필드 검증
-                required_fields = ["question", "options", "correct_answer", "explanation"]
-                for field in required_fields:
-                    if field not in question_data:
-                        print(f"❌ 필수 필드 누락: {field}")
-                        return None
-                
-                # 기본값 설정
-                if "quality_score" not in question_data:
-                    question_data["quality_score"] = 0.7
-                if "chapter" not in question_data:
-                    question_data["chapter"] = self._extract_chapter_from_topic(topic)
-                if "concept_keywords" not in question_data:
-                    question_data["concept_keywords"] = [topic]
-                
-                return question_data
-                
-            except json.JSONDecodeError as e:
-                print(f"❌ JSON 파싱 실패: {e}")
-                print(f"응답: {response_text}")
+            # 스키마로 제한한 생성 (JSON 모드, 실패 시 한 번 수정 요청)
+            questions = generate_structured_questions(
+                self.llm, prompt, GeneratedQuestion, QUESTION_BATCH_RESPONSE_SCHEMA, 1
+            )
+            if not questions:
+                print("❌ 검증을 통과한 문제를 생성하지 못했습니다.")
                 return None
-                
+            question = questions[0]
+            return {
+                "question": question.question,
+                "options": question.options,
+                "correct_answer": question.answer_index,
+                "explanation": question.explanation,
+                "quality_score": 0.7,
+                "chapter": self._extract_chapter_from_topic(topic),
+                "concept_keywords": [topic],
+            }
+
         except Exception as e:
             print(f"❌ 문제 생성 실패: {e}")
             return None
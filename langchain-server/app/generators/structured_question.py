@@ -0,0 +1,243 @@
+"""
+스키마로 제한한 문제 생성 (Gemini JSON 모드) + 한 번의 부분 수정 요청
+
+문제 생성은 모두 이 경로를 거칩니다.
+1. response_mime_type="application/json" + response_schema로 {"questions": [...]} 생성
+2. 항목마다 pydantic 스키마로 검증
+3. 모자라면 JSON 오류 또는 실패한 항목과 검증 오류만 보내 한 번 수정 요청
+4. 그래도 실패하면 임시 선택지를 만들지 않고 빈 목록을 돌려줌
+
+파싱/검증 실패율은 structured_output_stats로 집계합니다.
+스트리밍 응답은 astream_structured_questions로 첫 문제의 본문과 보기를 먼저 내보냅니다.
+"""
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+T = TypeVar("T", bound=BaseModel)
+
+
+@dataclass
+class StructuredOutputStats:
+    calls: int = 0
+    # 첫 응답이 JSON이 아니거나 검증에 실패한 항목이 있던 호출
+    parse_failures: int = 0
+    repair_attempts: int = 0
+    repaired: int = 0
+    # 수정 후에도 요청 수를 채우지 못한 호출
+    failures: int = 0
+    dropped_items: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "parse_failures": self.parse_failures,
+            "parse_failure_rate": self.parse_failures / self.calls if self.calls else 0.0,
+            "repair_attempts": self.repair_attempts,
+            "repaired": self.repaired,
+            "failures": self.failures,
+            "failure_rate": self.failures / self.calls if self.calls else 0.0,
+            "dropped_items": self.dropped_items,
+        }
+
+
+structured_output_stats = StructuredOutputStats()
+
+
+def _strip_code_fence(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("\n") + 1:] if "\n" in text else text
+    return text.strip()
+
+
+def parse_questions(
+    content: str, model: Type[T]
+) -> Tuple[List[T], List[Tuple[Any, str]], Optional[str]]:
+    """
+    Returns:
+        (검증 통과 항목, [(실패 항목, 오류)], JSON 오류 메시지)
+    """
+    try:
+        data = json.loads(_strip_code_fence(content))
+    except json.JSONDecodeError as e:
+        return [], [], str(e)
+    items = data.get("questions", []) if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return [], [], "questions 배열이 없습니다"
+    valid: List[T] = []
+    invalid: List[Tuple[Any, str]] = []
+    for item in items:
+        try:
+            valid.append(model.model_validate(item))
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            )
+            invalid.append((item, errors))
+    return valid, invalid, None
+
+
+def _repair_prompt(
+    content: str, invalid: List[Tuple[Any, str]], json_error: Optional[str], missing: int
+) -> str:
+    if json_error:
+        return f"""
+아래 응답은 올바른 JSON이 아닙니다 ({json_error}).
+내용은 그대로 유지하고 {{"questions": [...]}} 형식의 올바른 JSON으로만 다시 출력하세요.
+
+[이전 응답]
+{content}
+"""
+    problems = "\n".join(
+        f"- {json.dumps(item, ensure_ascii=False)}\n  오류: {errors}" for item, errors in invalid
+    )
+    return f"""
+아래 문제 {len(invalid)}개가 스키마를 만족하지 않습니다. 각 문제의 내용은 유지하고 오류만 고쳐서
+{{"questions": [...]}} 형식으로 고친 문제 {missing}개만 출력하세요.
+
+{problems}
+"""
+
+
+def _invoke_kwargs(response_schema: Dict[str, Any], max_output_tokens: int) -> Dict[str, Any]:
+    return {
+        "response_mime_type": "application/json",
+        "response_schema": response_schema,
+        "generation_config": {"max_output_tokens": max_output_tokens},
+    }
+
+
+def _needs_repair(
+    content: str, model: Type[T], count: int
+) -> Tuple[List[T], List[Tuple[Any, str]], Optional[str], bool]:
+    stats = structured_output_stats
+    stats.calls += 1
+    valid, invalid, json_error = parse_questions(content, model)
+    if json_error or invalid:
+        stats.parse_failures += 1
+    needs_repair = count - len(valid) > 0 and bool(json_error or invalid)
+    if needs_repair:
+        stats.repair_attempts += 1
+        print(f"⚠️ 구조화 출력 수정 요청: JSON 오류={json_error}, 실패 항목={len(invalid)}개")
+    else:
+        stats.dropped_items += len(invalid)
+    return valid, invalid, json_error, needs_repair
+
+
+def _merge_repaired(
+    valid: List[T], invalid: List[Tuple[Any, str]], repaired_content: Optional[str], model: Type[T]
+) -> List[T]:
+    stats = structured_output_stats
+    if repaired_content is not None:
+        repaired, still_invalid, _ = parse_questions(repaired_content, model)
+        if repaired:
+            stats.repaired += 1
+        stats.dropped_items += max(len(invalid) - len(repaired), len(still_invalid))
+        valid = valid + repaired
+    return valid
+
+
+def generate_structured_questions(
+    llm,
+    prompt: str,
+    model: Type[T],
+    response_schema: Dict[str, Any],
+    count: int,
+    max_output_tokens: int = 2000,
+) -> List[T]:
+    """count개까지 검증된 문제를 생성합니다. 수정 요청은 최대 한 번입니다."""
+    kwargs = _invoke_kwargs(response_schema, max_output_tokens)
+    content = llm.invoke(prompt, **kwargs).content
+    valid, invalid, json_error, needs_repair = _needs_repair(content, model, count)
+    repaired_content = None
+    if needs_repair:
+        repaired_content = llm.invoke(
+            _repair_prompt(content, invalid, json_error, count - len(valid)), **kwargs
+        ).content
+    valid = _merge_repaired(valid, invalid, repaired_content, model)
+
+    if len(valid) < count:
+        structured_output_stats.failures += 1
+    return valid[:count]
+
+
+_STEM_PATTERN = re.compile(r'"question"\s*:\s*"((?:[^"\\]|\\.)*)', re.S)
+_OPTIONS_PATTERN = re.compile(r'"options"\s*:\s*(\[(?:[^\[\]"]|"(?:[^"\\]|\\.)*")*\])', re.S)
+
+
+def _decode_partial_string(raw: str) -> Optional[str]:
+    """끝이 잘렸을 수 있는 JSON 문자열 본문을 디코딩합니다. (미완성 이스케이프는 버림)"""
+    raw = re.sub(r"\\u[0-9a-fA-F]{0,3}$", "", raw)
+    if (len(raw) - len(raw.rstrip("\\"))) % 2:
+        raw = raw[:-1]
+    try:
+        return json.loads(f'"{raw}"')
+    except json.JSONDecodeError:
+        return None
+
+
+def preview_first_question(content: str) -> Tuple[str, Optional[List[str]]]:
+    """
+    생성 중인 JSON에서 첫 문제의 본문(지금까지 생성된 부분)과 보기(배열이 닫힌 경우)를 꺼냅니다.
+    객체의 키는 다음 객체보다 먼저 나오므로 각 키의 첫 등장이 첫 문제에 해당합니다.
+    """
+    stem_match = _STEM_PATTERN.search(content)
+    stem = (_decode_partial_string(stem_match.group(1)) or "") if stem_match else ""
+    options_match = _OPTIONS_PATTERN.search(content)
+    options = None
+    if options_match:
+        try:
+            options = [str(option) for option in json.loads(options_match.group(1))]
+        except json.JSONDecodeError:
+            options = None
+    return stem, options
+
+
+async def astream_structured_questions(
+    llm,
+    prompt: str,
+    model: Type[T],
+    response_schema: Dict[str, Any],
+    count: int,
+    max_output_tokens: int = 2000,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    generate_structured_questions의 스트리밍 버전입니다.
+
+    생성 중에는 ("stem", 첫 문제 본문 추가분)과 ("options", 첫 문제 보기)를 내보내고,
+    끝나면 검증(필요하면 한 번의 수정 요청)을 거친 ("questions", 문제 목록)을 내보냅니다.
+    미리보기는 검증 전이므로 최종 문제는 항상 마지막 이벤트를 기준으로 합니다.
+    """
+    kwargs = _invoke_kwargs(response_schema, max_output_tokens)
+    content = ""
+    sent_stem = ""
+    sent_options = False
+    async for chunk in llm.astream(prompt, **kwargs):
+        content += chunk.content if isinstance(chunk.content, str) else ""
+        stem, options = preview_first_question(content)
+        if len(stem) > len(sent_stem) and stem.startswith(sent_stem):
+            yield "stem", stem[len(sent_stem):]
+            sent_stem = stem
+        if options is not None and not sent_options:
+            sent_options = True
+            yield "options", options
+
+    valid, invalid, json_error, needs_repair = _needs_repair(content, model, count)
+    repaired_content = None
+    if needs_repair:
+        repaired_content = (
+            await llm.ainvoke(
+                _repair_prompt(content, invalid, json_error, count - len(valid)), **kwargs
+            )
+        ).content
+    valid = _merge_repaired(valid, invalid, repaired_content, model)
+
+    if len(valid) < count:
+        structured_output_stats.failures += 1
+    yield "questions", valid[:count]
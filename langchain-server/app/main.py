@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from app.api.learning import router as learning_router
@@ -6,14 +7,21 @@ from app.api.question_generation_api import router as question_generator_router
 from app.api.ping import router as ping_router
 from app.api.answer_evaluation_api import router as answer_evaluation_router
 from app.api.page_search_new_api import router as page_search_router
+from app.api.corpus_bundle_api import router as corpus_bundle_router
 from app.core.elasticsearch_client import ElasticsearchClient
+from app.core.index_manager import IndexManager
+from app.core.llm_gateway import llm_gateway
+from app.repository.effectiveness_write_buffer import effectiveness_write_buffer
+from app.repository.materialized_top_k import materialized_top_k
+from app.services.external_indexer import external_indexer
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.tools.learning_material_search_tool import get_learning_material_search_tool
 from app.tools.google_search_tool import get_google_search_tool
 from app.tools.explanation_generator_tool import get_explanation_generator_tool
 from app.agents.learning_agent import LearningAgent
-from app.repository.learning_material_repository import LearningMaterialRepository
+from app.repository.factory import create_learning_material_repository
+from app.core.config import settings
 from app.services.learning_service import LearningService
 from app.services.embedding_service import EmbeddingService
 
@@ -25,9 +33,19 @@ async def lifespan(app: FastAPI):
     es_client = await ElasticsearchClient.get_client()
     embedding_service = EmbeddingService()
     await embedding_service.ainitialize()
-    learning_material_repo = LearningMaterialRepository(es_client, embedding_service)
-    await learning_material_repo.create_index()
+    learning_material_repo = create_learning_material_repository(es_client, embedding_service)
+    if settings.retrieval_backend == "local":
+        await learning_material_repo.create_index()
+    else:
+        await IndexManager.bootstrap(learning_material_repo)
+        effectiveness_write_buffer.start()
     learning_service = LearningService(learning_material_repo)
+    if settings.materialized_topk_enabled:
+        materialized_top_k.start(learning_material_repo)
+    external_indexer.start(learning_material_repo)
+
+    if settings.llm_cache_enabled:
+        await asyncio.to_thread(llm_gateway.cache.load_index)
 
     app.state.learning_material_search_tool = await get_learning_material_search_tool()
     app.state.google_search_tool = await get_google_search_tool()
@@ -37,6 +55,14 @@ async def lifespan(app: FastAPI):
     await app.state.learning_agent.ainitialize()
 
     yield
+    await external_indexer.close()
+    await materialized_top_k.close()
+    if settings.retrieval_backend == "local":
+        from app.repository.local_learning_material_repository import persist_local_stores
+
+        persist_local_stores()
+    else:
+        await effectiveness_write_buffer.close()
     await ElasticsearchClient.close()
 
 
@@ -58,3 +84,4 @@ app.include_router(question_generator_router, prefix="/api/v1")
 app.include_router(ping_router, prefix="/api/v1", tags=["Health Check"])
 app.include_router(answer_evaluation_router, prefix="/api/v1", tags=["Answer Evaluation"])
 app.include_router(page_search_router, prefix="/api/v1", tags=["Page Search"])
+app.include_router(corpus_bundle_router, prefix="/api/v1", tags=["Corpus Bundle"])
@@ -0,0 +1,175 @@
+"""
+학습 자료 효과 카운터(success_count, 이해도 평균)의 write-behind 버퍼
+
+피드백이 올 때마다 문서를 갱신하면 3072차원 벡터를 포함한 문서 전체가 매번
+재색인되고, 인기 자료는 동시 갱신으로 version conflict가 납니다.
+여기서는 자료 ID별로 증가분을 메모리에서 합쳐 두었다가 주기적으로
+bulk update 한 번으로 반영합니다. (자료당 flush 주기마다 최대 1회 갱신)
+"""
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from elasticsearch.helpers import async_bulk
+
+from app.core.config import settings
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.utils.effectiveness import (
+    EFFECTIVENESS_SCORE_PAINLESS,
+    effectiveness_score_params,
+)
+
+EFFECTIVENESS_UPDATE_SCRIPT = """
+if (ctx._source.success_count == null) { ctx._source.success_count = 0; }
+if (ctx._source.total_attempts_count == null) { ctx._source.total_attempts_count = 0; }
+long attempts = ctx._source.total_attempts_count;
+double average = ctx._source.average_understanding_score == null ? 0.0 : ctx._source.average_understanding_score;
+ctx._source.success_count += params.success;
+if (params.attempts > 0) {
+  ctx._source.average_understanding_score = (average * attempts + params.score_sum) / (attempts + params.attempts);
+  ctx._source.total_attempts_count = attempts + params.attempts;
+}
+ctx._source.updated_at = params.now;
+""" + EFFECTIVENESS_SCORE_PAINLESS
+
+
+@dataclass
+class PendingEffectiveness:
+    success_delta: int = 0
+    attempts_delta: int = 0
+    score_sum: float = 0.0
+
+    def merge(self, other: "PendingEffectiveness") -> None:
+        self.success_delta += other.success_delta
+        self.attempts_delta += other.attempts_delta
+        self.score_sum += other.score_sum
+
+
+class EffectivenessWriteBuffer:
+    def __init__(
+        self,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        retry_on_conflict: Optional[int] = None,
+    ):
+        self.flush_interval = (
+            flush_interval or settings.effectiveness_flush_interval_seconds
+        )
+        self.max_pending = max_pending or settings.effectiveness_max_pending
+        self.retry_on_conflict = (
+            retry_on_conflict
+            if retry_on_conflict is not None
+            else settings.effectiveness_retry_on_conflict
+        )
+        self.index_name = settings.elasticsearch_index_learning_materials
+        self._pending: Dict[str, PendingEffectiveness] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        material_id: str,
+        success_increment: int = 0,
+        understanding_score: Optional[float] = None,
+    ) -> None:
+        """증가분을 버퍼에 합칩니다. ES 호출은 하지 않습니다."""
+        pending = self._pending.setdefault(material_id, PendingEffectiveness())
+        pending.success_delta += success_increment
+        if understanding_score is not None:
+            pending.attempts_delta += 1
+            pending.score_sum += understanding_score
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[EffectivenessWriteBuffer] Flush error: {e}")
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            now = datetime.utcnow().isoformat() + "Z"
+            actions = [
+                {
+                    "_op_type": "update",
+                    "_index": self.index_name,
+                    "_id": material_id,
+                    "retry_on_conflict": self.retry_on_conflict,
+                    "script": {
+                        "source": EFFECTIVENESS_UPDATE_SCRIPT,
+                        "lang": "painless",
+                        "params": {
+                            **effectiveness_score_params(),
+                            "success": pending.success_delta,
+                            "attempts": pending.attempts_delta,
+                            "score_sum": pending.score_sum,
+                            "now": now,
+                        },
+                    },
+                }
+                for material_id, pending in batch.items()
+            ]
+            es = await ElasticsearchClient.get_client()
+            try:
+                _, errors = await async_bulk(
+                    ElasticsearchClient.for_bulk(es), actions, raise_on_error=False
+                )
+            except Exception as e:
+                # 전송 자체가 실패하면 전부 되돌려 다음 flush에서 다시 시도
+                self._requeue(batch, list(batch.keys()))
+                raise e
+            failed_ids: List[str] = []
+            for error in errors:
+                item = error.get("update", {})
+                if item.get("status") == 404:
+                    print(f"[EffectivenessWriteBuffer] Material not found: {item.get('_id')}")
+                    continue
+                failed_ids.append(item.get("_id"))
+            if failed_ids:
+                print(f"[EffectivenessWriteBuffer] Re-queue {len(failed_ids)} failed updates")
+                self._requeue(batch, failed_ids)
+            flushed = len(batch) - len(failed_ids)
+            print(f"[EffectivenessWriteBuffer] Flushed {flushed} material counters")
+            return flushed
+
+    def _requeue(self, batch: Dict[str, PendingEffectiveness], material_ids: List[str]):
+        for material_id in material_ids:
+            if material_id in batch:
+                self._pending.setdefault(material_id, PendingEffectiveness()).merge(
+                    batch[material_id]
+                )
+
+    async def close(self) -> None:
+        """종료 시 백그라운드 루프를 멈추고 남은 증가분을 반영합니다."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+# 싱글톤 인스턴스
+effectiveness_write_buffer = EffectivenessWriteBuffer()
@@ -0,0 +1,19 @@
+from elasticsearch import AsyncElasticsearch
+
+from app.core.config import settings
+from app.services.embedding_service import EmbeddingService
+
+
+def create_learning_material_repository(
+    es_client: AsyncElasticsearch, embedding_service: EmbeddingService
+):
+    """settings.retrieval_backend에 맞는 학습 자료 리포지토리"""
+    if settings.retrieval_backend == "local":
+        from app.repository.local_learning_material_repository import (
+            LocalLearningMaterialRepository,
+        )
+
+        return LocalLearningMaterialRepository(embedding_service)
+    from app.repository.learning_material_repository import LearningMaterialRepository
+
+    return LearningMaterialRepository(es_client, embedding_service)
@@ -1,60 +1,234 @@
 from typing import List, Dict, Any, Optional, Tuple
 from elasticsearch import AsyncElasticsearch
 from app.core.config import settings
+from app.core.index_manager import IndexManager
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.repository.effectiveness_write_buffer import (
+    EffectivenessWriteBuffer,
+    effectiveness_write_buffer,
+)
+from app.repository.materialized_top_k import materialized_top_k
+from app.repository.search_batcher import get_search_batcher
 from app.entity.learning_material import LearningMaterial
 from app.services.embedding_service import EmbeddingService
+from app.services.search_result_cache import search_result_cache
+from app.utils.vector import dense_vector_index_options
 from elasticsearch.helpers import async_bulk
-from datetime import datetime
 
 
 class LearningMaterialRepository:
     def __init__(
-        self, es_client: AsyncElasticsearch, embedding_service: EmbeddingService
+        self,
+        es_client: AsyncElasticsearch,
+        embedding_service: EmbeddingService,
+        effectiveness_buffer: EffectivenessWriteBuffer = effectiveness_write_buffer,
     ):
         self.es_client = es_client
         self.embedding_service = embedding_service
+        self.effectiveness_buffer = effectiveness_buffer
         self.index_name = settings.elasticsearch_index_learning_materials
         self.vector_dim = self.embedding_service.embedding_dimension
 
+    async def _search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """검색 요청. 설정이 켜져 있으면 동시 요청과 묶어 _msearch로 보냅니다."""
+        try:
+            if settings.elasticsearch_msearch_batching:
+                return await get_search_batcher(self.es_client).search(self.index_name, body)
+            return await self.es_client.search(index=self.index_name, body=body)
+        except Exception as e:
+            IndexManager.forget_if_missing(self.index_name, e)
+            raise
+
+    def _content_embedding_mapping(self) -> Dict[str, Any]:
+        mapping: Dict[str, Any] = {
+            "type": "dense_vector",
+            "dims": self.vector_dim,
+            "index": True,
+            "similarity": settings.elasticsearch_vector_similarity,
+        }
+        index_options = dense_vector_index_options(settings.elasticsearch_vector_index_type)
+        if index_options:
+            mapping["index_options"] = index_options
+        return mapping
+
+    def index_mappings(self) -> Dict[str, Any]:
+        return {
+            "_meta": {
+                "embedding_model": self.embedding_service.embedding_model,
+                "embedding_dimension": self.vector_dim,
+            },
+            "properties": {
+                "content_text": {"type": "text"},
+                "concept": {"type": "keyword"},
+                "difficulty_level": {"type": "keyword"},
+                "url": {"type": "keyword"},
+                "title": {"type": "text"},
+                "material_type": {"type": "keyword"},
+                "content_embedding": self._content_embedding_mapping(),
+                "feedback_embedding": {
+                    "type": "dense_vector",
+                    "dims": self.vector_dim,
+                    "index": False,
+                },
+                "created_at": {"type": "date"},
+                "updated_at": {"type": "date"},
+                "success_count": {"type": "integer"},
+                "total_attempts_count": {"type": "integer"},
+                "average_understanding_score": {"type": "float"},
+                "effectiveness_score": {"type": "rank_feature"},
+            }
+        }
+
     async def create_index(self):
+        """준비 여부는 IndexManager에 캐시되므로 저장 경로에서 호출해도 왕복이 없습니다."""
+        await IndexManager.ensure_index(self.index_name, self._create_index)
+
+    async def _create_index(self):
+        """
+        index_name은 alias입니다. 실제 데이터는 버전이 붙은 인덱스
+        (learning_materials_v1, _v2, ...)에 있고 재색인 시 alias만 교체합니다.
+        alias 도입 이전에 만들어진 같은 이름의 실제 인덱스는 그대로 사용합니다.
+        """
         es = self.es_client
-        if not await es.indices.exists(index=self.index_name):
+        if await es.indices.exists_alias(name=self.index_name):
+            print(f"Alias {self.index_name} already exists.")
+            await self._put_additive_mappings()
+            await self._warn_on_vector_mapping_mismatch()
+        elif await es.indices.exists(index=self.index_name):
+            print(f"Index {self.index_name} already exists (legacy, not an alias).")
+            await self._put_additive_mappings()
+            await self._warn_on_vector_mapping_mismatch()
+        else:
+            versioned_index = await self.next_versioned_index_name()
             print(
-                f"Creating index: {self.index_name} with vector dimension: {self.vector_dim}"
+                f"Creating index: {versioned_index} (alias {self.index_name}) "
+                f"with vector dimension: {self.vector_dim}"
             )
             await es.indices.create(
-                index=self.index_name,
+                index=versioned_index,
                 body={
-                    "mappings": {
-                        "properties": {
-                            "content_text": {"type": "text"},
-                            "concept": {"type": "keyword"},
-                            "difficulty_level": {"type": "keyword"},
-                            "url": {"type": "keyword"},
-                            "title": {"type": "text"},
-                            "material_type": {"type": "keyword"},
-                            "content_embedding": {
-                                "type": "dense_vector",
-                                "dims": self.vector_dim,
-                                "index": "true",
-                                "similarity": "l2_norm",
-                            },
-                            "feedback_embedding": {
-                                "type": "dense_vector",
-                                "dims": self.vector_dim,
-                            },
-                            "created_at": {"type": "date"},
-                            "updated_at": {"type": "date"},
-                            "success_count": {"type": "integer"},
-                            "total_attempts_count": {"type": "integer"},
-                            "average_understanding_score": {"type": "float"},
-                        }
-                    }
+                    "mappings": self.index_mappings(),
+                    "aliases": {self.index_name: {"is_write_index": True}},
                 },
             )
-            print(f"Index {self.index_name} created.")
+            print(f"Index {versioned_index} created.")
+
+    async def resolve_indices(self) -> List[str]:
+        """alias(또는 레거시 인덱스)가 현재 가리키는 실제 인덱스 이름들"""
+        es = self.es_client
+        if await es.indices.exists_alias(name=self.index_name):
+            response = await es.indices.get_alias(name=self.index_name)
+            return list(response.keys())
+        if await es.indices.exists(index=self.index_name):
+            return [self.index_name]
+        return []
+
+    async def next_versioned_index_name(self) -> str:
+        response = await self.es_client.indices.get(
+            index=f"{self.index_name}_v*", ignore_unavailable=True, allow_no_indices=True
+        )
+        versions = []
+        for name in response.keys():
+            suffix = name[len(self.index_name) + 2 :]
+            if suffix.isdigit():
+                versions.append(int(suffix))
+        return f"{self.index_name}_v{max(versions, default=0) + 1}"
+
+    async def _put_additive_mappings(self):
+        """기존 인덱스에 나중에 추가된 필드를 매핑에 더합니다. (값 채우기는 backfill 스크립트)"""
+        try:
+            await self.es_client.indices.put_mapping(
+                index=self.index_name,
+                body={"properties": {"effectiveness_score": {"type": "rank_feature"}}},
+            )
+        except Exception as e:
+            print(f"Error updating mapping of {self.index_name}: {e}")
+
+    async def _warn_on_vector_mapping_mismatch(self):
+        try:
+            response = await self.es_client.indices.get_mapping(index=self.index_name)
+        except Exception as e:
+            print(f"Error reading mapping of {self.index_name}: {e}")
+            return
+        expected = self._content_embedding_mapping()
+        for physical_index, index_mapping in response.items():
+            mappings = index_mapping.get("mappings", {})
+            current = mappings.get("properties", {}).get("content_embedding", {})
+            for key in ("dims", "similarity"):
+                if current.get(key) != expected.get(key):
+                    print(
+                        f"Warning: {physical_index}.content_embedding {key}="
+                        f"{current.get(key)} but settings expect {expected.get(key)}. "
+                        "Run `python -m app.scripts.reindex_learning_materials` to migrate."
+                    )
+            indexed_model = mappings.get("_meta", {}).get("embedding_model")
+            if indexed_model and indexed_model != self.embedding_service.embedding_model:
+                print(
+                    f"Warning: {physical_index} was embedded with {indexed_model} "
+                    f"but settings use {self.embedding_service.embedding_model}."
+                )
+
+    def _knn_clause(
+        self,
+        embedding: List[float],
+        size: int,
+        boost: Optional[float] = None,
+        filters: Optional[Dict] = None,
+    ) -> Dict[str, Any]:
+        k = size
+        if settings.elasticsearch_knn_rescore:
+            k = max(size, int(size * settings.elasticsearch_knn_rescore_oversample))
+        knn_query: Dict[str, Any] = {
+            "field": "content_embedding",
+            "query_vector": embedding,
+            "k": k,
+            "num_candidates": max(100, k * 10),
+        }
+        if boost is not None:
+            knn_query["boost"] = boost
+        if filters:
+            # pre-filter: 필터에 맞는 문서 안에서 k개를 찾음
+            knn_query["filter"] = [{"term": {key: value}} for key, value in filters.items()]
+        return knn_query
+
+    def _effectiveness_clause(self, boost: Optional[float] = None) -> Dict[str, Any]:
+        clause: Dict[str, Any] = {
+            "field": "effectiveness_score",
+            "saturation": {"pivot": settings.effectiveness_rank_pivot},
+        }
+        if boost is not None:
+            clause["boost"] = boost
+        return {"rank_feature": clause}
+
+    def _rescore_clause(self, embedding: List[float], size: int) -> Dict[str, Any]:
+        """
+        양자화(int8/bbq)된 HNSW 후보들을 원본 float 벡터로 다시 채점합니다.
+        ES의 knn 점수와 같은 스케일이 되도록 similarity별로 변환합니다.
+        """
+        similarity = settings.elasticsearch_vector_similarity
+        if similarity == "cosine":
+            source = "(1.0 + cosineSimilarity(params.query_vector, 'content_embedding')) / 2.0"
+        elif similarity == "l2_norm":
+            source = "1.0 / (1.0 + Math.pow(l2norm(params.query_vector, 'content_embedding'), 2))"
         else:
-            print(f"Index {self.index_name} already exists.")
+            source = "(1.0 + dotProduct(params.query_vector, 'content_embedding')) / 2.0"
+        window_size = max(size, int(size * settings.elasticsearch_knn_rescore_oversample))
+        return {
+            "window_size": window_size,
+            "query": {
+                "rescore_query": {
+                    "script_score": {
+                        "query": {"match_all": {}},
+                        "script": {
+                            "source": source,
+                            "params": {"query_vector": embedding},
+                        },
+                    }
+                },
+                "query_weight": 0.0,
+                "rescore_query_weight": 1.0,
+            },
+        }
 
     async def save_material(self, material: LearningMaterial) -> str:
         await self.create_index()
@@ -68,9 +242,11 @@ class LearningMaterialRepository:
             response = await es.index(index=self.index_name, document=doc)
         material_id = response["_id"]
         print(f"Saved learning material with ID: {material_id}")
+        search_result_cache.bump_version("save_material")
         return material_id
 
     async def bulk_save_materials(self, materials: List[LearningMaterial]):
+        await self.create_index()
         es = self.es_client
         actions = []
         for material in materials:
@@ -79,8 +255,14 @@ class LearningMaterialRepository:
             if material.id:
                 action["_id"] = material.id
             actions.append(action)
-        await async_bulk(es, actions)
+        if len(actions) >= settings.elasticsearch_bulk_ingestion_threshold:
+            async with IndexManager.bulk_ingestion(es, self.index_name):
+                await async_bulk(ElasticsearchClient.for_bulk(es), actions)
+        else:
+            await async_bulk(ElasticsearchClient.for_bulk(es), actions)
         print(f"Bulk saved {len(materials)} learning materials.")
+        search_result_cache.bump_version("bulk_save_materials")
+        materialized_top_k.invalidate_concepts({material.concept for material in materials})
 
     async def get_material_by_id(self, material_id: str) -> Optional[LearningMaterial]:
         es = self.es_client
@@ -98,26 +280,24 @@ class LearningMaterialRepository:
     async def search_materials_by_concept(
         self, concept: str, size: int = 5
     ) -> List[LearningMaterial]:
-        es = self.es_client
         query = {"query": {"match": {"concept": concept}}, "size": size}
-        response = await es.search(index=self.index_name, body=query)
+        response = await self._search(query)
         return [
             LearningMaterial.from_elasticsearch_doc(hit["_id"], hit["_source"])
             for hit in response["hits"]["hits"]
         ]
 
     async def search_by_vector_similarity(
-        self, embedding: List[float], size: int = 5, filters: Optional[Dict] = None
+        self,
+        embedding: List[float],
+        size: int = 5,
+        filters: Optional[Dict] = None,
+        effectiveness_boost: Optional[float] = None,
     ) -> List[LearningMaterial]:
-        es = self.es_client
-        knn_query = {
-            "field": "content_embedding",
-            "query_vector": embedding,
-            "k": size,
-            "num_candidates": max(100, size * 10),
-        }
+        if effectiveness_boost is None:
+            effectiveness_boost = settings.effectiveness_rank_boost
         body: Dict[str, Any] = {
-            "knn": knn_query,
+            "knn": self._knn_clause(embedding, size, filters=filters),
             "_source": [
                 "content_text",
                 "url",
@@ -127,11 +307,20 @@ class LearningMaterialRepository:
                 "concept",
             ],
         }
-        if filters:
-            body["query"] = {"bool": {"filter": []}}
-            for key, value in filters.items():
-                body["query"]["bool"]["filter"].append({"term": {key: value}})
-        response = await es.search(index=self.index_name, body=body, size=size)
+        if effectiveness_boost > 0:
+            # knn 후보에 효과 점수를 더하는 한 번의 쿼리 (별도 정렬 없음)
+            knn_query = body.pop("knn")
+            knn_query.pop("k")
+            body["query"] = {
+                "bool": {
+                    "must": [{"knn": knn_query}],
+                    "should": [self._effectiveness_clause(effectiveness_boost)],
+                }
+            }
+        if settings.elasticsearch_knn_rescore and effectiveness_boost <= 0:
+            body["rescore"] = self._rescore_clause(embedding, size)
+        body["size"] = size
+        response = await self._search(body)
         results = []
         for hit in response["hits"]["hits"]:
             material = LearningMaterial.from_elasticsearch_doc(
@@ -144,7 +333,6 @@ class LearningMaterialRepository:
     async def search_by_keyword(
         self, query: str, size: int = 5, filters: Optional[Dict] = None
     ) -> Tuple[List[LearningMaterial], int]:
-        es = self.es_client
         query_body = {
             "query": {
                 "bool": {
@@ -172,7 +360,7 @@ class LearningMaterialRepository:
             query_body["query"]["bool"]["filter"] = []
             for key, value in filters.items():
                 query_body["query"]["bool"]["filter"].append({"term": {key: value}})
-        response = await es.search(index=self.index_name, body=query_body)
+        response = await self._search(query_body)
         results = []
         for hit in response["hits"]["hits"]:
             material = LearningMaterial.from_elasticsearch_doc(
@@ -188,15 +376,11 @@ class LearningMaterialRepository:
         query_embedding: List[float],
         size: int = 5,
         filters: Optional[Dict] = None,
+        effectiveness_boost: Optional[float] = None,
     ) -> Tuple[List[LearningMaterial], int]:
-        es = self.es_client
-        knn_query = {
-            "field": "content_embedding",
-            "query_vector": query_embedding,
-            "k": size,
-            "num_candidates": max(100, size * 10),
-            "boost": 0.8,
-        }
+        if effectiveness_boost is None:
+            effectiveness_boost = settings.effectiveness_rank_boost
+        knn_query = self._knn_clause(query_embedding, size, boost=0.8, filters=filters)
         match_query = {
             "multi_match": {
                 "query": query_text,
@@ -224,7 +408,11 @@ class LearningMaterialRepository:
         }
         if filter_clauses:
             query_body["query"]["bool"]["filter"] = filter_clauses
-        response = await es.search(index=self.index_name, body=query_body)
+        if effectiveness_boost > 0:
+            query_body["query"]["bool"]["should"] = [
+                self._effectiveness_clause(effectiveness_boost)
+            ]
+        response = await self._search(query_body)
         results = []
         for hit in response["hits"]["hits"]:
             material = LearningMaterial.from_elasticsearch_doc(
@@ -236,27 +424,29 @@ class LearningMaterialRepository:
         return results, total_hits
 
     async def update_success_count(self, material_id: str, increment: int = 1):
-        es = self.es_client
-        try:
-            await es.update(
-                index=self.index_name,
-                id=material_id,
-                script={
-                    "source": "ctx._source.success_count += params.count; ctx._source.updated_at = params.now",
-                    "lang": "painless",
-                    "params": {
-                        "count": increment,
-                        "now": datetime.utcnow().isoformat() + "Z",
-                    },
-                },
-            )
-            print(f"Updated success_count for material ID: {material_id}")
-        except Exception as e:
-            print(f"Error updating success_count for {material_id}: {e}")
+        """
+        문서를 바로 갱신하지 않고 write-behind 버퍼에 합칩니다.
+        실제 반영은 EffectivenessWriteBuffer가 주기적으로 bulk update 합니다.
+        """
+        self.effectiveness_buffer.record(material_id, success_increment=increment)
+        materialized_top_k.invalidate_materials([material_id])
+
+    async def record_feedback(
+        self,
+        material_id: str,
+        understanding_score: float,
+        success_increment: int = 0,
+    ):
+        """이해도 점수 피드백을 평균에 반영하도록 버퍼에 기록합니다."""
+        self.effectiveness_buffer.record(
+            material_id,
+            success_increment=success_increment,
+            understanding_score=understanding_score,
+        )
 
     async def is_url_indexed(self, url: str) -> bool:
         es = self.es_client
-        query = {"query": {"term": {"url.keyword": url}}}
+        query = {"query": {"term": {"url": url}}}
         response = await es.search(index=self.index_name, body=query, size=0)
         return response["hits"]["total"]["value"] > 0
 
@@ -267,25 +457,26 @@ class LearningMaterialRepository:
         exclude_ids: Optional[List[str]] = None,
         size: int = 1,
     ) -> Optional[LearningMaterial]:
-        es = self.es_client
+        """
+        미리 계산된 effectiveness_score(rank_feature)로 점수를 매깁니다.
+        정렬 대신 점수 기반 top-k이므로 ES가 block-max WAND로 조기 종료할 수 있습니다.
+        """
         query_body = {
             "query": {
                 "bool": {
                     "filter": [
-                        {"term": {"concept.keyword": concept}},
-                        {"term": {"difficulty_level.keyword": user_level}},
-                    ]
+                        {"term": {"concept": concept}},
+                        {"term": {"difficulty_level": user_level}},
+                    ],
+                    "must": [self._effectiveness_clause()],
                 }
             },
-            "sort": [
-                {"success_count": {"order": "desc"}},
-                {"average_understanding_score": {"order": "desc", "missing": "_last"}},
-            ],
             "size": size,
+            "track_total_hits": False,
         }
         if exclude_ids:
             query_body["query"]["bool"]["must_not"] = [{"ids": {"values": exclude_ids}}]
-        response = await es.search(index=self.index_name, body=query_body)
+        response = await self._search(query_body)
         if response["hits"]["hits"]:
             material = LearningMaterial.from_elasticsearch_doc(
                 response["hits"]["hits"][0]["_id"],
@@ -0,0 +1,401 @@
+"""
+Elasticsearch 없이 동작하는 인-프로세스 검색 인덱스
+
+- VectorMatrix: 연속된 float32(선택적으로 int8 + 행별 scale) 행렬, 벡터화된 top-k
+- BM25Index: 필드별 역색인(array 기반 posting), ES와 같은 BM25(k1=1.2, b=0.75)
+- LocalMaterialStore: 문서 원본 + keyword 필터 색인 + 위 두 인덱스, 디렉터리로 저장/로드
+
+저장 시 벡터는 .npy로 쓰고 로드할 때 memory-map으로 열기 때문에 시작 시간과
+상주 메모리가 문서 수에 비해 작습니다. 역색인은 로드할 때 문서로부터 다시 만듭니다.
+"""
+import json
+import math
+import os
+import re
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# ES standard analyzer에 가까운 토크나이저 (소문자 + 유니코드 단어 단위)
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# term 필터로 사용할 수 있는 keyword 필드
+FILTER_FIELDS = ("concept", "difficulty_level", "material_type", "source", "url", "tags")
+
+# 한 번에 점수를 계산할 행 수 (int8 → float 변환 시 임시 메모리 제한)
+SCORE_BLOCK_ROWS = 65536
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 내림차순 상위 k개 행 번호 (-inf는 제외)"""
+    valid = np.flatnonzero(np.isfinite(scores))
+    if valid.size == 0 or k <= 0:
+        return valid[:0]
+    if valid.size > k:
+        part = np.argpartition(-scores[valid], k - 1)[:k]
+        valid = valid[part]
+    return valid[np.argsort(-scores[valid], kind="stable")]
+
+
+class VectorMatrix:
+    def __init__(self, dimension: int, similarity: str = "dot_product", quantization: str = "none"):
+        if quantization not in ("none", "int8"):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        self.dimension = dimension
+        self.similarity = similarity
+        self.quantization = quantization
+        dtype = np.int8 if quantization == "int8" else np.float32
+        self._data = np.zeros((0, dimension), dtype=dtype)
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self.size = 0
+
+    def _reserve(self, rows: int) -> None:
+        capacity = self._data.shape[0]
+        if rows <= capacity and self._data.flags.writeable:
+            return
+        new_capacity = max(rows, capacity * 2, 1024)
+        data = np.zeros((new_capacity, self.dimension), dtype=self._data.dtype)
+        data[: self.size] = self._data[: self.size]
+        scales = np.zeros(new_capacity, dtype=np.float32)
+        scales[: self.size] = self._scales[: self.size]
+        norms = np.zeros(new_capacity, dtype=np.float32)
+        norms[: self.size] = self._norms[: self.size]
+        self._data, self._scales, self._norms = data, scales, norms
+
+    def append(self, vector: Iterable[float]) -> int:
+        row = self.size
+        self._reserve(row + 1)
+        self.set(row, vector)
+        self.size += 1
+        return row
+
+    def set(self, row: int, vector: Iterable[float]) -> None:
+        values = np.asarray(vector, dtype=np.float32)
+        if values.shape != (self.dimension,):
+            values = np.zeros(self.dimension, dtype=np.float32)
+        if self.quantization == "int8":
+            scale = float(np.abs(values).max()) / 127.0 or 1.0
+            self._data[row] = np.round(values / scale).astype(np.int8)
+            self._scales[row] = scale
+        else:
+            self._data[row] = values
+            self._scales[row] = 1.0
+        # 로드 시와 같도록 저장된(양자화된) 값으로 norm 계산
+        self._norms[row] = float(np.linalg.norm(self.get(row)))
+
+    def get(self, row: int) -> np.ndarray:
+        return self._data[row].astype(np.float32) * self._scales[row]
+
+    def scores(self, query: Iterable[float]) -> np.ndarray:
+        """ES knn과 같은 스케일의 점수 (dot_product/cosine: (1+s)/2, l2_norm: 1/(1+d²))"""
+        q = np.asarray(query, dtype=np.float32)
+        out = np.empty(self.size, dtype=np.float32)
+        for start in range(0, self.size, SCORE_BLOCK_ROWS):
+            end = min(self.size, start + SCORE_BLOCK_ROWS)
+            out[start:end] = (self._data[start:end] @ q) * self._scales[start:end]
+        if self.similarity == "l2_norm":
+            squared = self._norms[: self.size] ** 2 - 2 * out + float(q @ q)
+            return 1.0 / (1.0 + np.maximum(squared, 0.0))
+        if self.similarity == "cosine":
+            denom = self._norms[: self.size] * (float(np.linalg.norm(q)) or 1.0)
+            out = out / np.where(denom == 0, 1.0, denom)
+        return (1.0 + out) / 2.0
+
+    def save(self, path: str) -> None:
+        for name, values in (
+            ("vectors.npy", self._data[: self.size]),
+            ("scales.npy", self._scales[: self.size]),
+        ):
+            target = os.path.join(path, name)
+            # 파일 객체로 저장해야 np.save가 .npy 확장자를 덧붙이지 않음
+            with open(_tmp(target), "wb") as f:
+                np.save(f, values)
+            os.replace(_tmp(target), target)
+
+    def load(self, path: str, size: int) -> None:
+        self._data = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self._scales = np.load(os.path.join(path, "scales.npy"))
+        self.size = size
+        norms = np.empty(size, dtype=np.float32)
+        for start in range(0, size, SCORE_BLOCK_ROWS):
+            end = min(size, start + SCORE_BLOCK_ROWS)
+            block = self._data[start:end].astype(np.float32)
+            norms[start:end] = np.linalg.norm(block, axis=1) * self._scales[start:end]
+        self._norms = norms
+
+
+class BM25Index:
+    """필드별 역색인. posting은 (행 번호, tf) array 쌍입니다."""
+
+    TEXT_FIELDS = ("content_text", "title")
+    # keyword 필드는 값 전체가 하나의 토큰 (ES keyword와 같은 정확 일치)
+    KEYWORD_FIELDS = ("concept",)
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, Tuple[array, array]]] = {
+            field: {} for field in self.TEXT_FIELDS + self.KEYWORD_FIELDS
+        }
+        self._lengths: Dict[str, array] = {
+            field: array("I") for field in self.TEXT_FIELDS + self.KEYWORD_FIELDS
+        }
+
+    def _field_tokens(self, field: str, source: Dict[str, Any]) -> List[str]:
+        value = source.get(field)
+        if field in self.KEYWORD_FIELDS:
+            return [value] if value else []
+        return tokenize(value)
+
+    def add(self, row: int, source: Dict[str, Any]) -> None:
+        for field, postings in self._postings.items():
+            tokens = self._field_tokens(field, source)
+            lengths = self._lengths[field]
+            while len(lengths) <= row:
+                lengths.append(0)
+            lengths[row] = len(tokens)
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                rows, tfs = postings.setdefault(token, (array("i"), array("H")))
+                rows.append(row)
+                tfs.append(min(tf, 65535))
+
+    def score(
+        self,
+        query: str,
+        alive: np.ndarray,
+        fields: Tuple[str, ...] = TEXT_FIELDS + KEYWORD_FIELDS,
+    ) -> np.ndarray:
+        """multi_match(best_fields)와 같이 필드별 BM25 중 최댓값"""
+        size = alive.shape[0]
+        best = np.zeros(size, dtype=np.float32)
+        for field in fields:
+            tokens = [query.strip()] if field in self.KEYWORD_FIELDS else tokenize(query)
+            if not tokens:
+                continue
+            lengths = np.frombuffer(self._lengths[field], dtype=np.uint32)[:size].astype(np.float32)
+            has_field = alive[: lengths.shape[0]] & (lengths > 0)
+            doc_count = int(has_field.sum())
+            if doc_count == 0:
+                continue
+            avg_length = float(lengths[has_field].mean())
+            field_scores = np.zeros(size, dtype=np.float32)
+            for token in tokens:
+                posting = self._postings[field].get(token)
+                if posting is None:
+                    continue
+                rows = np.frombuffer(posting[0], dtype=np.int32)
+                rows = rows[rows < size]
+                tfs = np.frombuffer(posting[1], dtype=np.uint16)[: rows.shape[0]].astype(np.float32)
+                live = alive[rows]
+                rows, tfs = rows[live], tfs[live]
+                df = rows.shape[0]
+                if df == 0:
+                    continue
+                idf = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+                if field in self.KEYWORD_FIELDS:
+                    # keyword 필드는 norms가 없어 길이 정규화를 하지 않음
+                    norm = np.ones_like(tfs)
+                else:
+                    norm = 1.0 - BM25_B + BM25_B * lengths[rows] / avg_length
+                field_scores[rows] += idf * tfs * (BM25_K1 + 1.0) / (tfs + BM25_K1 * norm)
+            np.maximum(best, field_scores, out=best)
+        return best
+
+
+class LocalMaterialStore:
+    """학습 자료 문서 저장소 (id ↔ 행 번호, 원본, 필터 색인, 벡터, BM25)"""
+
+    def __init__(self, path: str, dimension: int, similarity: str, quantization: str = "none"):
+        self.path = path
+        self.meta: Dict[str, Any] = {}
+        self.vectors = VectorMatrix(dimension, similarity, quantization)
+        self.bm25 = BM25Index()
+        self._ids: List[str] = []
+        self._sources: List[Optional[Dict[str, Any]]] = []
+        self._rows: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        # rank_feature(effectiveness_score) 점수용 열
+        self._effectiveness = np.zeros(0, dtype=np.float32)
+        self._keywords: Dict[str, Dict[Any, Set[int]]] = {field: {} for field in FILTER_FIELDS}
+        self.dirty = False
+
+    @property
+    def size(self) -> int:
+        return len(self._ids)
+
+    @property
+    def alive(self) -> np.ndarray:
+        return self._alive[: self.size]
+
+    @property
+    def effectiveness(self) -> np.ndarray:
+        return self._effectiveness[: self.size]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _grow(self, row: int) -> None:
+        if self._alive.shape[0] > row:
+            return
+        capacity = max(row + 1, self._alive.shape[0] * 2, 1024)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: self._alive.shape[0]] = self._alive
+        effectiveness = np.zeros(capacity, dtype=np.float32)
+        effectiveness[: self._effectiveness.shape[0]] = self._effectiveness
+        self._alive, self._effectiveness = alive, effectiveness
+
+    def _add_row(self, doc_id: str, source: Dict[str, Any]) -> int:
+        row = len(self._ids)
+        self._ids.append(doc_id)
+        self._sources.append(source)
+        self._rows[doc_id] = row
+        self._grow(row)
+        self._alive[row] = True
+        self._effectiveness[row] = source.get("effectiveness_score") or 0.0
+        self.bm25.add(row, source)
+        self._index_keywords(row, source, add=True)
+        return row
+
+    def _index_keywords(self, row: int, source: Dict[str, Any], add: bool) -> None:
+        for field in FILTER_FIELDS:
+            values = source.get(field)
+            if values is None:
+                continue
+            for value in values if isinstance(values, list) else [values]:
+                rows = self._keywords[field].setdefault(value, set())
+                if add:
+                    rows.add(row)
+                else:
+                    rows.discard(row)
+
+    def upsert(self, doc_id: str, source: Dict[str, Any]) -> None:
+        """같은 id가 있으면 이전 행을 지우고 새 행을 추가합니다. (ES의 문서 재색인과 동일)"""
+        self.delete(doc_id)
+        source = dict(source)
+        embedding = source.pop("content_embedding", None)
+        self.vectors.append(embedding if embedding else [])
+        self._add_row(doc_id, source)
+        self.dirty = True
+
+    def update_source(self, doc_id: str, fields: Dict[str, Any]) -> bool:
+        """색인 대상이 아닌 필드(카운터 등)만 제자리에서 갱신합니다."""
+        row = self._rows.get(doc_id)
+        if row is None:
+            return False
+        self._sources[row].update(fields)
+        if "effectiveness_score" in fields:
+            self._effectiveness[row] = fields["effectiveness_score"] or 0.0
+        self.dirty = True
+        return True
+
+    def delete(self, doc_id: str) -> bool:
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._index_keywords(row, self._sources[row], add=False)
+        self._sources[row] = None
+        self.dirty = True
+        return True
+
+    def row_of(self, doc_id: str) -> Optional[int]:
+        return self._rows.get(doc_id)
+
+    def id_of(self, row: int) -> str:
+        return self._ids[row]
+
+    def source(self, row: int, with_embedding: bool = False) -> Dict[str, Any]:
+        source = dict(self._sources[row])
+        if with_embedding:
+            source["content_embedding"] = self.vectors.get(row).tolist()
+        return source
+
+    def filter_mask(self, filters: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """term 필터(AND)에 맞는 살아있는 행"""
+        mask = self.alive.copy()
+        for field, value in (filters or {}).items():
+            matched = np.zeros(self.size, dtype=bool)
+            if field in self._keywords:
+                rows = self._keywords[field].get(value)
+                if rows:
+                    matched[list(rows)] = True
+            else:
+                for row in np.flatnonzero(mask):
+                    matched[row] = self._sources[row].get(field) == value
+            mask &= matched
+        return mask
+
+    # ------------------------------------------------------------------
+    # 저장 / 로드
+    # ------------------------------------------------------------------
+    def save(self) -> None:
+        """살아있는 행만 모아(compaction) 디렉터리에 씁니다."""
+        os.makedirs(self.path, exist_ok=True)
+        rows = np.flatnonzero(self.alive)
+        compact = VectorMatrix(
+            self.vectors.dimension, self.vectors.similarity, self.vectors.quantization
+        )
+        compact._data = np.ascontiguousarray(self.vectors._data[rows])
+        compact._scales = np.ascontiguousarray(self.vectors._scales[rows])
+        compact.size = rows.shape[0]
+        compact.save(self.path)
+
+        docs_path = os.path.join(self.path, "docs.jsonl")
+        with open(_tmp(docs_path), "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps({"_id": self._ids[row], "_source": self._sources[row]}, ensure_ascii=False, default=str))
+                f.write("\n")
+        os.replace(_tmp(docs_path), docs_path)
+
+        meta_path = os.path.join(self.path, "meta.json")
+        meta = {
+            **self.meta,
+            "count": int(rows.shape[0]),
+            "dimension": self.vectors.dimension,
+            "similarity": self.vectors.similarity,
+            "quantization": self.vectors.quantization,
+        }
+        with open(_tmp(meta_path), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(_tmp(meta_path), meta_path)
+        self.meta = meta
+        self.dirty = False
+
+    @classmethod
+    def load_or_create(
+        cls, path: str, dimension: int, similarity: str, quantization: str = "none"
+    ) -> "LocalMaterialStore":
+        store = cls(path, dimension, similarity, quantization)
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return store
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("dimension") != dimension or meta.get("quantization") != quantization:
+            raise ValueError(
+                f"Local index at {path} has dimension={meta.get('dimension')}, "
+                f"quantization={meta.get('quantization')}; expected {dimension}, {quantization}"
+            )
+        store.meta = meta
+        store.vectors.load(path, meta["count"])
+        with open(os.path.join(path, "docs.jsonl"), encoding="utf-8") as f:
+            for line in f:
+                doc = json.loads(line)
+                store._add_row(doc["_id"], doc["_source"])
+        return store
+
+
+def _tmp(path: str) -> str:
+    return path + ".tmp"
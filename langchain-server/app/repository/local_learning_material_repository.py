@@ -0,0 +1,259 @@
+"""
+Elasticsearch 없이 동작하는 LearningMaterialRepository 구현 (RETRIEVAL_BACKEND=local)
+
+LearningMaterialRepository와 같은 메서드/반환 형식을 제공하며, 점수도 ES와 같은
+식(knn 유사도 변환, BM25 best_fields, rank_feature saturation)으로 계산합니다.
+로컬 벤치마크와 단일 노드 소규모 배포용입니다.
+"""
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.entity.learning_material import LearningMaterial
+from app.repository.local_index import LocalMaterialStore, top_k
+from app.repository.materialized_top_k import materialized_top_k
+from app.services.embedding_service import EmbeddingService
+from app.services.search_result_cache import search_result_cache
+from app.utils.effectiveness import compute_effectiveness_score
+
+SEARCH_SOURCE_FIELDS = (
+    "content_text",
+    "url",
+    "title",
+    "material_type",
+    "difficulty_level",
+    "concept",
+)
+
+# 같은 디렉터리를 쓰는 저장소는 프로세스 안에서 공유 (도구마다 리포지토리를 따로 만들기 때문)
+_stores: Dict[str, LocalMaterialStore] = {}
+
+
+def get_local_store(dimension: int) -> LocalMaterialStore:
+    path = settings.local_index_dir
+    store = _stores.get(path)
+    if store is None:
+        store = LocalMaterialStore.load_or_create(
+            path,
+            dimension=dimension,
+            similarity=settings.elasticsearch_vector_similarity,
+            quantization=settings.local_index_quantization,
+        )
+        _stores[path] = store
+        print(f"[LocalIndex] Loaded {len(store)} learning materials from {path}")
+    return store
+
+
+def persist_local_stores() -> None:
+    for path, store in _stores.items():
+        if store.dirty:
+            store.save()
+            print(f"[LocalIndex] Saved {len(store)} learning materials to {path}")
+
+
+def _saturation(store: LocalMaterialStore) -> np.ndarray:
+    """rank_feature saturation: S / (S + pivot)"""
+    values = store.effectiveness
+    return values / (values + settings.effectiveness_rank_pivot)
+
+
+class LocalLearningMaterialRepository:
+    def __init__(self, embedding_service: EmbeddingService, store: Optional[LocalMaterialStore] = None):
+        self.es_client = None
+        self.embedding_service = embedding_service
+        self.index_name = settings.elasticsearch_index_learning_materials
+        self.vector_dim = self.embedding_service.embedding_dimension
+        self.store = store or get_local_store(self.vector_dim)
+
+    async def create_index(self):
+        if not self.store.meta.get("embedding_model"):
+            self.store.meta["embedding_model"] = self.embedding_service.embedding_model
+
+    def save(self) -> None:
+        self.store.save()
+
+    def _to_material(self, row: int, score: Optional[float] = None, fields=None) -> LearningMaterial:
+        source = self.store.source(row)
+        if fields is not None:
+            source = {key: source[key] for key in fields if key in source}
+            source.setdefault("concept", "")
+            source.setdefault("content_text", "")
+            source.setdefault("url", "")
+            source.setdefault("title", "")
+        material = LearningMaterial.from_elasticsearch_doc(self.store.id_of(row), source)
+        if score is not None:
+            material.score = float(score)
+        return material
+
+    async def save_material(self, material: LearningMaterial) -> str:
+        material_id = material.id or uuid.uuid4().hex
+        self.store.upsert(material_id, material.to_elasticsearch_doc())
+        print(f"Saved learning material with ID: {material_id}")
+        search_result_cache.bump_version("save_material")
+        return material_id
+
+    async def bulk_save_materials(self, materials: List[LearningMaterial]):
+        for material in materials:
+            self.store.upsert(material.id or uuid.uuid4().hex, material.to_elasticsearch_doc())
+        print(f"Bulk saved {len(materials)} learning materials.")
+        search_result_cache.bump_version("bulk_save_materials")
+        materialized_top_k.invalidate_concepts({material.concept for material in materials})
+
+    async def get_material_by_id(self, material_id: str) -> Optional[LearningMaterial]:
+        row = self.store.row_of(material_id)
+        if row is None:
+            return None
+        return LearningMaterial.from_elasticsearch_doc(
+            material_id, self.store.source(row, with_embedding=True)
+        )
+
+    async def search_materials_by_concept(
+        self, concept: str, size: int = 5
+    ) -> List[LearningMaterial]:
+        scores = self.store.bm25.score(concept, self.store.alive, fields=("concept",))
+        scores = np.where(scores > 0, scores, -np.inf)
+        return [self._to_material(row) for row in top_k(scores, size)]
+
+    def _vector_candidates(
+        self, embedding: List[float], mask: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """필터를 먼저 적용한(pre-filtered) 정확한 kNN 상위 k개 행과 유사도"""
+        similarity = self.store.vectors.scores(embedding)
+        similarity = np.where(mask, similarity, -np.inf)
+        rows = top_k(similarity, k)
+        return rows, similarity
+
+    async def search_by_vector_similarity(
+        self,
+        embedding: List[float],
+        size: int = 5,
+        filters: Optional[Dict] = None,
+        effectiveness_boost: Optional[float] = None,
+    ) -> List[LearningMaterial]:
+        if effectiveness_boost is None:
+            effectiveness_boost = settings.effectiveness_rank_boost
+        mask = self.store.filter_mask(filters)
+        if effectiveness_boost > 0:
+            candidates, similarity = self._vector_candidates(
+                embedding, mask, max(100, size * 10)
+            )
+            scores = np.full(self.store.size, -np.inf, dtype=np.float32)
+            scores[candidates] = (
+                similarity[candidates]
+                + effectiveness_boost * _saturation(self.store)[candidates]
+            )
+            rows = top_k(scores, size)
+        else:
+            rows, scores = self._vector_candidates(embedding, mask, size)
+        return [self._to_material(row, scores[row], SEARCH_SOURCE_FIELDS) for row in rows]
+
+    async def search_by_keyword(
+        self, query: str, size: int = 5, filters: Optional[Dict] = None
+    ) -> Tuple[List[LearningMaterial], int]:
+        mask = self.store.filter_mask(filters)
+        scores = self.store.bm25.score(query, self.store.alive)
+        scores = np.where(mask & (scores > 0), scores, -np.inf)
+        total = int(np.isfinite(scores).sum())
+        results = [
+            self._to_material(row, scores[row], SEARCH_SOURCE_FIELDS)
+            for row in top_k(scores, size)
+        ]
+        return results, total
+
+    async def hybrid_search(
+        self,
+        query_text: str,
+        query_embedding: List[float],
+        size: int = 5,
+        filters: Optional[Dict] = None,
+        effectiveness_boost: Optional[float] = None,
+    ) -> Tuple[List[LearningMaterial], int]:
+        """
+        ES와 같은 결합: knn(boost 0.8) 상위 k개와 multi_match(boost 0.2) 일치 문서의 합집합,
+        점수는 두 점수의 합. 효과 점수는 텍스트 일치 문서에만 더해집니다.
+        (로컬 구현은 fuzziness를 지원하지 않습니다.)
+        """
+        if effectiveness_boost is None:
+            effectiveness_boost = settings.effectiveness_rank_boost
+        mask = self.store.filter_mask(filters)
+        knn_rows, similarity = self._vector_candidates(query_embedding, mask, size)
+        text_scores = self.store.bm25.score(query_text, self.store.alive)
+        text_matched = mask & (text_scores > 0)
+
+        scores = np.zeros(self.store.size, dtype=np.float32)
+        scores[text_matched] = 0.2 * text_scores[text_matched]
+        if effectiveness_boost > 0:
+            scores[text_matched] += (
+                effectiveness_boost * _saturation(self.store)[text_matched]
+            )
+        scores[knn_rows] += 0.8 * similarity[knn_rows]
+        matched = text_matched.copy()
+        matched[knn_rows] = True
+        scores = np.where(matched, scores, -np.inf)
+        results = [
+            self._to_material(row, scores[row], SEARCH_SOURCE_FIELDS)
+            for row in top_k(scores, size)
+        ]
+        return results, int(matched.sum())
+
+    def _apply_feedback(
+        self, material_id: str, success_increment: int, understanding_score: Optional[float]
+    ) -> None:
+        row = self.store.row_of(material_id)
+        if row is None:
+            print(f"[LocalIndex] Material not found: {material_id}")
+            return
+        source = self.store.source(row)
+        success = (source.get("success_count") or 0) + success_increment
+        attempts = source.get("total_attempts_count") or 0
+        average = source.get("average_understanding_score")
+        if understanding_score is not None:
+            average = ((average or 0.0) * attempts + understanding_score) / (attempts + 1)
+            attempts += 1
+        self.store.update_source(
+            material_id,
+            {
+                "success_count": success,
+                "total_attempts_count": attempts,
+                "average_understanding_score": average,
+                "effectiveness_score": compute_effectiveness_score(success, attempts, average),
+                "updated_at": datetime.utcnow().isoformat() + "Z",
+            },
+        )
+
+    async def update_success_count(self, material_id: str, increment: int = 1):
+        """메모리에서 바로 반영하므로 write-behind 버퍼가 필요 없습니다."""
+        self._apply_feedback(material_id, increment, None)
+        materialized_top_k.invalidate_materials([material_id])
+
+    async def record_feedback(
+        self,
+        material_id: str,
+        understanding_score: float,
+        success_increment: int = 0,
+    ):
+        self._apply_feedback(material_id, success_increment, understanding_score)
+
+    async def is_url_indexed(self, url: str) -> bool:
+        return bool(self.store.filter_mask({"url": url}).any())
+
+    async def search_and_sort_by_effectiveness(
+        self,
+        concept: str,
+        user_level: str,
+        exclude_ids: Optional[List[str]] = None,
+        size: int = 1,
+    ) -> Optional[LearningMaterial]:
+        mask = self.store.filter_mask({"concept": concept, "difficulty_level": user_level})
+        for material_id in exclude_ids or []:
+            row = self.store.row_of(material_id)
+            if row is not None:
+                mask[row] = False
+        scores = np.where(mask, _saturation(self.store), -np.inf)
+        rows = top_k(scores, 1)
+        if rows.size == 0:
+            return None
+        return self._to_material(rows[0], scores[rows[0]])
@@ -0,0 +1,224 @@
+"""
+(concept, difficulty_level)별 상위 k개 학습 자료를 미리 계산해 두는 테이블
+
+에이전트는 같은 concept을 difficulty 우선순위 몇 개로 반복해서 검색하고,
+결과는 크롤링 사이에 거의 바뀌지 않습니다. 문제 텍스트가 일반적인 경우
+(concept 외에 구체적인 내용이 거의 없는 경우) 문제 임베딩과 kNN 검색 대신
+이 테이블에서 바로 돌려줍니다.
+
+- 항목은 concept 자체의 임베딩으로 search_by_vector_similarity를 돌린 결과입니다.
+- bulk_save_materials / update_success_count 후 해당 concept의 항목을 dirty로
+  표시하고, 백그라운드 루프가 잠시 뒤(효과 카운터 flush 이후) 다시 계산합니다.
+- 재계산 중에는 이전 결과를 그대로 제공합니다.
+- 키는 최대 materialized_topk_max_entries개(LRU)까지 유지하고, 마지막 계산 이후 한 번도
+  조회되지 않은 키는 다시 계산하지 않고 제거합니다. (요청 종류만큼 ES 부하가 늘지 않도록)
+"""
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.entity.learning_material import LearningMaterial
+
+TopKKey = Tuple[str, str]
+
+
+@dataclass
+class TopKEntry:
+    materials: List[LearningMaterial] = field(default_factory=list)
+    built_at: float = 0.0
+    # 마지막 계산 이후 조회 여부 (조회되지 않은 항목은 재계산하지 않고 제거)
+    read: bool = False
+
+
+def is_generic_problem_text(problem_text: Optional[str], concept: str) -> bool:
+    """concept 단어를 뺀 나머지 토큰이 기준 이하이면 일반적인 문제 텍스트로 봅니다."""
+    tokens = re.findall(r"\w+", (problem_text or "").lower())
+    concept_tokens = set(re.findall(r"\w+", concept.lower()))
+    extra = [token for token in tokens if token not in concept_tokens]
+    return len(extra) <= settings.materialized_topk_generic_max_tokens
+
+
+class MaterializedTopK:
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        rebuild_delay: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.size = size or settings.materialized_topk_size
+        self.max_entries = max_entries or settings.materialized_topk_max_entries
+        self.rebuild_delay = (
+            rebuild_delay
+            if rebuild_delay is not None
+            else settings.materialized_topk_rebuild_delay_seconds
+        )
+        self.max_age = settings.materialized_topk_max_age_seconds
+        self.repository = None
+        self._entries: Dict[TopKKey, TopKEntry] = {}
+        # 테이블에 있는 키 (가장 오래 조회되지 않은 순)
+        self._keys: "OrderedDict[TopKKey, None]" = OrderedDict()
+        self._material_keys: Dict[str, Set[TopKKey]] = {}
+        self._dirty: Dict[TopKKey, float] = {}
+        self._concept_embeddings: Dict[str, List[float]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def start(self, repository) -> None:
+        """재계산에 사용할 리포지토리를 지정하고 백그라운드 루프를 시작합니다."""
+        self.repository = repository
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def get(self, concept: str, difficulty_level: str) -> Optional[List[LearningMaterial]]:
+        """계산된 항목이 있으면 그 목록(빈 목록 포함), 없으면 None"""
+        key = (concept, difficulty_level)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            self.request(key)
+            return None
+        self.hits += 1
+        entry.read = True
+        self._keys.move_to_end(key)
+        return entry.materials
+
+    def request(self, key: TopKKey) -> None:
+        """처음 조회된 키를 테이블에 추가하도록 예약합니다."""
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return
+        self._keys[key] = None
+        self._mark_dirty([key], delay=0.0)
+        while len(self._keys) > self.max_entries:
+            self._drop(next(iter(self._keys)))
+
+    def _drop(self, key: TopKKey) -> None:
+        """키와 그 항목, 예약된 재계산, 더 이상 쓰이지 않는 concept 임베딩을 지웁니다."""
+        self._keys.pop(key, None)
+        self._dirty.pop(key, None)
+        entry = self._entries.pop(key, None)
+        for material in entry.materials if entry else []:
+            keys = self._material_keys.get(material.id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._material_keys[material.id]
+        concept = key[0]
+        if not any(other[0] == concept for other in self._keys):
+            self._concept_embeddings.pop(concept, None)
+        self.evictions += 1
+
+    def invalidate_concepts(self, concepts: Iterable[str]) -> None:
+        concepts = set(concepts)
+        self._mark_dirty([key for key in self._keys if key[0] in concepts])
+
+    def invalidate_materials(self, material_ids: Iterable[str]) -> None:
+        keys: Set[TopKKey] = set()
+        for material_id in material_ids:
+            keys |= self._material_keys.get(material_id, set())
+        self._mark_dirty(keys)
+
+    def _mark_dirty(self, keys: Iterable[TopKKey], delay: Optional[float] = None) -> None:
+        due = time.monotonic() + (self.rebuild_delay if delay is None else delay)
+        marked = False
+        for key in keys:
+            # 이미 예약된 재계산은 앞당기지 않고 그대로 둠 (연속 갱신은 한 번으로 합침)
+            self._dirty.setdefault(key, due)
+            marked = True
+        if marked:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            due = [key for key, at in self._dirty.items() if at <= now]
+            for key, entry in self._entries.items():
+                if key not in self._dirty and now - entry.built_at > self.max_age:
+                    due.append(key)
+            for key in due:
+                entry = self._entries.get(key)
+                if entry is not None and not entry.read:
+                    # 마지막 계산 이후 조회되지 않은 키는 다시 계산하지 않음
+                    self._drop(key)
+                    continue
+                try:
+                    await self.rebuild(key)
+                except Exception as e:
+                    print(f"[MaterializedTopK] Rebuild error for {key}: {e}")
+                    self._dirty[key] = time.monotonic() + self.rebuild_delay
+            timeout = min(
+                [at - time.monotonic() for at in self._dirty.values()] + [self.max_age]
+            )
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0.05))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _concept_embedding(self, concept: str) -> Optional[List[float]]:
+        embedding = self._concept_embeddings.get(concept)
+        if embedding is None:
+            embedding = await self.repository.embedding_service.get_embedding(concept)
+            if embedding:
+                self._concept_embeddings[concept] = embedding
+        return embedding
+
+    async def rebuild(self, key: TopKKey) -> None:
+        self._dirty.pop(key, None)
+        if self.repository is None or key not in self._keys:
+            return
+        concept, difficulty_level = key
+        embedding = await self._concept_embedding(concept)
+        if not embedding:
+            raise ValueError("concept 임베딩 생성 실패")
+        materials = await self.repository.search_by_vector_similarity(
+            embedding=embedding,
+            size=self.size,
+            filters={
+                "concept": concept,
+                "difficulty_level": difficulty_level,
+            },
+        )
+        previous = self._entries.get(key)
+        for material in previous.materials if previous else []:
+            keys = self._material_keys.get(material.id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._material_keys[material.id]
+        for material in materials:
+            self._material_keys.setdefault(material.id, set()).add(key)
+        self._entries[key] = TopKEntry(materials=materials, built_at=time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "keys": len(self._keys),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "pending_rebuilds": len(self._dirty),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 싱글톤 인스턴스
+materialized_top_k = MaterializedTopK()
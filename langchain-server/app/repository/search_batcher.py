@@ -0,0 +1,113 @@
+"""
+동시에 들어온 검색을 모아 _msearch 한 번으로 보내는 배처
+
+수업 시간처럼 요청이 몰리면 요청마다 kNN 검색 HTTP 호출이 따로 나갑니다.
+첫 검색이 들어오면 window_ms 동안(또는 max_batch개가 찰 때까지) 모았다가
+_msearch로 보내고, 응답을 순서대로 각 호출자에게 돌려줍니다.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from elasticsearch import AsyncElasticsearch
+
+from app.core.config import settings
+
+
+class MultiSearchItemError(Exception):
+    """_msearch 안의 개별 검색이 실패한 경우"""
+
+    def __init__(self, status: int, error: Any):
+        super().__init__(f"msearch item failed ({status}): {error}")
+        self.status = status
+        self.error = error
+
+
+class SearchBatcher:
+    def __init__(
+        self,
+        es_client: AsyncElasticsearch,
+        window_ms: Optional[float] = None,
+        max_batch: Optional[int] = None,
+    ):
+        self.es_client = es_client
+        self.window = (
+            window_ms if window_ms is not None else settings.elasticsearch_msearch_window_ms
+        ) / 1000
+        self.max_batch = max_batch or settings.elasticsearch_msearch_max_batch
+        self._pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # 전송 중인 배치 태스크 (참조를 유지해야 도중에 GC되지 않음)
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.requests = 0
+
+    async def search(self, index: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((index, body, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_now)
+        return await future
+
+    def _flush_now(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]) -> None:
+        self.batches += 1
+        self.requests += len(batch)
+        try:
+            if len(batch) == 1:
+                index, body, future = batch[0]
+                response = await self.es_client.search(index=index, body=body)
+                if not future.done():
+                    future.set_result(response)
+                return
+            searches: List[Dict[str, Any]] = []
+            for index, body, _ in batch:
+                searches.append({"index": index})
+                searches.append(body)
+            response = await self.es_client.msearch(searches=searches)
+            for (_, _, future), item in zip(batch, response["responses"]):
+                if future.done():
+                    continue
+                if "error" in item:
+                    future.set_exception(MultiSearchItemError(item.get("status", 500), item["error"]))
+                else:
+                    future.set_result(item)
+        except asyncio.CancelledError:
+            for _, _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            # 응답 처리 중 오류까지 포함해 호출자가 영원히 기다리지 않도록 남은 future에 전달
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "average_batch_size": self.requests / self.batches if self.batches else 0.0,
+        }
+
+
+_batchers: Dict[int, SearchBatcher] = {}
+
+
+def get_search_batcher(es_client: AsyncElasticsearch) -> SearchBatcher:
+    """클라이언트마다 하나의 배처 (요청마다 만들어지는 리포지토리가 공유)"""
+    batcher = _batchers.get(id(es_client))
+    if batcher is None or batcher.es_client is not es_client:
+        batcher = SearchBatcher(es_client)
+        _batchers[id(es_client)] = batcher
+    return batcher
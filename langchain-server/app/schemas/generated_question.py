@@ -0,0 +1,114 @@
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field, field_validator
+
+PLACEHOLDER_OPTIONS = {"선택지1", "선택지2", "선택지3", "선택지4"}
+
+# Gemini JSON 모드(response_schema)에 넘기는 스키마. 세부 제약은 GeneratedQuestion에서 검증
+QUESTION_BATCH_RESPONSE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "questions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "question": {"type": "string"},
+                    "options": {"type": "array", "items": {"type": "string"}},
+                    "answer_index": {"type": "integer"},
+                    "explanation": {"type": "string"},
+                },
+                "required": ["question", "options", "answer_index", "explanation"],
+            },
+        }
+    },
+    "required": ["questions"],
+}
+
+
+OPEN_QUESTION_BATCH_RESPONSE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "questions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "question": {"type": "string"},
+                    "answer": {"type": "string"},
+                    "explanation": {"type": "string"},
+                },
+                "required": ["question", "answer", "explanation"],
+            },
+        }
+    },
+    "required": ["questions"],
+}
+
+
+class GeneratedQuestion(BaseModel):
+    """LLM이 생성한 객관식 문제 (보기 4개, 정답 번호 1~4)"""
+
+    question: str = Field(..., min_length=1)
+    options: List[str] = Field(..., min_length=4, max_length=4)
+    answer_index: int = Field(..., ge=1, le=4)
+    explanation: str = Field(..., min_length=1)
+
+    @field_validator("question", "explanation")
+    @classmethod
+    def strip_text(cls, value: str) -> str:
+        value = value.strip()
+        if not value:
+            raise ValueError("빈 문자열")
+        return value
+
+    @field_validator("options")
+    @classmethod
+    def distinct_options(cls, value: List[str]) -> List[str]:
+        value = [option.strip() for option in value]
+        if any(not option for option in value) or len(set(value)) != len(value):
+            raise ValueError("보기는 비어 있지 않고 서로 달라야 합니다")
+        if PLACEHOLDER_OPTIONS & set(value):
+            raise ValueError("임시 선택지")
+        return value
+
+    def to_result(self, difficulty: str) -> Dict[str, Any]:
+        """generate_question_with_rag 결과와 같은 형식"""
+        return {
+            "success": True,
+            "message": "문제 생성이 완료되었습니다.",
+            "question": self.question,
+            "correct_answer": str(self.answer_index),
+            "explanation": self.explanation,
+            "options": self.options,
+            "difficulty": difficulty,
+            "question_type": "객관식",
+        }
+
+
+class GeneratedOpenQuestion(BaseModel):
+    """LLM이 생성한 주관식 문제"""
+
+    question: str = Field(..., min_length=1)
+    answer: str = Field(..., min_length=1)
+    explanation: str = Field(..., min_length=1)
+
+    @field_validator("question", "answer", "explanation")
+    @classmethod
+    def strip_text(cls, value: str) -> str:
+        value = value.strip()
+        if not value:
+            raise ValueError("빈 문자열")
+        return value
+
+    def to_result(self, difficulty: str, question_type: str = "주관식") -> Dict[str, Any]:
+        return {
+            "success": True,
+            "message": "문제 생성이 완료되었습니다.",
+            "question": self.question,
+            "correct_answer": self.answer,
+            "explanation": self.explanation,
+            "options": [],
+            "difficulty": difficulty,
+            "question_type": question_type,
+        }
@@ -0,0 +1,2 @@
+# app/scripts 패키지
+# 운영용 CLI 스크립트 모음 (python -m app.scripts.<name> 으로 실행)
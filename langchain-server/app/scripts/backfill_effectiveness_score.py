@@ -0,0 +1,61 @@
+"""
+effectiveness_score(rank_feature)가 없는 기존 문서에 값을 채웁니다.
+
+    python -m app.scripts.backfill_effectiveness_score --requests-per-second 500
+"""
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.utils.effectiveness import (
+    EFFECTIVENESS_SCORE_PAINLESS,
+    effectiveness_score_params,
+)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--index", default=settings.elasticsearch_index_learning_materials)
+    parser.add_argument("--requests-per-second", type=float, default=500)
+    parser.add_argument(
+        "--all", action="store_true", help="이미 값이 있는 문서도 다시 계산합니다."
+    )
+    args = parser.parse_args()
+
+    es = await ElasticsearchClient.get_client()
+    try:
+        await es.indices.put_mapping(
+            index=args.index,
+            body={"properties": {"effectiveness_score": {"type": "rank_feature"}}},
+        )
+        query = (
+            {"match_all": {}}
+            if args.all
+            else {"bool": {"must_not": [{"exists": {"field": "effectiveness_score"}}]}}
+        )
+        response = await es.update_by_query(
+            index=args.index,
+            body={
+                "query": query,
+                "script": {
+                    "source": EFFECTIVENESS_SCORE_PAINLESS,
+                    "lang": "painless",
+                    "params": effectiveness_score_params(),
+                },
+            },
+            conflicts="proceed",
+            requests_per_second=args.requests_per_second,
+            wait_for_completion=True,
+            refresh=True,
+        )
+        print(
+            f"✅ effectiveness_score 갱신: {response.get('updated', 0)}건 "
+            f"(conflicts={response.get('version_conflicts', 0)})"
+        )
+    finally:
+        await ElasticsearchClient.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
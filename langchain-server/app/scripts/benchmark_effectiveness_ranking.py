@@ -0,0 +1,182 @@
+"""
+효과 순 정렬(sort) vs 미리 계산된 rank_feature 점수 비교 벤치마크
+
+합성 학습 자료(기본 100만 건)를 별도 인덱스에 넣고, 같은 (concept, difficulty_level)
+필터에 대해 두 방식의 지연시간과 상위 결과 일치율을 측정합니다.
+
+    python -m app.scripts.benchmark_effectiveness_ranking --docs 1000000 --queries 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+from elasticsearch.helpers import async_bulk
+
+from app.core.config import settings
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.core.index_manager import IndexManager
+from app.utils.effectiveness import compute_effectiveness_score
+
+BENCH_INDEX = "bench_effectiveness_ranking"
+LEVELS = ["BEGINNER", "INTERMEDIATE", "ADVANCED"]
+
+
+def synthetic_docs(count: int, concepts: List[str], seed: int) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for i in range(count):
+        attempts = int(rng.expovariate(1 / 8))
+        average = round(rng.uniform(1, 5), 2) if attempts else None
+        success = int(attempts * rng.random())
+        yield {
+            "_index": BENCH_INDEX,
+            "_id": str(i),
+            "_source": {
+                "concept": rng.choice(concepts),
+                "difficulty_level": rng.choice(LEVELS),
+                "success_count": success,
+                "total_attempts_count": attempts,
+                "average_understanding_score": average,
+                "effectiveness_score": compute_effectiveness_score(
+                    success, attempts, average
+                ),
+            },
+        }
+
+
+async def load(es, count: int, concepts: List[str]):
+    if await es.indices.exists(index=BENCH_INDEX):
+        await es.indices.delete(index=BENCH_INDEX)
+    await es.indices.create(
+        index=BENCH_INDEX,
+        body={
+            "settings": IndexManager.base_index_settings(),
+            "mappings": {
+                "properties": {
+                    "concept": {"type": "keyword"},
+                    "difficulty_level": {"type": "keyword"},
+                    "success_count": {"type": "integer"},
+                    "total_attempts_count": {"type": "integer"},
+                    "average_understanding_score": {"type": "float"},
+                    "effectiveness_score": {"type": "rank_feature"},
+                }
+            },
+        },
+    )
+    started = time.perf_counter()
+    async with IndexManager.bulk_ingestion(es, BENCH_INDEX, force_merge=True):
+        await async_bulk(es, synthetic_docs(count, concepts, seed=7), chunk_size=5000)
+    print(f"Loaded {count} docs in {time.perf_counter() - started:.1f}s\n")
+
+
+def sort_query(concept: str, level: str, size: int) -> Dict[str, Any]:
+    return {
+        "query": {
+            "bool": {
+                "filter": [
+                    {"term": {"concept": concept}},
+                    {"term": {"difficulty_level": level}},
+                ]
+            }
+        },
+        "sort": [
+            {"success_count": {"order": "desc"}},
+            {"average_understanding_score": {"order": "desc", "missing": "_last"}},
+        ],
+        "size": size,
+        "_source": False,
+    }
+
+
+def rank_feature_query(concept: str, level: str, size: int) -> Dict[str, Any]:
+    return {
+        "query": {
+            "bool": {
+                "filter": [
+                    {"term": {"concept": concept}},
+                    {"term": {"difficulty_level": level}},
+                ],
+                "must": [
+                    {
+                        "rank_feature": {
+                            "field": "effectiveness_score",
+                            "saturation": {"pivot": settings.effectiveness_rank_pivot},
+                        }
+                    }
+                ],
+            }
+        },
+        "size": size,
+        "track_total_hits": False,
+        "_source": False,
+    }
+
+
+async def measure(es, build, pairs: List[Tuple[str, str]], size: int):
+    latencies: List[float] = []
+    took: List[int] = []
+    results: List[List[str]] = []
+    for concept, level in pairs:
+        started = time.perf_counter()
+        response = await es.search(index=BENCH_INDEX, body=build(concept, level, size))
+        latencies.append((time.perf_counter() - started) * 1000)
+        took.append(response["took"])
+        results.append([hit["_id"] for hit in response["hits"]["hits"]])
+    return latencies, took, results
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--concepts", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--size", type=int, default=5)
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    concepts = [f"concept-{i}" for i in range(args.concepts)]
+    es = await ElasticsearchClient.get_client()
+    try:
+        if not args.skip_load:
+            await load(es, args.docs, concepts)
+        rng = random.Random(11)
+        pairs = [(rng.choice(concepts), rng.choice(LEVELS)) for _ in range(args.queries)]
+
+        # 워밍업
+        await measure(es, sort_query, pairs[:10], args.size)
+        await measure(es, rank_feature_query, pairs[:10], args.size)
+
+        rows = []
+        for name, build in (("sort", sort_query), ("rank_feature", rank_feature_query)):
+            latencies, took, results = await measure(es, build, pairs, args.size)
+            rows.append((name, latencies, took, results))
+
+        print(f"# Effectiveness ranking benchmark ({args.docs} docs, {args.queries} queries)\n")
+        print("| query | p50 ms | p95 ms | mean ES took ms |")
+        print("|---|---|---|---|")
+        for name, latencies, took, _ in rows:
+            print(
+                f"| {name} | {percentile(latencies, 50):.1f} | {percentile(latencies, 95):.1f} "
+                f"| {statistics.mean(took):.1f} |"
+            )
+        overlap = statistics.mean(
+            len(set(a) & set(b)) / max(1, len(a))
+            for a, b in zip(rows[0][3], rows[1][3])
+        )
+        print(f"\nTop-{args.size} overlap between sort and rank_feature: {overlap:.2f}")
+        if not args.keep:
+            await es.indices.delete(index=BENCH_INDEX)
+    finally:
+        await ElasticsearchClient.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
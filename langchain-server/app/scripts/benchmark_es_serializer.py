@@ -0,0 +1,97 @@
+"""
+Elasticsearch 직렬화 비용 벤치마크 (벡터 1,000개당 ms)
+
+표준 json 기반 JsonSerializer와 orjson 직렬화기(OrjsonSerializer)를 비교합니다.
+ES 연결 없이 클라이언트가 실제로 쓰는 직렬화기 객체만 호출합니다.
+
+    python -m app.scripts.benchmark_es_serializer --dimension 3072 --vectors 1000
+"""
+import argparse
+import statistics
+import time
+from typing import Any, Callable, List
+
+import numpy as np
+from elasticsearch.serializer import JsonSerializer, NdjsonSerializer
+
+from app.core.config import settings
+from app.core.es_serializer import OrjsonNdjsonSerializer, OrjsonSerializer, orjson
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> float:
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dimension", type=int, default=settings.embedding_dimension)
+    parser.add_argument("--vectors", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if orjson is None:
+        print("orjson이 설치되어 있지 않습니다.")
+        return
+
+    rng = np.random.default_rng(7)
+    matrix = rng.standard_normal((args.vectors, args.dimension)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    as_lists = matrix.tolist()
+
+    def knn_bodies(vectors):
+        return [
+            {"knn": {"field": "content_embedding", "query_vector": v, "k": 5, "num_candidates": 100}}
+            for v in vectors
+        ]
+
+    def bulk_lines(vectors):
+        lines: List[Any] = []
+        for i, v in enumerate(vectors):
+            lines.append({"index": {"_index": "learning_materials", "_id": str(i)}})
+            lines.append({"concept": "java", "content_text": "x" * 200, "content_embedding": v})
+        return lines
+
+    std_json, fast_json = JsonSerializer(), OrjsonSerializer()
+    std_ndjson, fast_ndjson = NdjsonSerializer(), OrjsonNdjsonSerializer()
+
+    response = std_json.dumps(
+        {
+            "hits": {
+                "hits": [
+                    {"_id": str(i), "_score": 1.0, "_source": {"content_embedding": v}}
+                    for i, v in enumerate(as_lists)
+                ]
+            }
+        }
+    )
+
+    rows = [
+        ("knn query encode (list)", lambda: [std_json.dumps(b) for b in knn_bodies(as_lists)],
+         lambda: [fast_json.dumps(b) for b in knn_bodies(as_lists)]),
+        # 기본 직렬화기는 NumPy 2 배열을 직렬화하지 못하므로 tolist() 비용을 포함해 비교
+        ("knn query encode (ndarray)", lambda: [std_json.dumps(b) for b in knn_bodies(matrix.tolist())],
+         lambda: [fast_json.dumps(b) for b in knn_bodies(matrix)]),
+        ("bulk encode (list)", lambda: std_ndjson.dumps(bulk_lines(as_lists)),
+         lambda: fast_ndjson.dumps(bulk_lines(as_lists))),
+        ("bulk encode (ndarray)", lambda: std_ndjson.dumps(bulk_lines(matrix.tolist())),
+         lambda: fast_ndjson.dumps(bulk_lines(matrix))),
+        ("search response decode", lambda: std_json.loads(response),
+         lambda: fast_json.loads(response)),
+    ]
+
+    scale = 1000 / args.vectors
+    print(f"# ES serializer benchmark ({args.vectors} vectors x {args.dimension} dims)\n")
+    print("| operation | json ms / 1k vectors | orjson ms / 1k vectors | speedup |")
+    print("|---|---|---|---|")
+    for name, std_fn, fast_fn in rows:
+        std_ms = timed(std_fn, args.repeat) * scale
+        fast_ms = timed(fast_fn, args.repeat) * scale
+        print(f"| {name} | {std_ms:.1f} | {fast_ms:.1f} | {std_ms / fast_ms:.1f}x |")
+
+
+if __name__ == "__main__":
+    main()
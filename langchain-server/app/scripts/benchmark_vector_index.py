@@ -0,0 +1,195 @@
+"""
+벡터 인덱스 설정별 recall / 지연시간 / 디스크 사용량 비교 리포트를 생성합니다.
+
+learning_materials에 저장된 원본 벡터를 표본으로 사용하고, 원본 3072차원
+float 벡터의 brute-force 결과를 정답(ground truth)으로 삼아 recall@k를 계산합니다.
+
+    python -m app.scripts.benchmark_vector_index --docs 5000 --queries 100 > report.md
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from elasticsearch.helpers import async_bulk, async_scan
+
+from app.core.config import settings
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.utils.vector import prepare_embedding
+
+# (이름, 차원, index_options.type, 재채점 여부)
+CONFIGURATIONS: List[Tuple[str, int, str, bool]] = [
+    ("float-3072", 3072, "hnsw", False),
+    ("int8-3072", 3072, "int8_hnsw", False),
+    ("int8-3072-rescore", 3072, "int8_hnsw", True),
+    ("int8-1536", 1536, "int8_hnsw", False),
+    ("int8-1536-rescore", 1536, "int8_hnsw", True),
+    ("int8-768", 768, "int8_hnsw", False),
+    ("int8-768-rescore", 768, "int8_hnsw", True),
+]
+
+
+async def load_vectors(es, index: str, limit: int) -> Tuple[List[str], np.ndarray]:
+    ids: List[str] = []
+    vectors: List[List[float]] = []
+    async for hit in async_scan(
+        es, index=index, query={"query": {"exists": {"field": "content_embedding"}}},
+        _source=["content_embedding"],
+    ):
+        ids.append(hit["_id"])
+        vectors.append(hit["_source"]["content_embedding"])
+        if len(ids) >= limit:
+            break
+    return ids, np.asarray(vectors, dtype=np.float32)
+
+
+def ground_truth(matrix: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    normalized = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    scores = queries @ normalized.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+async def build_index(
+    es, name: str, dims: int, index_type: str, ids: List[str], matrix: np.ndarray
+) -> str:
+    index = f"bench_vectors_{name}"
+    if await es.indices.exists(index=index):
+        await es.indices.delete(index=index)
+    await es.indices.create(
+        index=index,
+        body={
+            "mappings": {
+                "properties": {
+                    "content_embedding": {
+                        "type": "dense_vector",
+                        "dims": dims,
+                        "index": True,
+                        "similarity": "dot_product",
+                        "index_options": {
+                            "type": index_type,
+                            "m": settings.elasticsearch_vector_hnsw_m,
+                            "ef_construction": settings.elasticsearch_vector_hnsw_ef_construction,
+                        },
+                    }
+                }
+            }
+        },
+    )
+    actions = (
+        {
+            "_index": index,
+            "_id": doc_id,
+            "_source": {"content_embedding": prepare_embedding(vector.tolist(), dims)},
+        }
+        for doc_id, vector in zip(ids, matrix)
+    )
+    await async_bulk(es, actions, chunk_size=200)
+    await es.indices.refresh(index=index)
+    await es.indices.forcemerge(index=index, max_num_segments=1)
+    return index
+
+
+async def run_queries(
+    es, index: str, dims: int, queries: np.ndarray, k: int, rescore: bool
+) -> Tuple[List[List[str]], List[float]]:
+    results: List[List[str]] = []
+    latencies: List[float] = []
+    oversample = settings.elasticsearch_knn_rescore_oversample
+    for query in queries:
+        query_vector = prepare_embedding(query.tolist(), dims)
+        window = max(k, int(k * oversample)) if rescore else k
+        body: Dict[str, Any] = {
+            "knn": {
+                "field": "content_embedding",
+                "query_vector": query_vector,
+                "k": window,
+                "num_candidates": max(100, window * 10),
+            },
+            "_source": False,
+            "size": k,
+        }
+        if rescore:
+            body["rescore"] = {
+                "window_size": window,
+                "query": {
+                    "rescore_query": {
+                        "script_score": {
+                            "query": {"match_all": {}},
+                            "script": {
+                                "source": "(1.0 + dotProduct(params.query_vector, 'content_embedding')) / 2.0",
+                                "params": {"query_vector": query_vector},
+                            },
+                        }
+                    },
+                    "query_weight": 0.0,
+                    "rescore_query_weight": 1.0,
+                },
+            }
+        started = time.perf_counter()
+        response = await es.search(index=index, body=body)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append([hit["_id"] for hit in response["hits"]["hits"]])
+    return results, latencies
+
+
+async def index_size_mb(es, index: str) -> Optional[float]:
+    try:
+        stats = await es.indices.stats(index=index, metric="store")
+        return stats["indices"][index]["total"]["store"]["size_in_bytes"] / 1024 / 1024
+    except Exception:
+        return None
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", default=settings.elasticsearch_index_learning_materials)
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="벤치마크 인덱스를 삭제하지 않습니다.")
+    args = parser.parse_args()
+
+    es = await ElasticsearchClient.get_client()
+    try:
+        ids, matrix = await load_vectors(es, args.source, args.docs)
+        if len(ids) <= args.queries:
+            raise RuntimeError(f"Not enough vectors in {args.source}: {len(ids)}")
+
+        query_rows = random.Random(42).sample(range(len(ids)), args.queries)
+        queries = matrix[query_rows]
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+        truth = ground_truth(matrix, queries, args.k)
+        truth_ids = [[ids[row] for row in rows] for rows in truth]
+
+        print(f"# Vector index benchmark ({len(ids)} docs, {args.queries} queries, k={args.k})\n")
+        print("| config | recall@k | p50 ms | p95 ms | index MB |")
+        print("|---|---|---|---|---|")
+        built: Dict[Tuple[int, str], str] = {}
+        for name, dims, index_type, rescore in CONFIGURATIONS:
+            key = (dims, index_type)
+            if key not in built:
+                built[key] = await build_index(es, name, dims, index_type, ids, matrix)
+            index = built[key]
+            results, latencies = await run_queries(
+                es, index, dims, queries, args.k, rescore
+            )
+            recall = np.mean(
+                [len(set(found) & set(expected)) / args.k for found, expected in zip(results, truth_ids)]
+            )
+            size = await index_size_mb(es, index)
+            size_text = f"{size:.1f}" if size is not None else "-"
+            print(
+                f"| {name} | {recall:.3f} | {np.percentile(latencies, 50):.1f} "
+                f"| {np.percentile(latencies, 95):.1f} | {size_text} |"
+            )
+        if not args.keep:
+            for index in built.values():
+                await es.indices.delete(index=index)
+    finally:
+        await ElasticsearchClient.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,223 @@
+"""
+Elasticsearch 백엔드와 로컬(NumPy kNN + BM25) 백엔드의 검색 결과 일치도를 확인합니다.
+
+같은 문서를 임시 ES 인덱스와 임시 로컬 인덱스에 넣고, 리포지토리의 각 검색 메서드를
+같은 입력으로 호출해 top-k 겹침 비율을 메서드별로 출력합니다. 기준 미달이면 종료 코드 1.
+
+    python -m app.scripts.check_retrieval_parity --docs 2000 --queries 50
+    python -m app.scripts.check_retrieval_parity --synthetic --docs 5000
+"""
+import argparse
+import asyncio
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from elasticsearch.helpers import async_bulk, async_scan
+
+from app.core.config import settings
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.core.index_manager import IndexManager
+from app.repository.learning_material_repository import LearningMaterialRepository
+from app.repository.local_index import LocalMaterialStore
+from app.repository.local_learning_material_repository import LocalLearningMaterialRepository
+from app.services.embedding_service import EmbeddingService
+from app.utils.effectiveness import compute_effectiveness_score
+from app.utils.vector import prepare_embedding
+
+PARITY_INDEX = "parity_learning_materials"
+LEVELS = ["BEGINNER", "INTERMEDIATE", "ADVANCED"]
+WORDS = (
+    "자바 클래스 객체 상속 인터페이스 예외 스레드 컬렉션 제네릭 람다 스트림 배열 "
+    "변수 메서드 생성자 캡슐화 다형성 추상화 패키지 접근제어자 반복문 조건문"
+).split()
+
+
+async def sample_documents(es, limit: int) -> List[Tuple[str, Dict[str, Any]]]:
+    docs = []
+    async for hit in async_scan(
+        es,
+        index=settings.elasticsearch_index_learning_materials,
+        query={"query": {"exists": {"field": "content_embedding"}}},
+    ):
+        docs.append((hit["_id"], hit["_source"]))
+        if len(docs) >= limit:
+            break
+    return docs
+
+
+def synthetic_documents(count: int, dimension: int, seed: int) -> List[Tuple[str, Dict[str, Any]]]:
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    concepts = WORDS[:8]
+    docs = []
+    for i in range(count):
+        attempts = rng.randint(0, 20)
+        average = round(rng.uniform(1, 5), 2) if attempts else None
+        success = rng.randint(0, attempts)
+        vector = np_rng.standard_normal(dimension).astype(np.float32)
+        docs.append(
+            (
+                f"doc-{i}",
+                {
+                    "concept": rng.choice(concepts),
+                    "difficulty_level": rng.choice(LEVELS),
+                    "title": " ".join(rng.choices(WORDS, k=4)),
+                    "content_text": " ".join(rng.choices(WORDS, k=rng.randint(20, 80))),
+                    "url": f"https://example.com/{i}",
+                    "material_type": "article",
+                    "content_embedding": prepare_embedding(vector.tolist(), dimension),
+                    "success_count": success,
+                    "total_attempts_count": attempts,
+                    "average_understanding_score": average,
+                    "effectiveness_score": compute_effectiveness_score(success, attempts, average),
+                },
+            )
+        )
+    return docs
+
+
+async def load(es_repo, local_repo, docs):
+    es = es_repo.es_client
+    if await es.indices.exists(index=PARITY_INDEX):
+        await es.indices.delete(index=PARITY_INDEX)
+    await es.indices.create(
+        index=PARITY_INDEX,
+        body={"settings": IndexManager.base_index_settings(), "mappings": es_repo.index_mappings()},
+    )
+    actions = [{"_index": PARITY_INDEX, "_id": doc_id, "_source": source} for doc_id, source in docs]
+    async with IndexManager.bulk_ingestion(es, PARITY_INDEX):
+        await async_bulk(es, actions, chunk_size=500)
+    for doc_id, source in docs:
+        local_repo.store.upsert(doc_id, source)
+
+
+def overlap(a: List[Any], b: List[Any]) -> float:
+    if not a and not b:
+        return 1.0
+    ids_a = {m.id for m in a}
+    ids_b = {m.id for m in b}
+    return len(ids_a & ids_b) / max(len(ids_a), len(ids_b))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--size", type=int, default=5)
+    parser.add_argument("--synthetic", action="store_true", help="저장된 자료 대신 합성 문서 사용")
+    parser.add_argument("--min-overlap", type=float, default=0.8)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    es = await ElasticsearchClient.get_client()
+    embedding_service = EmbeddingService()
+    es_repo = LearningMaterialRepository(es, embedding_service)
+    es_repo.index_name = PARITY_INDEX
+    local_dir = tempfile.mkdtemp(prefix="parity_local_index_")
+    local_repo = LocalLearningMaterialRepository(
+        embedding_service,
+        store=LocalMaterialStore(
+            local_dir,
+            dimension=es_repo.vector_dim,
+            similarity=settings.elasticsearch_vector_similarity,
+            quantization=settings.local_index_quantization,
+        ),
+    )
+    try:
+        if args.synthetic:
+            docs = synthetic_documents(args.docs, es_repo.vector_dim, seed=7)
+        else:
+            docs = await sample_documents(es, args.docs)
+        if not docs:
+            print("문서가 없습니다. --synthetic 옵션으로 다시 실행하세요.")
+            return
+        await load(es_repo, local_repo, docs)
+
+        rng = random.Random(11)
+        queries = rng.sample(docs, min(args.queries, len(docs)))
+        np_rng = np.random.default_rng(11)
+        results: Dict[str, List[float]] = {}
+
+        def add(name: str, es_result, local_result):
+            results.setdefault(name, []).append(overlap(es_result, local_result))
+
+        for _, source in queries:
+            noise = np_rng.normal(0, 0.02, len(source["content_embedding"]))
+            embedding = prepare_embedding(
+                (np.asarray(source["content_embedding"]) + noise).tolist(), es_repo.vector_dim
+            )
+            text = source.get("title") or source.get("concept", "")
+            filters = {"difficulty_level": source.get("difficulty_level")} if source.get("difficulty_level") else None
+
+            add(
+                "search_by_vector_similarity",
+                await es_repo.search_by_vector_similarity(embedding, args.size),
+                await local_repo.search_by_vector_similarity(embedding, args.size),
+            )
+            add(
+                "search_by_vector_similarity+filter",
+                await es_repo.search_by_vector_similarity(embedding, args.size, filters),
+                await local_repo.search_by_vector_similarity(embedding, args.size, filters),
+            )
+            add(
+                "search_by_keyword",
+                (await es_repo.search_by_keyword(text, args.size))[0],
+                (await local_repo.search_by_keyword(text, args.size))[0],
+            )
+            add(
+                "search_materials_by_concept",
+                await es_repo.search_materials_by_concept(source.get("concept", ""), args.size),
+                await local_repo.search_materials_by_concept(source.get("concept", ""), args.size),
+            )
+            if source.get("concept") and source.get("difficulty_level"):
+                es_best = await es_repo.search_and_sort_by_effectiveness(
+                    source["concept"], source["difficulty_level"]
+                )
+                local_best = await local_repo.search_and_sort_by_effectiveness(
+                    source["concept"], source["difficulty_level"]
+                )
+                add(
+                    "search_and_sort_by_effectiveness",
+                    [es_best] if es_best else [],
+                    [local_best] if local_best else [],
+                )
+
+        # hybrid_search는 ES가 fuzziness를 쓰므로 참고용으로만 출력
+        hybrid: List[float] = []
+        for _, source in queries[: max(1, len(queries) // 2)]:
+            text = source.get("title") or source.get("concept", "")
+            embedding = source["content_embedding"]
+            hybrid.append(
+                overlap(
+                    (await es_repo.hybrid_search(text, embedding, args.size))[0],
+                    (await local_repo.hybrid_search(text, embedding, args.size))[0],
+                )
+            )
+
+        print(f"# Retrieval parity ({len(docs)} docs, {len(queries)} queries, top-{args.size})\n")
+        print("| method | mean overlap | min overlap |")
+        print("|---|---|---|")
+        failed = False
+        for name, values in results.items():
+            mean = statistics.mean(values)
+            failed = failed or mean < args.min_overlap
+            print(f"| {name} | {mean:.3f} | {min(values):.3f} |")
+        print(f"| hybrid_search (참고) | {statistics.mean(hybrid):.3f} | {min(hybrid):.3f} |")
+        if failed:
+            print(f"\n❌ 평균 겹침이 {args.min_overlap} 미만인 메서드가 있습니다.")
+            sys.exit(1)
+        print("\n✅ 모든 메서드가 기준을 통과했습니다.")
+    finally:
+        if not args.keep and await es.indices.exists(index=PARITY_INDEX):
+            await es.indices.delete(index=PARITY_INDEX)
+        shutil.rmtree(local_dir, ignore_errors=True)
+        await ElasticsearchClient.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""
+교재 코퍼스 번들 내보내기 / 가져오기 CLI
+
+    # bookId 12가 참조하는 코퍼스를 번들로 저장
+    python -m app.scripts.corpus_bundle export --book-id 12 -o java_book.corpus.zip
+
+    # 다른 환경에서 임베딩 호출 없이 적재하고 bookId 12, 13에 연결
+    python -m app.scripts.corpus_bundle import java_book.corpus.zip --book-id 12 --book-id 13
+"""
+import argparse
+import json
+
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.services.corpus_bundle_service import (
+    export_bundle,
+    import_bundle,
+    resolve_corpus_key,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = sub.add_parser("export", help="코퍼스를 번들 파일로 저장")
+    target = export_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--book-id", help="이 bookId가 참조하는 코퍼스")
+    target.add_argument("--corpus", help="코퍼스 해시")
+    export_parser.add_argument("-o", "--output", required=True)
+
+    import_parser = sub.add_parser("import", help="번들 파일을 적재")
+    import_parser.add_argument("bundle")
+    import_parser.add_argument("--book-id", action="append", default=[], help="코퍼스에 연결할 bookId (여러 번 지정 가능)")
+    import_parser.add_argument("--force", action="store_true", help="같은 코퍼스가 있어도 다시 적재")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "export":
+            corpus_key = args.corpus or resolve_corpus_key(args.book_id)
+            data = export_bundle(corpus_key)
+            with open(args.output, "wb") as f:
+                f.write(data)
+            print(f"{args.output} ({len(data) / 1024 / 1024:.1f} MB)")
+        else:
+            with open(args.bundle, "rb") as f:
+                result = import_bundle(f.read(), book_ids=args.book_id, force=args.force)
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+    finally:
+        ElasticsearchClient.get_sync_client().close()
+
+
+if __name__ == "__main__":
+    main()
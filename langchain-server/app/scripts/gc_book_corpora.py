@@ -0,0 +1,31 @@
+"""
+참조하는 bookId가 없는 PDF 코퍼스와 그 청크를 삭제합니다.
+
+    python -m app.scripts.gc_book_corpora [--grace-seconds 3600] [--dry-run]
+"""
+import argparse
+
+from app.core.corpus_registry import corpus_registry
+from app.core.elasticsearch_client import ElasticsearchClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--grace-seconds",
+        type=float,
+        default=3600.0,
+        help="참조가 0이 된 뒤 이 시간 동안 변경이 없던 코퍼스만 삭제",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="삭제 대상만 출력")
+    args = parser.parse_args()
+
+    collected = corpus_registry.collect_garbage(args.grace_seconds, dry_run=args.dry_run)
+    for corpus_hash in collected:
+        print(f"{'(dry-run) ' if args.dry_run else '🗑️ '}{corpus_hash}")
+    print(f"총 {len(collected)}개 코퍼스{' 삭제 대상' if args.dry_run else ' 삭제'}")
+    ElasticsearchClient.get_sync_client().close()
+
+
+if __name__ == "__main__":
+    main()
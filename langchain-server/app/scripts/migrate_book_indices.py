@@ -0,0 +1,94 @@
+"""
+교재별 인덱스(java_learning_docs_book_{id})를 공용 청크 인덱스로 옮기는 스크립트
+
+ElasticsearchStore가 저장한 text / vector / metadata를 그대로 옮기므로 임베딩을
+다시 계산하지 않습니다. 인덱스 이름에서 book_id를 읽어 routing 값으로 사용합니다.
+
+    python -m app.scripts.migrate_book_indices [--delete-old] [--dry-run]
+"""
+import argparse
+import re
+from typing import Any, Dict, Iterator
+
+from elasticsearch.helpers import bulk, scan
+
+from app.core.book_chunk_store import ensure_book_chunk_index
+from app.core.elasticsearch_client import ElasticsearchClient
+
+BOOK_INDEX_PATTERN = "java_learning_docs_book_*"
+BOOK_INDEX_RE = re.compile(r"^java_learning_docs_book_(?P<book_id>.+)$")
+
+
+def chunk_actions(es, source_index: str, target_index: str, book_id: str) -> Iterator[Dict[str, Any]]:
+    hits = scan(
+        es,
+        index=source_index,
+        query={"query": {"match_all": {}}},
+        _source=["text", "vector", "metadata"],
+        preserve_order=False,
+    )
+    for chunk_index, hit in enumerate(hits):
+        source = hit["_source"]
+        yield {
+            "_op_type": "index",
+            "_index": target_index,
+            "_id": f"{book_id}-{chunk_index}",
+            "_routing": book_id,
+            "_source": {
+                "book_id": book_id,
+                "chunk_index": chunk_index,
+                "text": source.get("text", ""),
+                "vector": source.get("vector"),
+                "metadata": source.get("metadata", {}),
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delete-old", action="store_true", help="옮긴 뒤 교재별 인덱스 삭제")
+    parser.add_argument("--dry-run", action="store_true", help="대상 인덱스만 출력")
+    args = parser.parse_args()
+
+    es = ElasticsearchClient.get_sync_client()
+    indices = sorted(es.indices.get(index=BOOK_INDEX_PATTERN).keys())
+    if not indices:
+        print("옮길 교재별 인덱스가 없습니다.")
+        return
+
+    target_index = ensure_book_chunk_index()
+    for source_index in indices:
+        match = BOOK_INDEX_RE.match(source_index)
+        if not match:
+            continue
+        book_id = match.group("book_id")
+        source_count = es.count(index=source_index)["count"]
+        if args.dry_run:
+            print(f"{source_index} -> {target_index} (book_id={book_id}, {source_count}개)")
+            continue
+
+        es.delete_by_query(
+            index=target_index,
+            routing=book_id,
+            body={"query": {"term": {"book_id": book_id}}},
+            conflicts="proceed",
+            refresh=True,
+        )
+        migrated, errors = bulk(
+            es,
+            chunk_actions(es, source_index, target_index, book_id),
+            chunk_size=500,
+            raise_on_error=False,
+            refresh="wait_for",
+        )
+        print(f"✅ {source_index}: {migrated}/{source_count}개 이동 (오류 {len(errors)}개)")
+
+        if args.delete_old and not errors and migrated == source_count:
+            es.indices.delete(index=source_index)
+            print(f"🗑️ {source_index} 삭제")
+
+    ElasticsearchClient.get_sync_client().close()
+
+
+if __name__ == "__main__":
+    main()
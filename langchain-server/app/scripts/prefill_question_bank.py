@@ -0,0 +1,47 @@
+"""
+챕터별 문제 은행을 미리 채웁니다. (배포 직후나 교재 업로드 후 첫 요청이 느리지 않도록)
+
+    python -m app.scripts.prefill_question_bank [--book-id 3] [--chapter 5] [--target 20]
+"""
+import argparse
+import asyncio
+
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.services.question_bank_service import question_bank_service
+from app.services.question_generator_service import question_generator_service
+from app.utils.chapter_mapper import (
+    enhance_query_for_search,
+    get_chapter_definitions,
+    get_enhanced_chapter_content,
+)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--book-id", type=int, default=None, help="없으면 기본 교재")
+    parser.add_argument("--chapter", action="append", help="여러 번 지정 가능, 없으면 전체 챕터")
+    parser.add_argument("--difficulty", default="보통")
+    parser.add_argument("--target", type=int, default=20, help="챕터당 목표 문제 수")
+    args = parser.parse_args()
+
+    vector_store = question_generator_service.get_vector_store(args.book_id)
+    if vector_store is None:
+        print("❌ 교재 청크가 없습니다. 먼저 교재를 적재하세요.")
+        return
+    book_key = question_generator_service.store_key(vector_store)
+    try:
+        for chapter in args.chapter or list(get_chapter_definitions()):
+            key = (book_key, chapter, args.difficulty)
+            existing = question_bank_service.unseen_count(key)
+            missing = max(args.target - existing, 0)
+            added = 0
+            if missing:
+                query = enhance_query_for_search(get_enhanced_chapter_content(chapter))
+                added = await question_bank_service.fill(key, vector_store, missing, query)
+            print(f"📦 챕터 {chapter}: 기존 {existing}개, 추가 {added}개")
+    finally:
+        ElasticsearchClient.get_sync_client().close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
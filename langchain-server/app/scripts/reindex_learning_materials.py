@@ -0,0 +1,60 @@
+"""
+learning_materials를 새 버전 인덱스로 무중단 재색인하고 alias를 교체합니다.
+
+임베딩 모델(EMBEDDING_MODEL_NAME), 차원(EMBEDDING_DIMENSION), 매핑 설정을 바꾼 뒤
+같은 환경 변수로 실행합니다. 중단되면 같은 명령으로 다시 실행하면 이어서 진행합니다.
+
+    python -m app.scripts.reindex_learning_materials --batch-size 100 --max-docs-per-second 50
+    python -m app.scripts.reindex_learning_materials --reuse-vectors   # 저장된 벡터를 잘라서 사용
+"""
+import argparse
+import asyncio
+
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.repository.learning_material_repository import LearningMaterialRepository
+from app.services.embedding_service import EmbeddingService
+from app.services.reindex_service import ReindexService
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument(
+        "--max-docs-per-second",
+        type=float,
+        default=50.0,
+        help="운영 검색 지연에 영향을 주지 않도록 처리 속도를 제한합니다. (0이면 무제한)",
+    )
+    parser.add_argument(
+        "--reuse-vectors",
+        action="store_true",
+        help="재임베딩 대신 저장된 벡터를 잘라 정규화합니다. (같은 모델에서 차원만 줄일 때)",
+    )
+    parser.add_argument(
+        "--delete-old", action="store_true", help="alias 교체 후 이전 인덱스를 삭제합니다."
+    )
+    args = parser.parse_args()
+
+    es_client = await ElasticsearchClient.get_client()
+    embedding_service = EmbeddingService()
+    await embedding_service.ainitialize()
+    repo = LearningMaterialRepository(es_client, embedding_service)
+    service = ReindexService(
+        repo,
+        batch_size=args.batch_size,
+        max_docs_per_second=args.max_docs_per_second,
+        reembed=not args.reuse_vectors,
+    )
+    try:
+        checkpoint = await service.run(delete_old=args.delete_old)
+        print(
+            f"✅ 재색인 완료: {checkpoint['source_indices']} -> {checkpoint['target_index']} "
+            f"({checkpoint['processed']}건, model={checkpoint['embedding_model']}, "
+            f"dims={checkpoint['embedding_dimension']})"
+        )
+    finally:
+        await ElasticsearchClient.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,182 @@
+"""
+교재 코퍼스 번들 내보내기 / 가져오기
+
+새 환경마다 PDF 추출과 임베딩을 다시 돌리지 않도록, 적재된 코퍼스를 하나의 zip
+번들로 옮깁니다.
+
+    manifest.json   형식 버전, 코퍼스 해시, 임베딩 모델/차원, 청크 수
+    chunks.jsonl    청크 순서대로 text / metadata / chunk_index
+    embeddings.npz  vectors: (청크 수, 차원) float32
+
+가져올 때는 임베딩 모델과 차원이 현재 설정과 같은지 확인한 뒤 임베딩 호출 없이
+공용 청크 인덱스로 bulk 적재합니다.
+"""
+import io
+import json
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from elasticsearch.helpers import scan
+
+from app.core.book_chunk_store import BookChunkStore
+from app.core.config import settings
+from app.core.corpus_registry import corpus_registry
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.core.es_serializer import vectors_for_transport
+
+BUNDLE_FORMAT_VERSION = 1
+IMPORT_BATCH_SIZE = 500
+
+
+class CorpusBundleError(ValueError):
+    pass
+
+
+def resolve_corpus_key(book_id: Any) -> str:
+    """bookId가 참조하는 코퍼스 해시 (없으면 이전 방식의 book_id 키)"""
+    return corpus_registry.resolve(book_id) or str(book_id)
+
+
+def export_bundle(corpus_key: str) -> bytes:
+    es = ElasticsearchClient.get_sync_client()
+    hits = sorted(
+        scan(
+            es,
+            index=settings.elasticsearch_index_book_chunks,
+            routing=corpus_key,
+            query={"query": {"term": {"book_id": corpus_key}}},
+            _source=["chunk_index", "text", "vector", "metadata"],
+        ),
+        key=lambda hit: hit["_source"].get("chunk_index", 0),
+    )
+    if not hits:
+        raise CorpusBundleError(f"코퍼스 청크가 없습니다: {corpus_key}")
+
+    vectors = np.asarray([hit["_source"]["vector"] for hit in hits], dtype=np.float32)
+    corpus = corpus_registry.get(corpus_key) or {}
+    manifest = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "corpus_key": corpus_key,
+        "embedding_model": settings.book_chunk_embedding_model,
+        "embedding_dimension": int(vectors.shape[1]),
+        "chunk_count": len(hits),
+        "max_pages": corpus.get("max_pages"),
+        "exported_at": datetime.utcnow().isoformat() + "Z",
+    }
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        bundle.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+        bundle.writestr(
+            "chunks.jsonl",
+            "".join(
+                json.dumps(
+                    {
+                        "chunk_index": hit["_source"].get("chunk_index", i),
+                        "text": hit["_source"].get("text", ""),
+                        "metadata": hit["_source"].get("metadata", {}),
+                    },
+                    ensure_ascii=False,
+                )
+                + "\n"
+                for i, hit in enumerate(hits)
+            ),
+        )
+        vectors_buffer = io.BytesIO()
+        np.savez(vectors_buffer, vectors=vectors)
+        # 이미 압축 효율이 낮은 float32라 저장만 함
+        bundle.writestr("embeddings.npz", vectors_buffer.getvalue(), compress_type=zipfile.ZIP_STORED)
+    print(f"✅ 코퍼스 번들 생성: {corpus_key[:12]}, {len(hits)}개 청크")
+    return buffer.getvalue()
+
+
+def read_bundle(data: bytes) -> Dict[str, Any]:
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as bundle:
+            manifest = json.loads(bundle.read("manifest.json"))
+            chunks = [
+                json.loads(line)
+                for line in bundle.read("chunks.jsonl").decode("utf-8").splitlines()
+                if line.strip()
+            ]
+            with np.load(io.BytesIO(bundle.read("embeddings.npz"))) as arrays:
+                vectors = arrays["vectors"].astype(np.float32, copy=False)
+    except (KeyError, zipfile.BadZipFile, json.JSONDecodeError) as e:
+        raise CorpusBundleError(f"올바른 코퍼스 번들이 아닙니다: {e}")
+    return {"manifest": manifest, "chunks": chunks, "vectors": vectors}
+
+
+def verify_bundle(bundle: Dict[str, Any]) -> None:
+    manifest = bundle["manifest"]
+    if manifest.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise CorpusBundleError(f"지원하지 않는 번들 버전: {manifest.get('format_version')}")
+    if manifest.get("embedding_model") != settings.book_chunk_embedding_model:
+        raise CorpusBundleError(
+            f"임베딩 모델 불일치: 번들={manifest.get('embedding_model')}, "
+            f"설정={settings.book_chunk_embedding_model}"
+        )
+    vectors = bundle["vectors"]
+    if manifest.get("embedding_dimension") != settings.book_chunk_embedding_dimension or (
+        vectors.ndim != 2 or vectors.shape[1] != settings.book_chunk_embedding_dimension
+    ):
+        raise CorpusBundleError(
+            f"임베딩 차원 불일치: 번들={manifest.get('embedding_dimension')}, "
+            f"설정={settings.book_chunk_embedding_dimension}"
+        )
+    if len(bundle["chunks"]) != vectors.shape[0] or vectors.shape[0] != manifest.get("chunk_count"):
+        raise CorpusBundleError("청크 수와 벡터 수가 맞지 않습니다.")
+
+
+def import_bundle(
+    data: bytes, book_ids: Optional[List[Any]] = None, force: bool = False
+) -> Dict[str, Any]:
+    """
+    번들을 임베딩 호출 없이 적재하고, 주어진 bookId들이 코퍼스를 참조하도록 합니다.
+    같은 코퍼스가 이미 준비되어 있으면 force가 아닌 한 적재를 건너뜁니다.
+    """
+    bundle = read_bundle(data)
+    verify_bundle(bundle)
+    manifest = bundle["manifest"]
+    corpus_key = manifest["corpus_key"]
+    max_pages = manifest.get("max_pages") or 0
+
+    corpus_registry.ensure_index()
+    existing = corpus_registry.get(corpus_key)
+    loaded = False
+    if force or not corpus_registry.is_reusable(existing, max_pages):
+        if corpus_registry.claim(corpus_key, max_pages) or force:
+            try:
+                store = BookChunkStore(embedding=None, book_id=corpus_key)
+                store.delete_book()
+                chunks, vectors = bundle["chunks"], bundle["vectors"]
+                for start in range(0, len(chunks), IMPORT_BATCH_SIZE):
+                    batch = chunks[start:start + IMPORT_BATCH_SIZE]
+                    store.add_texts(
+                        [chunk["text"] for chunk in batch],
+                        [chunk.get("metadata", {}) for chunk in batch],
+                        vectors=vectors_for_transport(vectors[start:start + IMPORT_BATCH_SIZE]),
+                        start_index=start,
+                    )
+                corpus_registry.mark_ready(corpus_key, len(chunks))
+                loaded = True
+            except Exception:
+                corpus_registry.release(corpus_key)
+                raise
+
+    from app.services.question_generator_service import question_generator_service
+
+    for book_id in book_ids or []:
+        corpus_registry.attach(book_id, corpus_key)
+        question_generator_service.register_book(book_id, corpus_key)
+
+    print(f"✅ 코퍼스 번들 가져오기: {corpus_key[:12]} ({'적재' if loaded else '기존 코퍼스 사용'})")
+    return {
+        "corpus_key": corpus_key,
+        "chunk_count": manifest["chunk_count"],
+        "embedding_model": manifest["embedding_model"],
+        "embedding_dimension": manifest["embedding_dimension"],
+        "loaded": loaded,
+        "book_ids": [str(book_id) for book_id in book_ids or []],
+    }
@@ -1,5 +1,6 @@
 from typing import List
 from app.core.config import settings
+from app.utils.vector import SUPPORTED_EMBEDDING_DIMENSIONS, prepare_embedding
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
 
@@ -8,8 +9,14 @@ class EmbeddingService:
         self.embedding_model = settings.embedding_model_name
         self.gemini_api_key = settings.gemini_api_key
         self.embeddings = None
-        self.embedding_dimension = 3072
+        self.embedding_dimension = settings.embedding_dimension
+        self.normalize = settings.embedding_normalize
         self._initialized = False
+        if self.embedding_dimension not in SUPPORTED_EMBEDDING_DIMENSIONS:
+            print(
+                f"[EmbeddingService] Warning: embedding_dimension={self.embedding_dimension} "
+                f"is not one of {SUPPORTED_EMBEDDING_DIMENSIONS}"
+            )
 
     async def ainitialize(self):
         if not self._initialized:
@@ -39,6 +46,9 @@ class EmbeddingService:
                 print(f"[EmbeddingService] Sync initialization error: {e}")
                 raise
 
+    def _prepare(self, embedding: List[float]) -> List[float]:
+        return prepare_embedding(embedding, self.embedding_dimension, self.normalize)
+
     async def _ensure_async_initialized(self):
         if not self._initialized:
             await self.ainitialize()
@@ -53,7 +63,7 @@ class EmbeddingService:
             return []
 
         try:
-            embedding = await self.embeddings.aembed_query(text)
+            embedding = self._prepare(await self.embeddings.aembed_query(text))
             print(
                 f"[EmbeddingService] Generated embedding with dimension: {len(embedding)}"
             )
@@ -72,7 +82,7 @@ class EmbeddingService:
             return []
 
         try:
-            return self.embeddings.embed_query(text)
+            return self._prepare(self.embeddings.embed_query(text))
         except Exception as e:
             print(f"[EmbeddingService] Gemini embedding error: {e}")
             raise
@@ -84,7 +94,8 @@ class EmbeddingService:
             return []
 
         try:
-            return await self.embeddings.aembed_documents(texts)
+            embeddings = await self.embeddings.aembed_documents(texts)
+            return [self._prepare(embedding) for embedding in embeddings]
         except Exception as e:
             print(f"[EmbeddingService] Batch embedding error: {e}")
             raise
@@ -96,7 +107,8 @@ class EmbeddingService:
             return []
 
         try:
-            return self.embeddings.embed_documents(texts)
+            embeddings = self.embeddings.embed_documents(texts)
+            return [self._prepare(embedding) for embedding in embeddings]
         except Exception as e:
             print(f"[EmbeddingService] Batch embedding error: {e}")
             raise
@@ -0,0 +1,202 @@
+"""
+개념 설명 의미 캐시
+
+같은 학습 수준(learning_experience)의 다른 학생이 같은 개념, 거의 같은 문제와 오답으로
+이미 설명을 받았다면 자료 검색, 시도 요약, 설명 생성을 모두 건너뛰고 그 설명을 돌려줍니다.
+
+- 키: (concept, problem_text, user_answer) 임베딩 + 학습 수준(정확히 일치)
+- 코사인 유사도가 explanation_cache_similarity_threshold 이상인 가장 가까운 항목이 적중
+- 요청한 학생이 이미 받았던 설명(이전 시도 목록에 있는 설명)은 다시 주지 않음
+- 이후 요청의 low_understanding_attempts / best_attempt에 같은 설명이 점수와 함께 오면
+  학생별 마지막 점수를 기록하고, 평균이 기준보다 낮은 항목은 제거
+- 프로세스 메모리에 TTL + 크기 제한(LRU)으로 보관
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.schemas.request.learning import ExplanationRequest
+
+
+def explanation_id(explanation: str) -> str:
+    return hashlib.sha256(explanation.strip().encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedExplanation:
+    id: str
+    level: str
+    embedding: np.ndarray
+    explanation: str
+    expires_at: float
+    # 학생별 마지막 이해도 점수
+    scores: Dict[int, int] = field(default_factory=dict)
+    hits: int = 0
+
+    @property
+    def average_score(self) -> Optional[float]:
+        return sum(self.scores.values()) / len(self.scores) if self.scores else None
+
+
+@dataclass
+class ExplanationCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    weak_evictions: int = 0
+    scores_recorded: int = 0
+
+
+class ExplanationCache:
+    def __init__(
+        self,
+        similarity_threshold: Optional[float] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.similarity_threshold = (
+            similarity_threshold
+            if similarity_threshold is not None
+            else settings.explanation_cache_similarity_threshold
+        )
+        self.ttl = ttl_seconds if ttl_seconds is not None else settings.explanation_cache_ttl_seconds
+        self.max_entries = max_entries or settings.explanation_cache_max_entries
+        self._entries: "OrderedDict[str, CachedExplanation]" = OrderedDict()
+        self._stats = ExplanationCacheStats()
+
+    @staticmethod
+    def key_text(request: ExplanationRequest) -> str:
+        problem = request.problem_info
+        return f"{problem.concept}\n{problem.problem_text}\n{problem.user_answer or ''}"
+
+    @staticmethod
+    def level(request: ExplanationRequest) -> str:
+        return (request.user_info.learning_experience or "").strip().lower()
+
+    @staticmethod
+    def _seen_explanations(request: ExplanationRequest) -> Set[str]:
+        texts = [attempt.explanation_text for attempt in request.low_understanding_attempts]
+        if request.best_attempt:
+            texts.append(request.best_attempt.explanation_text)
+        return {explanation_id(text) for text in texts if text}
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for entry_id in [key for key, entry in self._entries.items() if entry.expires_at <= now]:
+            del self._entries[entry_id]
+
+    def record_feedback(self, request: ExplanationRequest) -> None:
+        """요청에 포함된 이전 설명의 이해도 점수를 캐시 항목에 기록합니다."""
+        attempts: List[Tuple[Optional[str], Optional[int]]] = [
+            (attempt.explanation_text, attempt.understanding_score)
+            for attempt in request.low_understanding_attempts
+        ]
+        if request.best_attempt:
+            attempts.append(
+                (request.best_attempt.explanation_text, request.best_attempt.understanding_score)
+            )
+        for text, score in attempts:
+            if not text or score is None:
+                continue
+            entry = self._entries.get(explanation_id(text))
+            if entry is None:
+                continue
+            # 같은 시도가 이후 요청마다 다시 오므로 학생당 마지막 점수 하나만 유지
+            if entry.scores.get(request.user_info.user_id) != score:
+                entry.scores[request.user_info.user_id] = score
+                self._stats.scores_recorded += 1
+            average = entry.average_score
+            if (
+                len(entry.scores) >= settings.explanation_cache_min_samples
+                and average < settings.explanation_cache_min_average_score
+            ):
+                del self._entries[entry.id]
+                self._stats.weak_evictions += 1
+                print(
+                    f"[ExplanationCache] Evicted weak explanation {entry.id[:12]} "
+                    f"(average {average:.2f} over {len(entry.scores)} students)"
+                )
+
+    async def lookup(
+        self, request: ExplanationRequest, embedding_service
+    ) -> Tuple[Optional[str], List[float]]:
+        """
+        Returns:
+            (적중한 설명 또는 None, 요청 키 임베딩). 임베딩은 생성 후 store에 다시 넘깁니다.
+        """
+        if not settings.explanation_cache_enabled:
+            return None, []
+        try:
+            embedding = await embedding_service.get_embedding(self.key_text(request))
+        except Exception as e:
+            print(f"[ExplanationCache] Embedding error, skipping cache: {e}")
+            return None, []
+        if not embedding:
+            return None, []
+
+        self._evict_expired()
+        level = self.level(request)
+        seen = self._seen_explanations(request)
+        candidates = [
+            entry
+            for entry in self._entries.values()
+            if entry.level == level
+            and entry.id not in seen
+            and len(entry.embedding) == len(embedding)
+        ]
+        if candidates:
+            query = np.asarray(embedding, dtype=np.float32)
+            query /= np.linalg.norm(query) or 1.0
+            similarities = np.stack([entry.embedding for entry in candidates]) @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.similarity_threshold:
+                entry = candidates[best]
+                entry.hits += 1
+                self._entries.move_to_end(entry.id)
+                self._stats.hits += 1
+                print(
+                    f"[ExplanationCache] Hit {entry.id[:12]} "
+                    f"(similarity {similarities[best]:.3f}, level '{level}')"
+                )
+                return entry.explanation, embedding
+        self._stats.misses += 1
+        return None, embedding
+
+    def store(self, request: ExplanationRequest, embedding: List[float], explanation: str) -> None:
+        if not settings.explanation_cache_enabled or not embedding or not explanation.strip():
+            return
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+        entry_id = explanation_id(explanation)
+        self._entries[entry_id] = CachedExplanation(
+            id=entry_id,
+            level=self.level(request),
+            embedding=vector,
+            explanation=explanation,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self._entries.move_to_end(entry_id)
+        self._stats.stores += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats.hits + self._stats.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self._stats.hits,
+            "misses": self._stats.misses,
+            "hit_rate": self._stats.hits / lookups if lookups else 0.0,
+            "stores": self._stats.stores,
+            "scores_recorded": self._stats.scores_recorded,
+            "weak_evictions": self._stats.weak_evictions,
+        }
+
+
+# 싱글톤 인스턴스
+explanation_cache = ExplanationCache()
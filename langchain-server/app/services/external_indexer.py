@@ -0,0 +1,128 @@
+"""
+외부 자료 백그라운드 색인
+
+GoogleSearchTool은 크롤링한 텍스트를 청크로 나눈 뒤 바로 설명 생성에 사용하고,
+청크 임베딩과 bulk 색인은 이 작업자에게 넘깁니다. 사용자 응답 시간에는 색인 작업이
+포함되지 않습니다.
+
+- URL당 작업 하나. 대기/진행 중인 URL은 다시 크롤링하지 않고 메모리의 청크를 재사용
+- 임베딩(배치 한 번) + bulk_save_materials. 실패하면 지수 백오프로 최대 N번 재시도
+- 자료 id는 URL과 청크 순서로 정해지므로 재시도나 재색인도 같은 문서를 덮어씀
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.entity.learning_material import LearningMaterial
+
+
+@dataclass
+class IndexJob:
+    url: str
+    materials: List[LearningMaterial]
+    attempts: int = 0
+
+
+class ExternalIndexer:
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+    ):
+        self.workers = workers or settings.external_index_workers
+        self.max_retries = (
+            max_retries if max_retries is not None else settings.external_index_max_retries
+        )
+        self.retry_base_seconds = (
+            retry_base_seconds
+            if retry_base_seconds is not None
+            else settings.external_index_retry_base_seconds
+        )
+        self._repository = None
+        # URL -> 대기/진행/재시도 대기 중인 작업
+        self._jobs: Dict[str, IndexJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {"queued": 0, "duplicates": 0, "indexed_chunks": 0, "retries": 0, "failures": 0}
+
+    def start(self, repository) -> None:
+        self._repository = repository
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def pending_materials(self, url: str) -> Optional[List[LearningMaterial]]:
+        """아직 색인되지 않은 URL의 청크 (없으면 None)"""
+        job = self._jobs.get(url)
+        return job.materials if job else None
+
+    def enqueue(self, url: str, materials: List[LearningMaterial], repository) -> bool:
+        """색인 작업을 추가합니다. 같은 URL의 작업이 이미 있으면 False"""
+        if url in self._jobs:
+            self._stats["duplicates"] += 1
+            return False
+        if self._repository is None or not self._tasks:
+            self.start(repository)
+        self._jobs[url] = IndexJob(url=url, materials=materials)
+        self._queue.put_nowait(url)
+        self._stats["queued"] += 1
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            url = await self._queue.get()
+            job = self._jobs.get(url)
+            try:
+                if job is not None:
+                    await self._index(job)
+            finally:
+                self._queue.task_done()
+
+    async def _index(self, job: IndexJob) -> None:
+        try:
+            embeddings = await self._repository.embedding_service.get_embeddings_batch(
+                [material.content_text for material in job.materials]
+            )
+            for material, embedding in zip(job.materials, embeddings):
+                material.content_embedding = embedding
+            await self._repository.bulk_save_materials(job.materials)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.attempts += 1
+            if job.attempts > self.max_retries:
+                self._jobs.pop(job.url, None)
+                self._stats["failures"] += 1
+                print(f"[ExternalIndexer] Giving up on {job.url} after {job.attempts} attempts: {e}")
+                return
+            delay = self.retry_base_seconds * 2 ** (job.attempts - 1)
+            self._stats["retries"] += 1
+            print(f"[ExternalIndexer] Indexing {job.url} failed ({e}), retrying in {delay:.0f}s")
+            asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, job.url)
+            return
+        self._jobs.pop(job.url, None)
+        self._stats["indexed_chunks"] += len(job.materials)
+        print(f"[ExternalIndexer] Indexed {len(job.materials)} chunks from {job.url}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending_urls": len(self._jobs), **self._stats}
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._jobs:
+            print(f"[ExternalIndexer] Dropped {len(self._jobs)} pending URLs on shutdown")
+
+
+# 싱글톤 인스턴스
+external_indexer = ExternalIndexer()
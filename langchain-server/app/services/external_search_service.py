@@ -1,4 +1,5 @@
 # app/services/external_search_service.py
+import asyncio
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from typing import List, Dict, Any, Optional
@@ -30,7 +31,10 @@ class ExternalSearchService:
                 "num": num_results,
             }
 
-            search_results = self.service.cse().list(**request_body).execute()
+            # 동기 HTTP 호출이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+            search_results = await asyncio.to_thread(
+                self.service.cse().list(**request_body).execute
+            )
 
             items = []
             for item in search_results.get("items", []):
@@ -1,52 +1,133 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
+import hashlib
 import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
 from app.core.config import settings
+from app.core.llm_gateway import llm_gateway
+
+# (설명, 피드백, 점수)
+Attempt = Tuple[str, str, int]
+
+SUMMARY_BATCH_RESPONSE_SCHEMA: Dict[str, Any] = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer"},
+            "text": {"type": "string"},
+            "feedback": {"type": "string"},
+        },
+        "required": ["id", "text", "feedback"],
+    },
+}
+
+
+def attempt_key(explanation: str, feedback: str, score: int) -> str:
+    payload = json.dumps([explanation, feedback, score], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
 class GeminiSummaryService:
     def __init__(self):
-        self.model = ChatGoogleGenerativeAI(
-            model=settings.gemini_model_name, google_api_key=settings.gemini_api_key
-        )
+        self.model = llm_gateway.chat_model(model=settings.gemini_model_name)
+        # 재설명 요청마다 같은 시도가 다시 오므로 요약을 해시로 캐시 (프로세스 공유)
+        self._cache = _summary_cache
 
     async def summarize_text(self, explanation: str, feedback: str, score: int) -> dict:
+        """시도 하나의 요약 (summarize_attempts와 같은 프롬프트와 캐시를 사용)"""
+        summaries = await self.summarize_attempts([(explanation, feedback, score)])
+        return summaries[0]
+
+    async def summarize_attempts(self, attempts: List[Attempt]) -> List[dict]:
+        """
+        여러 시도를 한 번의 호출(JSON 배열)로 요약합니다. 캐시에 있는 시도는 LLM에 보내지 않고,
+        응답에서 빠진 시도는 원문을 줄여 대신 사용합니다(캐시하지 않음).
+        """
+        keys = [attempt_key(*attempt) for attempt in attempts]
+        pending: Dict[str, Attempt] = {}
+        for key, attempt in zip(keys, attempts):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+            else:
+                pending.setdefault(key, attempt)
+
+        print(
+            f"[GeminiSummaryService] {len(attempts)} attempts: "
+            f"{len(attempts) - len(pending)} cached, {len(pending)} to summarize"
+        )
+        batch_size = settings.summary_batch_max_items
+        pending_items = list(pending.items())
+        for start in range(0, len(pending_items), batch_size):
+            batch = pending_items[start:start + batch_size]
+            try:
+                summaries = await self._summarize_batch([attempt for _, attempt in batch])
+            except Exception as e:
+                print(f"[GeminiSummaryService] Batch summary failed: {e}")
+                summaries = {}
+            for index, (key, attempt) in enumerate(batch):
+                if index in summaries:
+                    self._cache[key] = {**summaries[index], "score": attempt[2]}
+            while len(self._cache) > settings.summary_cache_max_entries:
+                self._cache.popitem(last=False)
+
+        return [
+            dict(self._cache[key]) if key in self._cache else _truncated_summary(attempt)
+            for key, attempt in zip(keys, attempts)
+        ]
+
+    async def _summarize_batch(self, attempts: List[Attempt]) -> Dict[int, dict]:
+        items = "\n".join(
+            json.dumps(
+                {"id": i, "explanation": explanation, "feedback": feedback, "score": score},
+                ensure_ascii=False,
+            )
+            for i, (explanation, feedback, score) in enumerate(attempts)
+        )
         prompt = f"""
         당신은 학습 데이터를 요약해주는 조수입니다.
 
         아래는 사용자가 특정 개념에 대해 충분히 이해하지 못했던 설명 시도들입니다.
-        각 시도에는 다음 정보가 포함되어 있습니다:
-
-        - 사용자가 받은 **설명 내용**
-        - 설명에 대한 **사용자 피드백** (이해하지 못한 이유나 개선 요청)
-        - 사용자 스스로 평가한 **이해도 점수** (정수, 예: 1~5)
+        각 시도에는 설명 내용(explanation), 사용자 피드백(feedback), 이해도 점수(score)가 있습니다.
 
         이 데이터들은 나중에 LLM이 새로운 설명을 만들 때
         “과거 어떤 설명이 실패했는지”를 참고하기 위한 것입니다.
 
-        따라서, 각 시도별로 **짧고 핵심적인 요약**을 만들어 주세요.
+        각 시도별로 **짧고 핵심적인 요약**을 만들어 주세요.
         불필요한 말은 제거하고, 문제의 핵심과 피드백 내용을 중심으로 정리해주세요.
 
-        ---
-
-        출력 형식은 다음 JSON 형태로 해주세요:
-
-        ```json
-        {{
-          "text": "설명 내용의 요약된 표현",
-          "feedback": "사용자의 피드백 요약",
-          "score": {score}
-        }}
-        ```
-
-        다음은 요약 대상 데이터입니다:
+        출력은 시도마다 하나씩, 입력의 id를 그대로 포함한 JSON 배열입니다:
+        [{{"id": 0, "text": "설명 내용의 요약된 표현", "feedback": "사용자의 피드백 요약"}}]
 
-        설명: "{explanation}"
-        피드백: "{feedback}"
-        이해도 점수: {score}
+        다음은 요약 대상 데이터입니다 (한 줄에 한 시도):
+        {items}
         """
-        response = await self.model.ainvoke(prompt)
+        response = await self.model.ainvoke(
+            prompt,
+            response_mime_type="application/json",
+            response_schema=SUMMARY_BATCH_RESPONSE_SCHEMA,
+        )
         json_string = (
             response.content.strip().replace("```json", "").replace("```", "").strip()
         )
-        summary = json.loads(json_string)
-        return summary
+        summaries: Dict[int, dict] = {}
+        for item in json.loads(json_string):
+            if (
+                isinstance(item, dict)
+                and isinstance(item.get("id"), int)
+                and 0 <= item["id"] < len(attempts)
+                and item.get("text")
+            ):
+                summaries[item["id"]] = {
+                    "text": str(item["text"]),
+                    "feedback": str(item.get("feedback", "")),
+                }
+        return summaries
+
+
+def _truncated_summary(attempt: Attempt) -> dict:
+    explanation, feedback, score = attempt
+    limit = settings.summary_fallback_max_chars
+    return {"text": (explanation or "")[:limit], "feedback": (feedback or "")[:limit], "score": score}
+
+
+_summary_cache: "OrderedDict[str, dict]" = OrderedDict()
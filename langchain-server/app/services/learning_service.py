@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from app.schemas.request.learning import (
     ExplanationRequest,
     ExternalSearchRequest,
@@ -16,10 +16,14 @@ from app.services.crawler import extract_text_from_url
 from app.utils.crawler.text_processing import chunk_text
 from app.services.embedding_service import EmbeddingService
 from app.repository.learning_material_repository import LearningMaterialRepository
+from app.repository.materialized_top_k import is_generic_problem_text, materialized_top_k
+from app.core.config import settings
+from app.services.search_result_cache import search_result_cache
+from app.services.external_indexer import external_indexer
 from app.entity.learning_material import LearningMaterial
 from app.services.gemini_summary_service import GeminiSummaryService
-import uuid
 import asyncio
+import uuid
 
 
 class LearningService:
@@ -32,9 +36,10 @@ class LearningService:
     async def preprocess_learning_request(
             self, request: ExplanationRequest
     ) -> PreprocessedLearningResponse:
-        summaries = await asyncio.gather(
-            *[
-                self.gemini_summary_service.summarize_text(
+        # 모든 시도를 한 번의 호출로 요약 (이전에 요약한 시도는 캐시 사용)
+        summaries = await self.gemini_summary_service.summarize_attempts(
+            [
+                (
                     attempt.explanation_text,
                     attempt.feedback_text,
                     attempt.understanding_score,
@@ -72,8 +77,9 @@ class LearningService:
             ),
         )
 
-        indexed_materials = []
+        collected_materials = []
         errors = []
+        targets = []
 
         for item in search_results:
             url = item.get("link")
@@ -83,32 +89,35 @@ class LearningService:
                 errors.append(f"Skipping item due to missing URL: {item.get('title')}")
                 continue
 
+            # 백그라운드 색인 대기 중인 URL은 다시 크롤링하지 않고 메모리의 청크 사용
+            pending = external_indexer.pending_materials(url)
+            if pending is not None:
+                print(f"URL indexing in progress, reusing crawled chunks: {url}")
+                collected_materials.extend(pending)
+                continue
+
             if await self.learning_material_repo.is_url_indexed(url):
                 print(f"URL already indexed, skipping: {url}")
                 continue
 
-            print(f"Attempting to extract content from: {url}")
-            content = extract_text_from_url(url)
+            targets.append((url, title))
 
+        print(f"Attempting to extract content from {len(targets)} URLs")
+        contents = await asyncio.gather(
+            *(asyncio.to_thread(extract_text_from_url, url) for url, _ in targets)
+        )
+
+        for (url, title), content in zip(targets, contents):
             if content:
                 print(f"Content extracted from {url}. Length: {len(content)} chars.")
 
-                content_chunks_data = chunk_text(content, url, title)
-
-                for chunk_data in content_chunks_data:
-                    chunk_content = chunk_data["content"]
-
-                    print(f"Generating embedding for chunk from {url}...")
-                    embedding = await self.embedding_service.get_embedding(
-                        chunk_content
-                    )
-
-                    material_id = str(uuid.uuid4())
-                    material = LearningMaterial(
-                        id=material_id,
+                # 임베딩과 색인은 백그라운드 작업자가 처리 (응답은 추출한 텍스트로 바로 생성)
+                # id는 URL과 청크 순서로 정해 재색인해도 같은 문서를 덮어씀
+                url_materials = [
+                    LearningMaterial(
+                        id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"{url}#{index}")),
                         concept=request.concept,
-                        content_text=chunk_content,
-                        content_embedding=embedding,
+                        content_text=chunk_data["content"],
                         url=url,
                         title=title,
                         material_type="EXTERNAL",
@@ -116,22 +125,15 @@ class LearningService:
                         source=self._map_source(url),
                         tags=[],
                     )
-                    indexed_materials.append(material)
+                    for index, chunk_data in enumerate(chunk_text(content, url, title))
+                ]
+                external_indexer.enqueue(url, url_materials, self.learning_material_repo)
+                collected_materials.extend(url_materials)
 
             else:
                 print(f"Failed to extract content from: {url}")
                 errors.append(f"Content extraction failed for {url}")
 
-        if indexed_materials:
-            try:
-                await self.learning_material_repo.bulk_save_materials(indexed_materials)
-                print(
-                    f"Successfully indexed {len(indexed_materials)} chunks into Elasticsearch."
-                )
-            except Exception as e:
-                errors.append(f"Error during bulk indexing: {e}")
-                print(f"Bulk indexing failed: {e}")
-
         formatted_results = [
             LearningMaterialSearchResult(
                 id=mat.id,
@@ -143,7 +145,7 @@ class LearningService:
                 difficulty_level=mat.difficulty_level,
                 source=mat.source,
             )
-            for mat in indexed_materials
+            for mat in collected_materials
         ]
         return formatted_results
 
@@ -167,6 +169,23 @@ class LearningService:
 
     async def search_learning_materials(
             self, request: LearningSearchRequest
+    ) -> LearningSearchResponse:
+        key = (
+            request.query,
+            request.search_type,
+            request.top_k,
+            request.concept,
+            request.user_experience_level,
+        )
+        return await search_result_cache.get_or_compute(
+            "search_learning_materials",
+            key,
+            lambda: self._search_learning_materials(request),
+            cacheable=lambda response: response.status == "success",
+        )
+
+    async def _search_learning_materials(
+            self, request: LearningSearchRequest
     ) -> LearningSearchResponse:
         print(
             f"Searching learning materials for query: '{request.query}' with search_type: '{request.search_type}'"
@@ -186,9 +205,9 @@ class LearningService:
 
         filters = {}
         if request.concept:
-            filters["concept.keyword"] = request.concept
+            filters["concept"] = request.concept
         if request.user_experience_level:
-            filters["difficulty_level.keyword"] = request.user_experience_level
+            filters["difficulty_level"] = request.user_experience_level
 
         search_results: List[LearningMaterial] = []
         total_hits = 0
@@ -250,6 +269,19 @@ class LearningService:
 
     async def search_learning_materials_for_tool(
             self, concept: str, learning_experience: str, problem_text: str, top_k: int = 5
+    ) -> List[LearningMaterialSearchResult]:
+        # 임베딩 실패로 빈 결과가 나온 경우는 저장하지 않음
+        return await search_result_cache.get_or_compute(
+            "search_learning_materials_for_tool",
+            (concept, learning_experience, problem_text, top_k),
+            lambda: self._search_learning_materials_for_tool(
+                concept, learning_experience, problem_text, top_k
+            ),
+            cacheable=bool,
+        )
+
+    async def _search_learning_materials_for_tool(
+            self, concept: str, learning_experience: str, problem_text: str, top_k: int = 5
     ) -> List[LearningMaterialSearchResult]:
         # 난이도 우선순위 매핑
         difficulty_priority = {
@@ -259,6 +291,12 @@ class LearningService:
             "PROFESSIONAL_DEVELOPER": ["ADVANCED", "INTERMEDIATE", "BEGINNER"],
         }
 
+        results = self._materialized_results(
+            concept, difficulty_priority.get(learning_experience, []), problem_text, top_k
+        )
+        if results is not None:
+            return self._format_tool_results(results)
+
         # 문제 내용 임베딩
         problem_embedding = await self.embedding_service.get_embedding(problem_text)
         if not problem_embedding:
@@ -268,8 +306,8 @@ class LearningService:
         # 난이도별 검색 및 fallback
         for difficulty in difficulty_priority.get(learning_experience, []):
             filters = {
-                "concept.keyword": concept,
-                "difficulty_level.keyword": difficulty,
+                "concept": concept,
+                "difficulty_level": difficulty,
             }
             search_results = (
                 await self.learning_material_repo.search_by_vector_similarity(
@@ -282,7 +320,31 @@ class LearningService:
                 results.extend(search_results)
                 break
 
-        formatted_results = [
+        return self._format_tool_results(results)
+
+    def _materialized_results(
+            self, concept: str, difficulties: List[str], problem_text: str, top_k: int
+    ) -> Optional[List[LearningMaterial]]:
+        """
+        문제 텍스트가 일반적이면 미리 계산된 (concept, difficulty) 상위 k개로 응답합니다.
+        아직 계산되지 않은 난이도가 있거나 모든 항목이 비어 있으면 None (일반 검색 경로 사용)
+        """
+        if not settings.materialized_topk_enabled or top_k > materialized_top_k.size:
+            return None
+        if not is_generic_problem_text(problem_text, concept):
+            return None
+        for difficulty in difficulties:
+            materials = materialized_top_k.get(concept, difficulty)
+            if materials is None:
+                return None
+            if materials:
+                return materials[:top_k]
+        return None
+
+    def _format_tool_results(
+            self, results: List[LearningMaterial]
+    ) -> List[LearningMaterialSearchResult]:
+        return [
             LearningMaterialSearchResult(
                 id=mat.id,
                 content_text=mat.content_text,
@@ -295,4 +357,3 @@ class LearningService:
             )
             for mat in results
         ]
-        return formatted_results
\ No newline at end of file
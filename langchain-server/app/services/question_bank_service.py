@@ -0,0 +1,263 @@
+"""
+챕터·난이도별 사전 생성 문제 은행
+
+/generating-question은 호출마다 검색 + Gemini 생성(수 초)을 하고, 파싱에 실패하면
+"선택지1" 같은 임시 선택지가 그대로 나갑니다. 백그라운드 작업자가 미리 생성해
+검증을 통과한 객관식 문제만 (정답, 해설과 함께) question_bank 인덱스에 저장하고,
+엔드포인트는 그 사용자가 아직 받지 않은 문제를 바로 꺼내 줍니다.
+
+- 문제 은행 키: (교재 청크 키, 챕터, 난이도). 교재 청크 키는 코퍼스 해시 또는 "default"
+- 사용자별로 아직 받지 않은 문제가 low watermark 아래로 내려가면 비동기로 보충
+- 같은 문제(정규화한 문제 텍스트 해시)는 한 번만 저장
+"""
+import asyncio
+import hashlib
+import random
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from elasticsearch import ConflictError, NotFoundError
+from langchain_core.vectorstores import VectorStore
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.core.index_manager import IndexManager
+from app.schemas.generated_question import GeneratedQuestion
+
+SERVE_SCRIPT = """
+if (ctx._source.served_to == null) { ctx._source.served_to = []; }
+if (!ctx._source.served_to.contains(params.user_id)) { ctx._source.served_to.add(params.user_id); }
+ctx._source.served_count = ctx._source.served_to.size();
+"""
+
+BankKey = Tuple[str, str, str]
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def validate_generated_question(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    generate_question_with_rag / generate_questions_batch 결과를 GeneratedQuestion 스키마로
+    다시 검증합니다. 통과하면 저장할 문제, 아니면 None (주관식 포함)
+    """
+    if not result.get("success"):
+        return None
+    try:
+        question = GeneratedQuestion(
+            question=result.get("question") or "",
+            options=result.get("options") or [],
+            answer_index=int(str(result.get("correct_answer") or "").strip()),
+            explanation=result.get("explanation") or "",
+        )
+    except (ValueError, ValidationError):
+        return None
+    return {
+        "question": question.question,
+        "options": question.options,
+        "answer_index": question.answer_index,
+        "correct_answer": str(question.answer_index),
+        "explanation": question.explanation,
+    }
+
+
+def question_id(book_key: str, question: str) -> str:
+    normalized = re.sub(r"\s+", " ", question).strip().lower()
+    return hashlib.sha1(f"{book_key}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+class QuestionBankService:
+    def __init__(self, index_name: Optional[str] = None):
+        self.index_name = index_name or settings.elasticsearch_index_question_bank
+        self.low_watermark = settings.question_bank_low_watermark
+        self.refill_batch = settings.question_bank_refill_batch
+        self._refilling: Set[BankKey] = set()
+        self._workers: Optional[asyncio.Semaphore] = None
+        # 실행 중인 보충 태스크 (참조를 유지해야 도중에 GC되지 않음)
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def client(self):
+        return ElasticsearchClient.get_sync_client()
+
+    def ensure_index(self) -> None:
+        def create():
+            if not self.client.indices.exists(index=self.index_name):
+                self.client.indices.create(
+                    index=self.index_name,
+                    body={
+                        "settings": IndexManager.base_index_settings(),
+                        "mappings": {
+                            "properties": {
+                                "book_key": {"type": "keyword"},
+                                "chapter": {"type": "keyword"},
+                                "difficulty": {"type": "keyword"},
+                                "query": {"type": "text", "index": False},
+                                "question": {"type": "text", "index": False},
+                                "options": {"type": "text", "index": False},
+                                "answer_index": {"type": "byte"},
+                                "correct_answer": {"type": "text", "index": False},
+                                "explanation": {"type": "text", "index": False},
+                                "served_to": {"type": "keyword"},
+                                "served_count": {"type": "integer"},
+                                "created_at": {"type": "date"},
+                            }
+                        },
+                    },
+                )
+                print(f"✅ 문제 은행 인덱스 생성: {self.index_name}")
+
+        IndexManager.ensure_index_sync(self.index_name, create)
+
+    def _filter(self, key: BankKey, user_id: Optional[Any] = None) -> Dict[str, Any]:
+        book_key, chapter, difficulty = key
+        query: Dict[str, Any] = {
+            "bool": {
+                "filter": [
+                    {"term": {"book_key": book_key}},
+                    {"term": {"chapter": chapter}},
+                    {"term": {"difficulty": difficulty}},
+                ]
+            }
+        }
+        if user_id is not None:
+            query["bool"]["must_not"] = [{"term": {"served_to": str(user_id)}}]
+        return query
+
+    def unseen_count(self, key: BankKey, user_id: Optional[Any] = None) -> int:
+        """사용자가 아직 받지 않은 문제 수 (user_id가 없으면 전체 문제 수)"""
+        self.ensure_index()
+        try:
+            return self.client.count(index=self.index_name, query=self._filter(key, user_id))["count"]
+        except NotFoundError as e:
+            IndexManager.forget_if_missing(self.index_name, e)
+            raise
+
+    def take(self, key: BankKey, user_id: Any) -> Optional[Dict[str, Any]]:
+        """사용자가 아직 받지 않은 문제 하나를 꺼내고 받은 것으로 기록합니다."""
+        self.ensure_index()
+        try:
+            response = self.client.search(
+                index=self.index_name,
+                query=self._filter(key, user_id),
+                # 가장 적게 나간 문제부터 (같은 문제가 특정 사용자들에게만 몰리지 않도록)
+                sort=[{"served_count": "asc"}, {"created_at": "asc"}],
+                size=1,
+            )
+        except NotFoundError as e:
+            IndexManager.forget_if_missing(self.index_name, e)
+            raise
+        hits = response["hits"]["hits"]
+        if not hits:
+            return None
+        self.client.update(
+            index=self.index_name,
+            id=hits[0]["_id"],
+            script={"source": SERVE_SCRIPT, "lang": "painless", "params": {"user_id": str(user_id)}},
+            retry_on_conflict=3,
+            refresh=True,
+        )
+        return {"id": hits[0]["_id"], **hits[0]["_source"]}
+
+    def add(
+        self,
+        key: BankKey,
+        query: str,
+        question: Dict[str, Any],
+        served_to: Optional[List[Any]] = None,
+    ) -> bool:
+        """검증된 문제를 저장합니다. 이미 있는 문제면 False"""
+        self.ensure_index()
+        book_key, chapter, difficulty = key
+        served = [str(user_id) for user_id in served_to or []]
+        try:
+            self.client.create(
+                index=self.index_name,
+                id=question_id(book_key, question["question"]),
+                document={
+                    "book_key": book_key,
+                    "chapter": chapter,
+                    "difficulty": difficulty,
+                    "query": query,
+                    **question,
+                    "served_to": served,
+                    "served_count": len(served),
+                    "created_at": _now(),
+                },
+                refresh=True,
+            )
+            return True
+        except ConflictError:
+            return False
+
+    def _refill_query(self, chapter: str, fallback: str) -> str:
+        """생성마다 챕터 키워드 일부를 골라 쿼리를 바꿔 같은 문제가 반복되지 않게 합니다."""
+        from app.utils.chapter_mapper import get_chapter_definitions, load_keywords_for_chapter
+
+        keywords = load_keywords_for_chapter(chapter)
+        if not keywords:
+            return fallback
+        title = get_chapter_definitions().get(chapter, {}).get("name", f"챕터 {chapter}")
+        focus = " ".join(random.sample(keywords, min(3, len(keywords))))
+        return f"Java {title} {focus} 프로그래밍 예제 문제"
+
+    def schedule_refill(
+        self, key: BankKey, user_id: Any, vector_store: VectorStore, fallback_query: str
+    ) -> None:
+        """사용자의 남은 문제가 watermark 아래면 백그라운드 보충을 예약합니다. (키당 하나)"""
+        if key in self._refilling:
+            return
+        self._refilling.add(key)
+        task = asyncio.create_task(self._refill(key, user_id, vector_store, fallback_query))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refill(
+        self, key: BankKey, user_id: Any, vector_store: VectorStore, fallback_query: str
+    ) -> None:
+        try:
+            unseen = await asyncio.to_thread(self.unseen_count, key, user_id)
+            if unseen >= self.low_watermark:
+                return
+            added = await self.fill(key, vector_store, self.refill_batch, fallback_query)
+            print(f"[QuestionBank] Refilled {key}: +{added} (unseen for user before: {unseen})")
+        except Exception as e:
+            print(f"[QuestionBank] Refill error for {key}: {e}")
+        finally:
+            self._refilling.discard(key)
+
+    async def fill(
+        self, key: BankKey, vector_store: VectorStore, count: int, fallback_query: str
+    ) -> int:
+        """검증을 통과한 새 문제를 count개까지 생성해 저장하고, 저장한 수를 반환합니다."""
+        from app.services.question_generator_service import question_generator_service
+
+        if self._workers is None:
+            self._workers = asyncio.Semaphore(settings.question_bank_workers)
+        _, chapter, difficulty = key
+        added = 0
+        # 한 번의 LLM 호출로 여러 문제를 생성. 검증 실패나 중복을 감안해 호출 수를 제한
+        for _ in range(max(1, -(-count // settings.question_batch_size)) * 2):
+            if added >= count:
+                break
+            query = self._refill_query(chapter, fallback_query)
+            async with self._workers:
+                batch = await asyncio.to_thread(
+                    question_generator_service.generate_questions_batch,
+                    query=query,
+                    count=min(count - added, settings.question_batch_size),
+                    difficulty=difficulty,
+                    vector_store=vector_store,
+                )
+            for result in batch.get("questions", []):
+                question = validate_generated_question(result)
+                if question and await asyncio.to_thread(self.add, key, query, question):
+                    added += 1
+        return added
+
+
+# 싱글톤 인스턴스
+question_bank_service = QuestionBankService()
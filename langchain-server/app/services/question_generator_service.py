@@ -1,99 +1,169 @@
 """
 연습문제 생성 서비스
 """
+import asyncio
 import os
-import re
 from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.core.llm_gateway import llm_gateway
 from langchain.schema import Document
 from langchain_community.vectorstores import ElasticsearchStore
+from langchain_core.vectorstores import VectorStore
+from app.core.config import settings
+from app.core.index_manager import IndexManager
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.core.book_chunk_store import BookChunkStore
+from app.core.vector_store_registry import vector_store_registry
+from app.core.corpus_registry import corpus_registry
+from app.generators.structured_question import (
+    astream_structured_questions,
+    generate_structured_questions,
+)
+from app.schemas.generated_question import (
+    GeneratedOpenQuestion,
+    GeneratedQuestion,
+    OPEN_QUESTION_BATCH_RESPONSE_SCHEMA,
+    QUESTION_BATCH_RESPONSE_SCHEMA,
+)
+from app.utils.context_assembler import assemble_context
 
 # 환경 변수 로드 - config.py에서 이미 로드되므로 제거
 
+DEFAULT_STORE_KEY = "default"
+
+
+def book_store_key(book_id: Any) -> str:
+    return f"book:{book_id}"
+
 
 class QuestionGeneratorService:
     """연습문제 생성 서비스"""
     
     def __init__(self):
         from app.core.config import settings
-        self.llm = ChatGoogleGenerativeAI(
+        # 같은 쿼리로도 매번 다른 문제가 필요하므로 (세션 추가 문제, 문제 은행 보충) 응답 캐시를 쓰지 않음
+        self.llm = llm_gateway.chat_model(
+            cache=False,
             model="gemini-1.5-flash",
             temperature=0.7,
             max_tokens=2000,
-            google_api_key=settings.gemini_api_key
         )
-        self.vector_store = None
         from langchain_google_genai import GoogleGenerativeAIEmbeddings
         self.embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/embedding-001",
+            model=settings.book_chunk_embedding_model,
             google_api_key=settings.gemini_api_key
         )
         self.index_name = "java_learning_docs"  # 고정된 인덱스 이름
     
     
     def has_vector_store(self) -> bool:
-        """벡터 스토어가 이미 존재하는지 확인"""
-        if self.vector_store is not None:
+        """기본 교재 벡터 스토어가 이미 존재하는지 확인"""
+        if self.get_default_vector_store() is not None:
             return True
-            
-        # Elasticsearch 인덱스 존재 여부 확인
-        try:
-            from elasticsearch import Elasticsearch
-            es = Elasticsearch(['http://elasticsearch:9200'])
-            return es.indices.exists(index=self.index_name)
-        except Exception as e:
-            print(f"❌ 인덱스 존재 확인 중 오류: {e}")
-            return False
-    
-    def connect_to_existing_vector_store(self):
+        # 이전 조회에서 인덱스가 없었다면 다시 확인할 수 있도록 비움
+        vector_store_registry.invalidate(DEFAULT_STORE_KEY)
+        return False
+
+    def _connect_default(self) -> Optional[ElasticsearchStore]:
+        if not IndexManager.index_exists_sync(self.index_name):
+            return None
+        store = ElasticsearchStore(
+            embedding=self.embeddings,
+            es_connection=ElasticsearchClient.get_sync_client(),
+            index_name=self.index_name
+        )
+        print(f"✅ 기존 벡터 스토어 연결 완료: {self.index_name}")
+        return store
+
+    def get_default_vector_store(self) -> Optional[VectorStore]:
+        """기본 교재(java_learning_docs) 스토어. 처음 조회할 때만 연결합니다."""
+        return vector_store_registry.get(DEFAULT_STORE_KEY, self._connect_default).store
+
+    def connect_to_existing_vector_store(self) -> Optional[VectorStore]:
         """기존 벡터 스토어에 연결"""
-        try:
-            from langchain_google_genai import GoogleGenerativeAIEmbeddings
-            from app.core.config import settings
-            
-            embeddings = GoogleGenerativeAIEmbeddings(
-                model="models/embedding-001",
-                google_api_key=settings.gemini_api_key
-            )
-            
-            self.vector_store = ElasticsearchStore(
-                embedding=embeddings,
-                es_url="http://elasticsearch:9200",
-                index_name=self.index_name
-            )
-            print(f"✅ 기존 벡터 스토어 연결 완료: {self.index_name}")
-            return True
-        except Exception as e:
-            print(f"❌ 기존 벡터 스토어 연결 실패: {e}")
-            return False
-    
-    def setup_vector_store(self, chunks: List[Document], index_name: str = "java_learning_docs"):
+        store = self.get_default_vector_store()
+        if store is None:
+            print(f"❌ 기존 벡터 스토어 연결 실패: {self.index_name}")
+        return store
+
+    def setup_vector_store(self, chunks: List[Document], index_name: str = "java_learning_docs") -> Optional[VectorStore]:
         """벡터 스토어를 설정합니다."""
         try:
-            from langchain_google_genai import GoogleGenerativeAIEmbeddings
-            from app.core.config import settings
-            embeddings = GoogleGenerativeAIEmbeddings(
-                model="models/embedding-001",
-                google_api_key=settings.gemini_api_key
-            )
-            
             # Elasticsearch 벡터 스토어 생성
-            self.vector_store = ElasticsearchStore.from_documents(
+            with IndexManager.bulk_ingestion_sync(index_name):
+                store = ElasticsearchStore.from_documents(
+                    documents=chunks,
+                    embedding=self.embeddings,
+                    es_connection=ElasticsearchClient.get_sync_client(),
+                    index_name=index_name
+                )
+            if index_name == self.index_name:
+                vector_store_registry.register(DEFAULT_STORE_KEY, store)
+
+            print(f"✅ Elasticsearch 벡터 스토어 설정 완료: {index_name}")
+            return store
+
+        except Exception as e:
+            print(f"❌ Elasticsearch 벡터 스토어 설정 실패: {e}")
+            return None
+
+    def setup_corpus_vector_store(self, chunks: List[Document], corpus_hash: str) -> bool:
+        """코퍼스(PDF 내용 해시) 청크를 공용 청크 인덱스에 저장합니다."""
+        try:
+            BookChunkStore.from_documents(
                 documents=chunks,
-                embedding=embeddings,
-                es_url="http://elasticsearch:9200",
-                index_name=index_name
+                embedding=self.embeddings,
+                book_id=corpus_hash,
             )
-            
-            print(f"✅ Elasticsearch 벡터 스토어 설정 완료: {index_name}")
+            print(f"✅ 코퍼스 청크 저장 완료: {corpus_hash[:12]}, {len(chunks)}개")
             return True
-            
         except Exception as e:
-            print(f"❌ Elasticsearch 벡터 스토어 설정 실패: {e}")
+            print(f"❌ 코퍼스 청크 저장 실패: {e}")
             return False
-    
-    def generate_question_with_rag(self, query: str, difficulty: str = "보통", question_type: str = "객관식") -> Dict[str, Any]:
+
+    def register_book(self, book_id: int, corpus_hash: str) -> None:
+        """bookId의 검색 핸들을 코퍼스 청크로 바로 준비합니다. (ES 호출 없음)"""
+        store = BookChunkStore(embedding=self.embeddings, book_id=corpus_hash)
+        vector_store_registry.register(book_store_key(book_id), store)
+
+    def _connect_book(self, book_id: int) -> Optional[BookChunkStore]:
+        # 코퍼스를 참조하지 않는 교재는 이전 방식(book_id 키) 청크를 사용
+        chunk_key = corpus_registry.resolve(book_id) or book_id
+        store = BookChunkStore(embedding=self.embeddings, book_id=chunk_key)
+        if not IndexManager.index_exists_sync(store.index_name) or store.count() == 0:
+            return None
+        print(f"✅ 교재 청크 인덱스 연결 완료: book_id={book_id}")
+        return store
+
+    def get_book_vector_store(self, book_id: Optional[int]) -> Optional[VectorStore]:
+        """해당 교재의 청크 스토어. 청크가 없는 교재면 None."""
+        if book_id is None:
+            return None
+        handle = vector_store_registry.get(
+            book_store_key(book_id), lambda: self._connect_book(book_id)
+        )
+        return handle.store
+
+    def get_vector_store(self, book_id: Optional[int]) -> Optional[VectorStore]:
+        """교재 청크가 있으면 그 교재, 없으면 기본 교재 스토어"""
+        store = self.get_book_vector_store(book_id)
+        if store is None:
+            store = self.get_default_vector_store()
+        return store
+
+    def store_key(self, vector_store: VectorStore) -> str:
+        """스토어가 검색하는 청크 키 (코퍼스 해시 / 이전 방식 book_id / 기본 교재)"""
+        if isinstance(vector_store, BookChunkStore):
+            return vector_store.book_id
+        return DEFAULT_STORE_KEY
+
+    def generate_question_with_rag(
+        self,
+        query: str,
+        difficulty: str = "보통",
+        question_type: str = "객관식",
+        vector_store: Optional[VectorStore] = None,
+    ) -> Dict[str, Any]:
         """
         RAG를 사용하여 문제를 생성합니다.
         
@@ -101,66 +171,47 @@ class QuestionGeneratorService:
             query: 문제 생성 쿼리
             difficulty: 문제 난이도
             question_type: 문제 유형
+            vector_store: 검색할 교재 스토어 (get_vector_store()로 조회)
             
         Returns:
             생성된 문제 정보
         """
-        if not self.vector_store:
-            return {
-                "success": False,
-                "message": "벡터 스토어가 설정되지 않았습니다."
-            }
-        
-        try:
-            # 관련 컨텍스트 검색
-            relevant_docs = self.vector_store.similarity_search(query, k=5)
-            
-            if not relevant_docs:
-                return {
-                    "success": False,
-                    "message": "관련 컨텍스트를 찾을 수 없습니다."
-                }
-            
-            # 컨텍스트 결합
-            context = "\n\n".join([doc.page_content for doc in relevant_docs])
-            
-            # 문제 생성 프롬프트
-            if question_type == "객관식":
-                prompt = f"""
-다음 Java 교재 내용을 바탕으로 {difficulty} 난이도의 {question_type} 문제를 생성해주세요.
+        result = self.generate_questions_batch(
+            query, 1, difficulty, vector_store, question_type=question_type
+        )
+        if not result["success"]:
+            return {"success": False, "message": result["message"]}
+        return {**result["questions"][0], "chunks_used": result["chunks_used"]}
 
-**요청 내용:**
-- 쿼리: {query}
-- 난이도: {difficulty}
-- 문제 유형: {question_type}
+    def _retrieve_context(self, query: str, vector_store: VectorStore) -> Tuple[str, int]:
+        relevant_docs = vector_store.similarity_search(query, k=settings.context_retrieval_k)
+        if not relevant_docs:
+            return "", 0
+        assembled = assemble_context(
+            [doc.page_content for doc in relevant_docs],
+            token_budget=settings.context_token_budget_question,
+            name="question_generation",
+        )
+        if not assembled.text.strip():
+            return "", 0
+        return assembled.text, len(assembled.passages)
 
-**교재 내용:**
-{context}
+    def _batch_request(
+        self, query: str, count: int, difficulty: str, context: str, question_type: str
+    ) -> Dict[str, Any]:
+        """배치 생성 프롬프트와 검증 모델/스키마"""
+        multiple_choice = question_type == "객관식"
+        if multiple_choice:
+            fields = """2. 각 문제는 서로 다른 보기 정확히 4개 (options)
+3. answer_index는 정답 보기 번호 (1~4)"""
+            example = '{"question": "...", "options": ["...", "...", "...", "..."], "answer_index": 1, "explanation": "..."}'
+        else:
+            fields = """2. answer에 정답
+3. 보기 없이 서술형으로 답할 수 있는 문제"""
+            example = '{"question": "...", "answer": "...", "explanation": "..."}'
 
-**요구사항:**
-1. Java 프로그래밍 관련 문제
-2. 명확하고 이해하기 쉬운 문제  
-3. 정확히 4개의 선택지만 포함
-4. 정답과 함께 생성 (1~4번 중 하나)
-5. 상세한 해설 포함
-6. {difficulty} 난이도에 맞는 문제
-
-**중요: 반드시 아래 형식을 정확히 따라주세요. 추가 텍스트나 다른 선택지는 포함하지 마세요.**
-
-**출력 형식:**
-문제: [문제 내용]
-보기1: [첫 번째 선택지]
-보기2: [두 번째 선택지]
-보기3: [세 번째 선택지]
-보기4: [네 번째 선택지]
-정답: [정답 번호 (1~4)]
-해설: [상세한 해설]
-
-위 형식 외에는 어떤 추가 내용도 포함하지 마세요.
-"""
-            else:
-                prompt = f"""
-다음 Java 교재 내용을 바탕으로 {difficulty} 난이도의 {question_type} 문제를 생성해주세요.
+        prompt = f"""
+다음 Java 교재 내용을 바탕으로 {difficulty} 난이도의 {question_type} 문제 {count}개를 생성해주세요.
 
 **요청 내용:**
 - 쿼리: {query}
@@ -171,161 +222,114 @@ class QuestionGeneratorService:
 {context}
 
 **요구사항:**
-1. Java 프로그래밍 관련 문제
-2. 명확하고 이해하기 쉬운 문제
-3. 정답과 함께 생성
-4. 상세한 해설 포함
-5. {difficulty} 난이도에 맞는 문제
-
-**출력 형식:**
-문제: [문제 내용]
-정답: [정답]
-해설: [상세한 해설]
-
-위 형식으로 문제를 생성해주세요.
+1. 문제마다 교재 내용의 서로 다른 부분이나 개념을 다룰 것 (같은 문제 반복 금지)
+{fields}
+4. explanation에 상세한 해설
+5. 문제(question)에 정답 정보를 포함하지 말 것
+
+JSON 형식: {{"questions": [{example}]}}
 """
-            
-            # LLM을 사용한 문제 생성
-            response = self.llm.invoke(prompt)
-            
-            # 응답 파싱
-            content = response.content
-            print(f"🔍 LLM 응답 원본: {content}")
-            question, correct_answer, explanation, options = self._parse_generated_content(content)
-            print(f"🔍 파싱된 문제: {question}")
-            print(f"🔍 파싱된 선택지: {options}")
-            print(f"🔍 파싱된 정답: {correct_answer}")
-            print(f"🔍 파싱된 해설: {explanation}")
-            
-            return {
-                "success": True,
-                "message": "문제 생성이 완료되었습니다.",
-                "question": question,
-                "correct_answer": correct_answer,
-                "explanation": explanation,
-                "options": options,
-                "difficulty": difficulty,
-                "question_type": question_type,
-                "chunks_used": len(relevant_docs)
-            }
-            
+        return {
+            "prompt": prompt,
+            "model": GeneratedQuestion if multiple_choice else GeneratedOpenQuestion,
+            "response_schema": (
+                QUESTION_BATCH_RESPONSE_SCHEMA
+                if multiple_choice
+                else OPEN_QUESTION_BATCH_RESPONSE_SCHEMA
+            ),
+            "count": count,
+            "max_output_tokens": max(2000, 700 * count),
+        }
+
+    def _batch_result(
+        self, questions: List[Any], count: int, difficulty: str, question_type: str, chunks_used: int
+    ) -> Dict[str, Any]:
+        print(f"✅ 문제 생성: 요청 {count}개, 검증 통과 {len(questions)}개")
+        return {
+            "success": bool(questions),
+            "message": (
+                f"{len(questions)}개 문제 생성이 완료되었습니다."
+                if questions
+                else "검증을 통과한 문제를 생성하지 못했습니다. 다시 시도해주세요."
+            ),
+            "questions": [
+                question.to_result(difficulty)
+                if question_type == "객관식"
+                else question.to_result(difficulty, question_type)
+                for question in questions
+            ],
+            "chunks_used": chunks_used,
+        }
+
+    def generate_questions_batch(
+        self,
+        query: str,
+        count: int,
+        difficulty: str = "보통",
+        vector_store: Optional[VectorStore] = None,
+        question_type: str = "객관식",
+    ) -> Dict[str, Any]:
+        """
+        같은 검색 컨텍스트로 문제 count개를 한 번의 LLM 호출(JSON 모드)로 생성합니다.
+
+        Returns:
+            success, questions(문제 결과 목록), chunks_used.
+            스키마 검증(객관식: 보기 4개, 정답 번호 1~4, 해설)을 통과한 문제만 포함
+        """
+        if not vector_store:
+            return {"success": False, "message": "벡터 스토어가 설정되지 않았습니다.", "questions": []}
+
+        try:
+            context, chunks_used = self._retrieve_context(query, vector_store)
+            if not chunks_used:
+                return {"success": False, "message": "관련 컨텍스트를 찾을 수 없습니다.", "questions": []}
+            questions = generate_structured_questions(
+                self.llm, **self._batch_request(query, count, difficulty, context, question_type)
+            )
+            return self._batch_result(questions, count, difficulty, question_type, chunks_used)
         except Exception as e:
             return {
                 "success": False,
-                "message": f"문제 생성 중 오류가 발생했습니다: {str(e)}"
+                "message": f"문제 생성 중 오류가 발생했습니다: {str(e)}",
+                "questions": [],
             }
-    
-    def _parse_generated_content(self, content: str) -> tuple[str, str, str, list]:
+
+    async def astream_questions_batch(
+        self,
+        query: str,
+        count: int,
+        difficulty: str = "보통",
+        vector_store: Optional[VectorStore] = None,
+        question_type: str = "객관식",
+    ) -> AsyncIterator[Tuple[str, Any]]:
         """
-        생성된 내용을 파싱하여 문제, 정답, 해설, 선택지를 추출합니다.
-        
-        Args:
-            content: 생성된 내용
-            
-        Returns:
-            (문제, 정답, 해설, 선택지)
+        generate_questions_batch의 스트리밍 버전입니다.
+        ("stem", 첫 문제 본문 추가분), ("options", 첫 문제 보기)를 생성 중에 내보내고
+        마지막에 ("result", generate_questions_batch와 같은 결과)를 내보냅니다.
         """
+        if not vector_store:
+            yield "result", {"success": False, "message": "벡터 스토어가 설정되지 않았습니다.", "questions": []}
+            return
+
         try:
-            print(f"🔍 파싱할 원본 내용: {content}")
-            
-            lines = content.split('\n')
-            question = ""
-            correct_answer = ""
-            explanation = ""
-            choices = []
-            
-            current_section = ""
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                if line.startswith("문제:"):
-                    current_section = "question"
-                    question = line.replace("문제:", "").strip()
-                elif line.startswith("보기1:"):
-                    current_section = "choice1"
-                    if len(choices) < 4:  # 최대 4개만 허용
-                        choices.append(line.replace("보기1:", "").strip())
-                elif line.startswith("보기2:"):
-                    current_section = "choice2"
-                    if len(choices) < 4:
-                        choices.append(line.replace("보기2:", "").strip())
-                elif line.startswith("보기3:"):
-                    current_section = "choice3"
-                    if len(choices) < 4:
-                        choices.append(line.replace("보기3:", "").strip())
-                elif line.startswith("보기4:"):
-                    current_section = "choice4"
-                    if len(choices) < 4:
-                        choices.append(line.replace("보기4:", "").strip())
-                elif line.startswith("정답:") or "정답:" in line:
-                    current_section = "answer"
-                    # "정답:" 이후의 모든 내용을 추출
-                    if "정답:" in line:
-                        correct_answer = line.split("정답:", 1)[1].strip()
-                elif line.startswith("해설:") or "해설:" in line:
-                    current_section = "explanation"
-                    # "해설:" 이후의 모든 내용을 추출
-                    if "해설:" in line:
-                        explanation = line.split("해설:", 1)[1].strip()
+            context, chunks_used = await asyncio.to_thread(self._retrieve_context, query, vector_store)
+            if not chunks_used:
+                yield "result", {"success": False, "message": "관련 컨텍스트를 찾을 수 없습니다.", "questions": []}
+                return
+            request = self._batch_request(query, count, difficulty, context, question_type)
+            async for event, value in astream_structured_questions(self.llm, **request):
+                if event == "questions":
+                    yield "result", self._batch_result(
+                        value, count, difficulty, question_type, chunks_used
+                    )
                 else:
-                    # 숫자로 시작하는 선택지 (1. 2. 3. 4. 형태) 처리 방지
-                    if re.match(r'^\d+\.\s', line) and len(choices) >= 4:
-                        continue  # 이미 4개 선택지가 있으면 추가 숫자 선택지 무시
-                    
-                    if current_section == "question":
-                        question += " " + line
-                    elif current_section in ["choice1", "choice2", "choice3", "choice4"]:
-                        if len(choices) > 0 and len(choices) <= 4:
-                            choices[-1] += " " + line
-                    elif current_section == "answer":
-                        correct_answer += " " + line
-                    elif current_section == "explanation":
-                        explanation += " " + line
-            
-            # 선택지가 4개가 아니면 추가로 파싱 시도 (숫자 형태)
-            if len(choices) != 4:
-                print(f"⚠️ 선택지가 {len(choices)}개, 추가 파싱 시도")
-                
-                # 1. 2. 3. 4. 형태의 선택지 찾기
-                choice_pattern = r'^(\d+)\.\s+(.+)$'
-                found_choices = []
-                
-                for line in lines:
-                    line = line.strip()
-                    match = re.match(choice_pattern, line)
-                    if match and len(found_choices) < 4:
-                        choice_num = int(match.group(1))
-                        choice_text = match.group(2)
-                        if 1 <= choice_num <= 4:
-                            found_choices.append(choice_text)
-                
-                if len(found_choices) == 4:
-                    choices = found_choices
-                    print(f"✅ 숫자 형태 선택지 4개 파싱 성공")
-            
-            # 선택지를 정확히 4개로 제한
-            choices = choices[:4]  # 4개 초과시 잘라내기
-            
-            # 기본값 설정
-            if not question:
-                question = content[:500] + "..." if len(content) > 500 else content
-            if not correct_answer:
-                correct_answer = "정답을 확인해주세요."
-            if not explanation:
-                explanation = "해설을 확인해주세요."
-            if len(choices) != 4:
-                choices = ["선택지1", "선택지2", "선택지3", "선택지4"]
-            
-            print(f"🔍 최종 파싱 결과: 문제={len(question)}글자, 선택지={len(choices)}개, 정답={correct_answer}, 해설={len(explanation)}글자")
-                
-            return question.strip(), correct_answer.strip(), explanation.strip(), choices
-            
+                    yield event, value
         except Exception as e:
-            print(f"❌ 응답 파싱 오류: {e}")
-            return content[:500], "정답을 확인해주세요.", "해설을 확인해주세요.", ["선택지1", "선택지2", "선택지3", "선택지4"]
+            yield "result", {
+                "success": False,
+                "message": f"문제 생성 중 오류가 발생했습니다: {str(e)}",
+                "questions": [],
+            }
 
 # 싱글톤 인스턴스
 question_generator_service = QuestionGeneratorService() 
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+세션(userId, bookId)별로 배치 생성에서 남은 문제를 보관합니다.
+
+문제를 한 번의 LLM 호출로 여러 개 생성한 뒤 첫 문제는 바로 응답하고, 나머지는
+같은 세션의 /generating-additional-question 요청에 검색·생성 없이 차례로 돌려줍니다.
+새 /generating-question 요청이 오면 그 세션의 남은 문제는 교체됩니다.
+"""
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+class QuestionSessionCache:
+    def __init__(self, ttl_seconds: Optional[float] = None, max_sessions: Optional[int] = None):
+        self.ttl = (
+            ttl_seconds if ttl_seconds is not None else settings.question_session_ttl_seconds
+        )
+        self.max_sessions = max_sessions or settings.question_session_max_sessions
+        self._sessions: "OrderedDict[Hashable, Tuple[float, Deque[Dict[str, Any]]]]" = OrderedDict()
+
+    def put(self, session_key: Hashable, questions: List[Dict[str, Any]]) -> None:
+        self._sessions.pop(session_key, None)
+        if not questions:
+            return
+        self._sessions[session_key] = (time.monotonic() + self.ttl, deque(questions))
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def pop(self, session_key: Hashable) -> Optional[Dict[str, Any]]:
+        entry = self._sessions.get(session_key)
+        if entry is None:
+            return None
+        expires_at, questions = entry
+        if expires_at <= time.monotonic() or not questions:
+            del self._sessions[session_key]
+            return None
+        question = questions.popleft()
+        if not questions:
+            del self._sessions[session_key]
+        return question
+
+    def remaining(self, session_key: Hashable) -> int:
+        entry = self._sessions.get(session_key)
+        return len(entry[1]) if entry and entry[0] > time.monotonic() else 0
+
+
+# 싱글톤 인스턴스
+question_session_cache = QuestionSessionCache()
@@ -10,10 +10,13 @@ import os
 import time
 from typing import List, Dict, Any, Optional, Tuple
 from langchain.schema import Document
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from app.core.llm_gateway import llm_gateway
 from langchain_community.vectorstores import ElasticsearchStore
 from app.services.pdf_service import pdf_service
 from app.services.cache_service import cache_service
+from app.core.index_manager import IndexManager
+from app.core.elasticsearch_client import ElasticsearchClient
 
 # 환경 변수 로드
 load_dotenv('../.env.prod')
@@ -24,7 +27,7 @@ class RAGService:
     """RAG 공통 서비스"""
     
     def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
+        self.llm = llm_gateway.chat_model(
             model="gemini-1.5-flash",
             temperature=0.7,
             max_tokens=2000
@@ -114,12 +117,13 @@ class RAGService:
     def _setup_vector_store(self, chunks: List[Document], index_name: str = "java_learning_docs") -> bool:
         """벡터 스토어를 설정합니다."""
         try:
-            self.vector_store = ElasticsearchStore.from_documents(
-                documents=chunks,
-                embedding=self.embeddings,
-                es_url="http://elasticsearch:9200",
-                index_name=index_name
-            )
+            with IndexManager.bulk_ingestion_sync(index_name):
+                self.vector_store = ElasticsearchStore.from_documents(
+                    documents=chunks,
+                    embedding=self.embeddings,
+                    es_connection=ElasticsearchClient.get_sync_client(),
+                    index_name=index_name
+                )
             print(f"✅ Elasticsearch 벡터 스토어 설정 완료: {index_name}")
             return True
         except Exception as e:
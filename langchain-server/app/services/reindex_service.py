@@ -0,0 +1,324 @@
+"""
+learning_materials 무중단 재색인 / 재임베딩 서비스
+
+1. 새 버전 인덱스(learning_materials_vN)를 현재 설정의 매핑으로 생성
+2. 기존 인덱스를 created_at 순서로 읽으며 배치 단위로 재임베딩 후 bulk 색인
+   (초당 문서 수 제한, 진행 상황은 체크포인트 파일에 기록 → 중단 후 재개 가능)
+3. 작업 중 새로 저장/수정된 문서를 updated_at 기준으로 따라잡기(catch-up)
+   작업 중 삭제된 문서는 alias 교체 직전에 새 인덱스에서도 삭제
+4. alias를 한 번의 _aliases 요청으로 원자적으로 교체
+
+작업 중에도 검색/저장은 alias를 통해 기존 인덱스에서 그대로 처리됩니다.
+"""
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from elasticsearch.helpers import async_bulk
+
+from app.core.config import settings
+from app.core.elasticsearch_client import ElasticsearchClient
+from app.core.index_manager import IndexManager
+from app.repository.learning_material_repository import LearningMaterialRepository
+from app.utils.vector import prepare_embedding
+
+
+class ReindexService:
+    """버전 인덱스 + alias 기반 재색인 작업"""
+
+    def __init__(
+        self,
+        repo: LearningMaterialRepository,
+        batch_size: int = 100,
+        max_docs_per_second: float = 50.0,
+        reembed: bool = True,
+        checkpoint_dir: Optional[str] = None,
+    ):
+        self.repo = repo
+        self.es_client = repo.es_client
+        self.embedding_service = repo.embedding_service
+        self.alias = repo.index_name
+        self.batch_size = batch_size
+        self.max_docs_per_second = max_docs_per_second
+        self.reembed = reembed
+        self.checkpoint_dir = checkpoint_dir or settings.reindex_checkpoint_dir
+        self.checkpoint_path = os.path.join(
+            self.checkpoint_dir, f"{self.alias}_reindex.json"
+        )
+
+    # ------------------------------------------------------------------
+    # 체크포인트
+    # ------------------------------------------------------------------
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_checkpoint(self, checkpoint: Dict[str, Any]):
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def clear_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+    async def run(self, delete_old: bool = False) -> Dict[str, Any]:
+        checkpoint = self.load_checkpoint()
+        if checkpoint and checkpoint.get("phase") != "done":
+            print(
+                f"[Reindex] Resuming into {checkpoint['target_index']} "
+                f"(phase={checkpoint['phase']}, processed={checkpoint['processed']})"
+            )
+        else:
+            checkpoint = await self._start()
+
+        target = checkpoint["target_index"]
+        if checkpoint["phase"] == "copy":
+            await self._copy(checkpoint, since=None)
+            checkpoint["phase"] = "catchup"
+            self.save_checkpoint(checkpoint)
+
+        if checkpoint["phase"] == "catchup":
+            # 복사 시작 이후에 저장/수정된 문서를 다시 옮김
+            since = self._parse_time(checkpoint["started_at"]) - timedelta(minutes=1)
+            checkpoint["catchup_started_at"] = self._format_time(datetime.utcnow())
+            await self._copy(checkpoint, since=since)
+            await self._finalize_target_settings(target)
+            checkpoint["phase"] = "flip"
+            self.save_checkpoint(checkpoint)
+
+        if checkpoint["phase"] == "flip":
+            # alias 교체 직전 마지막 catch-up으로 남은 틈을 최소화
+            since = self._parse_time(checkpoint["catchup_started_at"]) - timedelta(seconds=5)
+            await self._copy(checkpoint, since=since)
+            await self._prune_deleted(checkpoint)
+            await self.es_client.indices.refresh(index=target)
+            await self._flip_alias(checkpoint["source_indices"], target)
+            checkpoint["phase"] = "done"
+            checkpoint["finished_at"] = self._format_time(datetime.utcnow())
+            self.save_checkpoint(checkpoint)
+
+        if delete_old:
+            for index in checkpoint["source_indices"]:
+                if index != target and await self.es_client.indices.exists(index=index):
+                    await self.es_client.indices.delete(index=index)
+                    print(f"[Reindex] Deleted old index {index}")
+
+        self.clear_checkpoint()
+        return checkpoint
+
+    async def _start(self) -> Dict[str, Any]:
+        source_indices = await self.repo.resolve_indices()
+        if not source_indices:
+            raise RuntimeError(f"Nothing to reindex: {self.alias} does not exist.")
+        target = await self.repo.next_versioned_index_name()
+        await self.es_client.indices.create(
+            index=target,
+            body={
+                "mappings": self.repo.index_mappings(),
+                # 색인 중에는 refresh와 replica를 꺼서 운영 검색에 주는 부하를 줄임
+                "settings": {
+                    "refresh_interval": settings.elasticsearch_bulk_refresh_interval,
+                    "number_of_replicas": 0,
+                },
+            },
+        )
+        checkpoint = {
+            "alias": self.alias,
+            "source_indices": source_indices,
+            "target_index": target,
+            "embedding_model": self.embedding_service.embedding_model,
+            "embedding_dimension": self.repo.vector_dim,
+            "reembed": self.reembed,
+            "phase": "copy",
+            "processed": 0,
+            "last_created_at": None,
+            "started_at": self._format_time(datetime.utcnow()),
+        }
+        self.save_checkpoint(checkpoint)
+        print(f"[Reindex] {source_indices} -> {target}")
+        return checkpoint
+
+    async def _copy(self, checkpoint: Dict[str, Any], since: Optional[datetime]):
+        es = self.es_client
+        source_indices = checkpoint["source_indices"]
+        target = checkpoint["target_index"]
+        cursor_key = "last_created_at" if since is None else "last_updated_at"
+        sort_field = "created_at" if since is None else "updated_at"
+        if since is not None and checkpoint.get("catchup_since") != since.isoformat():
+            checkpoint["catchup_since"] = since.isoformat()
+            checkpoint[cursor_key] = None
+
+        # 재개 시에는 마지막으로 기록된 시각부터 다시 읽음
+        # (같은 시각의 문서는 다시 처리될 수 있지만 _id가 같아 멱등)
+        lower_bounds = [value for value in (checkpoint.get(cursor_key),) if value]
+        if since is not None:
+            lower_bounds.append(self._format_time(since))
+        query: Dict[str, Any] = (
+            {"range": {sort_field: {"gte": max(lower_bounds)}}}
+            if lower_bounds
+            else {"match_all": {}}
+        )
+
+        pit = await es.open_point_in_time(index=",".join(source_indices), keep_alive="5m")
+        pit_id = pit["id"]
+        search_after = None
+        try:
+            while True:
+                body: Dict[str, Any] = {
+                    "query": query,
+                    "size": self.batch_size,
+                    "sort": [{sort_field: "asc"}, {"_shard_doc": "asc"}],
+                    "pit": {"id": pit_id, "keep_alive": "5m"},
+                }
+                if search_after:
+                    body["search_after"] = search_after
+                response = await es.search(body=body)
+                pit_id = response.get("pit_id", pit_id)
+                hits = response["hits"]["hits"]
+                if not hits:
+                    break
+
+                started = time.monotonic()
+                await self._index_batch(target, hits)
+                search_after = hits[-1]["sort"]
+                checkpoint["processed"] += len(hits)
+                checkpoint[cursor_key] = hits[-1]["_source"].get(sort_field)
+                self.save_checkpoint(checkpoint)
+                print(
+                    f"[Reindex] processed={checkpoint['processed']} "
+                    f"({sort_field} <= {checkpoint[cursor_key]})"
+                )
+                await self._throttle(len(hits), time.monotonic() - started)
+        finally:
+            try:
+                await es.close_point_in_time(body={"id": pit_id})
+            except Exception as e:
+                print(f"[Reindex] Failed to close point in time: {e}")
+
+    async def _prune_deleted(self, checkpoint: Dict[str, Any]):
+        """복사 이후 원본에서 삭제된 문서를 새 인덱스에서도 삭제합니다."""
+        es = self.es_client
+        sources = ",".join(checkpoint["source_indices"])
+        target = checkpoint["target_index"]
+        pit = await es.open_point_in_time(index=target, keep_alive="5m")
+        pit_id = pit["id"]
+        search_after = None
+        deleted = 0
+        try:
+            while True:
+                body: Dict[str, Any] = {
+                    "query": {"match_all": {}},
+                    "_source": False,
+                    "size": self.batch_size,
+                    "sort": [{"_shard_doc": "asc"}],
+                    "pit": {"id": pit_id, "keep_alive": "5m"},
+                }
+                if search_after:
+                    body["search_after"] = search_after
+                response = await es.search(body=body)
+                pit_id = response.get("pit_id", pit_id)
+                hits = response["hits"]["hits"]
+                if not hits:
+                    break
+                search_after = hits[-1]["sort"]
+
+                ids = [hit["_id"] for hit in hits]
+                existing = await es.search(
+                    index=sources,
+                    body={"query": {"ids": {"values": ids}}, "_source": False, "size": len(ids)},
+                )
+                alive = {hit["_id"] for hit in existing["hits"]["hits"]}
+                actions = [
+                    {"_op_type": "delete", "_index": target, "_id": doc_id}
+                    for doc_id in ids
+                    if doc_id not in alive
+                ]
+                if actions:
+                    await async_bulk(
+                        ElasticsearchClient.for_bulk(es), actions, raise_on_error=False
+                    )
+                    deleted += len(actions)
+        finally:
+            try:
+                await es.close_point_in_time(body={"id": pit_id})
+            except Exception as e:
+                print(f"[Reindex] Failed to close point in time: {e}")
+        if deleted:
+            print(f"[Reindex] Removed {deleted} documents deleted from the source during copy")
+
+    async def _index_batch(self, target: str, hits: List[Dict[str, Any]]):
+        docs = [hit["_source"] for hit in hits]
+        if self.reembed:
+            rows = [i for i, doc in enumerate(docs) if (doc.get("content_text") or "").strip()]
+            embeddings = await self.embedding_service.get_embeddings_batch(
+                [docs[i]["content_text"] for i in rows]
+            )
+            for i, embedding in zip(rows, embeddings):
+                docs[i]["content_embedding"] = embedding
+        else:
+            for doc in docs:
+                if doc.get("content_embedding"):
+                    doc["content_embedding"] = prepare_embedding(
+                        doc["content_embedding"],
+                        self.repo.vector_dim,
+                        settings.embedding_normalize,
+                    )
+        for doc in docs:
+            if doc.get("feedback_embedding"):
+                doc["feedback_embedding"] = prepare_embedding(
+                    doc["feedback_embedding"],
+                    self.repo.vector_dim,
+                    settings.embedding_normalize,
+                )
+        actions = [
+            {"_index": target, "_id": hit["_id"], "_source": doc}
+            for hit, doc in zip(hits, docs)
+        ]
+        await async_bulk(ElasticsearchClient.for_bulk(self.es_client), actions)
+
+    async def _throttle(self, count: int, elapsed: float):
+        if self.max_docs_per_second <= 0:
+            return
+        minimum = count / self.max_docs_per_second
+        if elapsed < minimum:
+            await asyncio.sleep(minimum - elapsed)
+
+    async def _finalize_target_settings(self, target: str):
+        await self.es_client.indices.put_settings(
+            index=target,
+            body={"index": {"number_of_replicas": settings.elasticsearch_number_of_replicas}},
+        )
+        await IndexManager.finish_bulk_ingestion(self.es_client, target)
+
+    async def _flip_alias(self, source_indices: List[str], target: str):
+        actions: List[Dict[str, Any]] = []
+        for index in source_indices:
+            if index == self.alias:
+                # alias 도입 전의 레거시 인덱스는 같은 이름의 alias를 만들 수 없으므로 삭제
+                actions.append({"remove_index": {"index": index}})
+            else:
+                actions.append({"remove": {"index": index, "alias": self.alias}})
+        actions.append(
+            {"add": {"index": target, "alias": self.alias, "is_write_index": True}}
+        )
+        await self.es_client.indices.update_aliases(body={"actions": actions})
+        print(f"[Reindex] Alias {self.alias} now points to {target}")
+
+    @staticmethod
+    def _format_time(value: datetime) -> str:
+        return value.isoformat() + "Z"
+
+    @staticmethod
+    def _parse_time(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", ""))
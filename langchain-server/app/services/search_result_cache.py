@@ -0,0 +1,120 @@
+"""
+학습 자료 검색 결과 TTL 캐시
+
+같은 (query, filters, top_k, search_type) 검색이 몇 초 간격으로 반복되어도 매번
+임베딩과 kNN 검색을 다시 합니다. 결과를 크기 제한(LRU) + TTL로 보관하고,
+같은 키의 검색이 진행 중이면 새로 검색하지 않고 그 결과를 함께 기다립니다.
+
+자료가 저장되면(save_material, bulk_save_materials) version을 올려 이전 결과를 모두
+무효화합니다. 재색인은 별도 프로세스(CLI)에서 실행되므로 alias 교체는 TTL이 지난 뒤
+반영됩니다.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+
+@dataclass
+class EndpointStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+class SearchResultCache:
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = ttl_seconds if ttl_seconds is not None else settings.search_cache_ttl_seconds
+        self.max_entries = max_entries or settings.search_cache_max_entries
+        self.version = 0
+        self._entries: "OrderedDict[Tuple[int, str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[int, str, Hashable], asyncio.Future] = {}
+        self._stats: Dict[str, EndpointStats] = {}
+
+    def bump_version(self, reason: str = "") -> None:
+        """저장/재색인 후 호출. 이전 version의 결과와 진행 중 검색은 더 이상 공유되지 않습니다."""
+        self.version += 1
+        self._entries.clear()
+        self._inflight.clear()
+        if reason:
+            print(f"[SearchResultCache] Invalidated (version {self.version}): {reason}")
+
+    async def get_or_compute(
+        self,
+        endpoint: str,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda result: True,
+    ) -> Any:
+        if not settings.search_cache_enabled:
+            return await compute()
+        stats = self._stats.setdefault(endpoint, EndpointStats())
+        version = self.version
+        cache_key = (version, endpoint, key)
+
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(cache_key)
+                stats.hits += 1
+                return result
+            del self._entries[cache_key]
+
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            stats.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # 먼저 시작한 요청이 취소된 경우에는 직접 검색
+                return await compute()
+
+        stats.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 쪽이 없으면 "exception was never retrieved" 경고가 나지 않도록 소비
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(cache_key) is future:
+                del self._inflight[cache_key]
+        future.set_result(result)
+        # 검색 도중 version이 바뀌었으면 이미 오래된 결과이므로 저장하지 않음
+        if version == self.version and cacheable(result):
+            self._entries[cache_key] = (time.monotonic() + self.ttl, result)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "endpoints": {name: stats.as_dict() for name, stats in self._stats.items()},
+        }
+
+
+# 싱글톤 인스턴스
+search_result_cache = SearchResultCache()
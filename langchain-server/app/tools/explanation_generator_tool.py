@@ -1,4 +1,4 @@
-from typing import Type, List
+from typing import AsyncIterator, Type, List
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 from app.schemas.tool_input import (
@@ -8,7 +8,8 @@ from app.schemas.tool_input import (
     LowUnderstandingAttemptSummaryTool,
 )
 from app.core.config import settings
-from langchain_google_genai import ChatGoogleGenerativeAI
+from app.utils.context_assembler import assemble_context
+from app.core.llm_gateway import CachedChatModel, llm_gateway
 
 
 class ExplanationGeneratorTool(BaseTool):
@@ -17,13 +18,13 @@ class ExplanationGeneratorTool(BaseTool):
         "주어진 학습 자료와 사용자 컨텍스트를 기반으로 설명을 생성합니다."
     )
     args_schema: Type[BaseModel] = ExplanationGeneratorToolInput
-    llm: ChatGoogleGenerativeAI = Field(exclude=True)
+    llm: CachedChatModel = Field(exclude=True)
 
-    def __init__(self, llm: ChatGoogleGenerativeAI, **kwargs):
+    def __init__(self, llm: CachedChatModel, **kwargs):
         super().__init__(llm=llm, **kwargs)
         self.llm = llm
 
-    async def _arun(
+    def _build_prompt(
         self,
         learning_materials: List[dict],
         user_info: UserInfoTool,
@@ -31,9 +32,11 @@ class ExplanationGeneratorTool(BaseTool):
         low_understanding_attempts_summary: List[LowUnderstandingAttemptSummaryTool],
         best_attempt_text: str,
     ) -> str:
-        materials_text = "\n\n".join(
-            [mat.get("content_text", "") for mat in learning_materials]
-        )
+        materials_text = assemble_context(
+            [mat.get("content_text", "") for mat in learning_materials],
+            token_budget=settings.context_token_budget_explanation,
+            name="explanation",
+        ).text
 
         summary_text = "\n".join(
             [
@@ -92,10 +95,41 @@ class ExplanationGeneratorTool(BaseTool):
             - 설명은 **짧은 단락 1~2개**로 구성하고, 최대한 **시각적 상상(비유, 물건 등)**을 유도해주세요.
             - 목표는 단순히 정답을 알려주는 것이 아니라, **오개념을 교정하고 "아하!" 하고 이해할 수 있도록 돕는 것**입니다.
          """
+        return prompt
 
+    async def _arun(
+        self,
+        learning_materials: List[dict],
+        user_info: UserInfoTool,
+        problem_info: ProblemInfoTool,
+        low_understanding_attempts_summary: List[LowUnderstandingAttemptSummaryTool],
+        best_attempt_text: str,
+    ) -> str:
+        prompt = self._build_prompt(
+            learning_materials,
+            user_info,
+            problem_info,
+            low_understanding_attempts_summary,
+            best_attempt_text,
+        )
         response = await self.llm.ainvoke(prompt)
         return response.content
 
+    async def astream_explanation(
+        self, tool_input: ExplanationGeneratorToolInput
+    ) -> AsyncIterator[str]:
+        """_arun과 같은 프롬프트로 설명을 생성하면서 토큰 조각을 바로 내보냅니다."""
+        prompt = self._build_prompt(
+            tool_input.learning_materials,
+            tool_input.user_info,
+            tool_input.problem_info,
+            tool_input.low_understanding_attempts_summary,
+            tool_input.best_attempt_text,
+        )
+        async for chunk in self.llm.astream(prompt):
+            if isinstance(chunk.content, str) and chunk.content:
+                yield chunk.content
+
     def _run(
         self,
         learning_materials: List[dict],
@@ -110,7 +144,5 @@ class ExplanationGeneratorTool(BaseTool):
 
 
 async def get_explanation_generator_tool() -> ExplanationGeneratorTool:
-    llm_instance = ChatGoogleGenerativeAI(
-        model=settings.gemini_model_name, google_api_key=settings.gemini_api_key
-    )
+    llm_instance = llm_gateway.chat_model(model=settings.gemini_model_name)
     return ExplanationGeneratorTool(llm=llm_instance)
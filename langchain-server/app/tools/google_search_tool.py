@@ -5,7 +5,7 @@ from app.schemas.tool_input import GoogleSearchToolInput
 from app.schemas.request.learning import ExternalSearchRequest
 from app.schemas.response.learning import LearningMaterialSearchResult
 from app.services.learning_service import LearningService
-from app.repository.learning_material_repository import LearningMaterialRepository
+from app.repository.factory import create_learning_material_repository
 from app.core.elasticsearch_client import ElasticsearchClient
 from app.services.embedding_service import EmbeddingService
 
@@ -30,7 +30,8 @@ class GoogleSearchTool(BaseTool):
         site_restrict = " OR ".join([f"site:{d}" for d in domains])
 
         # LearningService의 process_external_search_and_index 메서드 재사용
-        # 이 메서드는 검색, 크롤링, 정제, 난이도 태깅, 임베딩, 저장을 모두 처리합니다.
+        # 이 메서드는 검색, 크롤링, 정제, 난이도 태깅을 처리하고 청크를 바로 반환합니다.
+        # 임베딩과 저장은 백그라운드 색인 작업자(external_indexer)가 처리합니다.
         results = await self.learning_service.process_external_search_and_index(
             request=ExternalSearchRequest(
                 query=query,
@@ -55,6 +56,6 @@ async def get_google_search_tool() -> GoogleSearchTool:
     es_client = await ElasticsearchClient.get_client()
     embedding_service = EmbeddingService()
     await embedding_service.ainitialize()
-    repo = LearningMaterialRepository(es_client, embedding_service)
+    repo = create_learning_material_repository(es_client, embedding_service)
     service = LearningService(repo)
     return GoogleSearchTool(learning_service=service)
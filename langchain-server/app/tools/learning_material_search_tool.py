@@ -9,7 +9,7 @@ from app.schemas.tool_input import (
 )
 from app.schemas.response.learning import LearningMaterialSearchResult
 from app.services.learning_service import LearningService
-from app.repository.learning_material_repository import LearningMaterialRepository
+from app.repository.factory import create_learning_material_repository
 from app.core.elasticsearch_client import ElasticsearchClient
 from app.services.embedding_service import EmbeddingService
 
@@ -57,6 +57,6 @@ async def get_learning_material_search_tool() -> LearningMaterialSearchTool:
     es_client = await ElasticsearchClient.get_client()
     embedding_service = EmbeddingService()
     await embedding_service.ainitialize()
-    repo = LearningMaterialRepository(es_client, embedding_service)
+    repo = create_learning_material_repository(es_client, embedding_service)
     service = LearningService(repo)
     return LearningMaterialSearchTool(learning_service=service)
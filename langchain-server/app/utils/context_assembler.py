@@ -0,0 +1,225 @@
+"""
+프롬프트 컨텍스트 조립: 토큰 예산, 중복/겹침 제거, MMR 선택
+
+검색된 청크를 그대로 이어 붙이면 chunk_text의 100자 오버랩과 거의 같은 페이지가
+두 번씩 들어가고, 자료 수만큼 프롬프트가 끝없이 길어집니다.
+
+1. 공백을 정규화해 비교한 완전 중복 제거 (원문의 줄바꿈·코드는 그대로 유지)
+2. 이미 고른 구절의 끝과 겹치는 앞부분(오버랩) 잘라내기
+3. 문자 n-gram Jaccard가 기준 이상인 거의 같은 구절 제거
+4. MMR(관련도 - 이미 고른 구절과의 유사도)로 다양한 구절을 골라 토큰 예산까지 채움
+   (남은 예산보다 긴 구절은 버리지 않고 남은 예산만큼 잘라서 넣음)
+
+토큰 수는 토크나이저 없이 추정합니다 (ASCII 4자, 그 외 1.5자당 1토큰).
+"""
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set
+
+from app.core.config import settings
+
+SHINGLE_SIZE = 5
+MAX_OVERLAP_CHARS = 400
+MIN_OVERLAP_CHARS = 20
+# 남은 예산이 이보다 작으면 구절을 잘라 넣지 않음
+MIN_TRUNCATED_TOKENS = 32
+
+
+def estimate_tokens(text: str) -> int:
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5)
+
+
+def truncate_to_tokens(text: str, token_budget: int) -> str:
+    """추정 토큰 수가 token_budget 이하가 되도록 앞에서부터 자릅니다 (가능하면 문장/공백 경계)."""
+    used = 0.0
+    end = 0
+    for index, ch in enumerate(text):
+        used += 0.25 if ord(ch) < 128 else 1 / 1.5
+        if used > token_budget:
+            break
+        end = index + 1
+    if end >= len(text):
+        return text
+    head = text[:end]
+    for boundary in ("\n", ". ", "다. ", " "):
+        cut = head.rfind(boundary)
+        if cut >= end // 2:
+            return head[:cut + len(boundary)].rstrip()
+    return head.rstrip()
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _shingles(text: str) -> Set[str]:
+    text = text.lower()
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _overlap_length(previous: str, text: str) -> int:
+    """previous의 끝과 text의 앞이 겹치는 가장 긴 길이"""
+    limit = min(len(previous), len(text), MAX_OVERLAP_CHARS)
+    for length in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(text[:length]):
+            return length
+    return 0
+
+
+@dataclass
+class AssembledContext:
+    text: str
+    passages: List[str] = field(default_factory=list)
+    tokens_in: int = 0
+    tokens_out: int = 0
+    duplicates_removed: int = 0
+    overlaps_trimmed: int = 0
+    truncated: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_in - self.tokens_out
+
+
+@dataclass
+class ContextAssemblyStats:
+    requests: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "tokens_saved": self.tokens_in - self.tokens_out,
+            "saved_ratio": (
+                (self.tokens_in - self.tokens_out) / self.tokens_in if self.tokens_in else 0.0
+            ),
+        }
+
+
+context_assembly_stats: Dict[str, ContextAssemblyStats] = {}
+
+
+def assemble_context(
+    passages: Sequence[str],
+    token_budget: int,
+    scores: Optional[Sequence[Optional[float]]] = None,
+    separator: str = "\n\n",
+    name: str = "default",
+) -> AssembledContext:
+    """
+    Args:
+        passages: 검색 순위 순서의 구절
+        token_budget: 결과 컨텍스트의 최대 토큰 수(추정)
+        scores: 검색 점수 (없으면 순위로 관련도 계산)
+        name: 통계를 모을 이름 (프롬프트 종류)
+    """
+    tokens_in = sum(estimate_tokens(passage) for passage in passages)
+    result = AssembledContext(text="", tokens_in=tokens_in)
+
+    # 1. 완전 중복 제거 + 관련도 계산
+    seen: Set[str] = set()
+    candidates: List[Dict] = []
+    count = len(passages)
+    for rank, passage in enumerate(passages):
+        normalized = _normalize(passage or "")
+        if not normalized:
+            continue
+        if normalized in seen:
+            result.duplicates_removed += 1
+            continue
+        seen.add(normalized)
+        score = scores[rank] if scores is not None and rank < len(scores) else None
+        candidates.append(
+            {
+                "text": passage.strip(),
+                "relevance": float(score) if score is not None else 1.0 - rank / max(count, 1),
+                "shingles": _shingles(normalized),
+            }
+        )
+    if candidates:
+        top = max(candidate["relevance"] for candidate in candidates)
+        bottom = min(candidate["relevance"] for candidate in candidates)
+        for candidate in candidates:
+            candidate["relevance"] = (
+                (candidate["relevance"] - bottom) / (top - bottom) if top > bottom else 1.0
+            )
+
+    # 2~4. MMR로 하나씩 고르면서 겹침 제거와 예산 적용
+    lam = settings.context_mmr_lambda
+    threshold = settings.context_near_duplicate_threshold
+    selected: List[Dict] = []
+    used_tokens = 0
+    separator_tokens = estimate_tokens(separator)
+    while candidates:
+        best_index, best_score = -1, -math.inf
+        for index, candidate in enumerate(candidates):
+            redundancy = max(
+                (_jaccard(candidate["shingles"], chosen["shingles"]) for chosen in selected),
+                default=0.0,
+            )
+            if redundancy >= threshold:
+                candidate["duplicate"] = True
+                continue
+            score = lam * candidate["relevance"] - (1 - lam) * redundancy
+            if score > best_score:
+                best_index, best_score = index, score
+        # 거의 같은 구절은 후보에서 제거
+        kept = [candidate for candidate in candidates if not candidate.get("duplicate")]
+        result.duplicates_removed += len(candidates) - len(kept)
+        if best_index < 0:
+            break
+        candidate = candidates[best_index]
+        kept.remove(candidate)
+        candidates = kept
+
+        text = candidate["text"]
+        for chosen in selected:
+            overlap = _overlap_length(chosen["text"], text)
+            if overlap:
+                text = text[overlap:].lstrip()
+                result.overlaps_trimmed += 1
+                break
+        if not text:
+            continue
+        tokens = estimate_tokens(text) + (separator_tokens if selected else 0)
+        if used_tokens + tokens > token_budget:
+            # 예산을 넘는 구절은 남은 예산만큼 잘라서 넣음 (청크 길이에 상한이 없음)
+            remaining = token_budget - used_tokens - (separator_tokens if selected else 0)
+            if remaining < MIN_TRUNCATED_TOKENS:
+                continue
+            text = truncate_to_tokens(text, remaining)
+            if not text:
+                continue
+            tokens = estimate_tokens(text) + (separator_tokens if selected else 0)
+            result.truncated += 1
+        selected.append({**candidate, "text": text})
+        used_tokens += tokens
+
+    result.passages = [chosen["text"] for chosen in selected]
+    result.text = separator.join(result.passages)
+    result.tokens_out = estimate_tokens(result.text)
+
+    stats = context_assembly_stats.setdefault(name, ContextAssemblyStats())
+    stats.requests += 1
+    stats.tokens_in += result.tokens_in
+    stats.tokens_out += result.tokens_out
+    print(
+        f"[ContextAssembler] {name}: {len(passages)} -> {len(result.passages)} passages, "
+        f"{result.tokens_in} -> {result.tokens_out} tokens (saved {result.tokens_saved}, "
+        f"duplicates {result.duplicates_removed}, overlaps {result.overlaps_trimmed}, "
+        f"truncated {result.truncated})"
+    )
+    return result
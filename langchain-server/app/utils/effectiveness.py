@@ -0,0 +1,48 @@
+import math
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+# rank_feature는 양수만 허용하므로 최소값을 둡니다.
+MIN_EFFECTIVENESS_SCORE = 0.001
+
+# 문서 _source의 카운터로 effectiveness_score를 다시 계산하는 Painless 코드.
+# compute_effectiveness_score()와 같은 식이어야 합니다.
+EFFECTIVENESS_SCORE_PAINLESS = """
+long effAttempts = ctx._source.total_attempts_count == null ? 0 : ctx._source.total_attempts_count;
+long effSuccess = ctx._source.success_count == null ? 0 : ctx._source.success_count;
+double effAverage = ctx._source.average_understanding_score == null ? 0.0 : ctx._source.average_understanding_score;
+double effUnderstanding = (effAverage / params.score_max * effAttempts + params.prior_mean * params.prior_weight) / (effAttempts + params.prior_weight);
+ctx._source.effectiveness_score = Math.max(params.min_score, effUnderstanding * (1.0 + Math.log(1.0 + effSuccess)));
+"""
+
+
+def effectiveness_score_params() -> Dict[str, Any]:
+    return {
+        "score_max": float(settings.effectiveness_understanding_score_max),
+        "prior_mean": settings.effectiveness_prior_mean,
+        "prior_weight": float(settings.effectiveness_prior_weight),
+        "min_score": MIN_EFFECTIVENESS_SCORE,
+    }
+
+
+def compute_effectiveness_score(
+    success_count: int,
+    total_attempts_count: int,
+    average_understanding_score: Optional[float],
+) -> float:
+    """
+    이해도 평균(사전분포로 보정)과 성공 횟수(log 스케일)를 곱한 효과 점수.
+    시도가 적은 자료는 prior_mean 쪽으로 당겨져 한두 번의 높은 점수로 상위에 오르지 않습니다.
+    """
+    params = effectiveness_score_params()
+    attempts = total_attempts_count or 0
+    average = average_understanding_score or 0.0
+    understanding = (
+        average / params["score_max"] * attempts
+        + params["prior_mean"] * params["prior_weight"]
+    ) / (attempts + params["prior_weight"])
+    return max(
+        params["min_score"],
+        understanding * (1.0 + math.log(1.0 + (success_count or 0))),
+    )
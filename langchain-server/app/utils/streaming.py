@@ -0,0 +1,48 @@
+"""
+스트리밍 응답 (Server-Sent Events / NDJSON)
+
+이벤트는 {"type": ..., ...} 딕셔너리입니다. 요청의 Accept 헤더에 text/event-stream이
+있으면 SSE(`event:`/`data:` 프레임)로, 아니면 한 줄에 JSON 하나(application/x-ndjson)로
+보냅니다. Spring ChatService는 NDJSON을 줄 단위로 그대로 중계하면 됩니다.
+
+생성 중 예외는 {"type": "error"} 이벤트로 보내고 스트림을 닫습니다.
+"""
+import json
+import traceback
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+SSE_MEDIA_TYPE = "text/event-stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _sse_frame(event: Dict[str, Any]) -> str:
+    data = json.dumps(event, ensure_ascii=False)
+    return f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+
+def _ndjson_line(event: Dict[str, Any]) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+def stream_events(request: Request, events: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    use_sse = SSE_MEDIA_TYPE in request.headers.get("accept", "")
+    encode = _sse_frame if use_sse else _ndjson_line
+
+    async def body() -> AsyncIterator[str]:
+        try:
+            async for event in events:
+                yield encode(event)
+        except Exception as e:
+            print("🔥 스트리밍 중 예외 발생:", repr(e))
+            traceback.print_exc()
+            yield encode({"type": "error", "message": str(e)})
+
+    return StreamingResponse(
+        body(),
+        media_type=SSE_MEDIA_TYPE if use_sse else NDJSON_MEDIA_TYPE,
+        # 프록시(nginx 등)가 응답을 모아 두지 않도록
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,54 @@
+import math
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+SUPPORTED_EMBEDDING_DIMENSIONS = (768, 1536, 3072)
+
+
+def truncate_embedding(embedding: List[float], dimension: Optional[int]) -> List[float]:
+    """
+    Matryoshka 방식으로 학습된 임베딩의 앞쪽 dimension개 값만 남깁니다.
+    """
+    if not dimension or len(embedding) <= dimension:
+        return list(embedding)
+    return list(embedding[:dimension])
+
+
+def normalize_embedding(embedding: List[float]) -> List[float]:
+    """
+    L2 노름이 1이 되도록 정규화합니다. (dot_product 유사도 사용 시 필수)
+    """
+    norm = math.sqrt(sum(value * value for value in embedding))
+    if norm == 0.0:
+        return list(embedding)
+    return [value / norm for value in embedding]
+
+
+def prepare_embedding(
+    embedding: List[float], dimension: Optional[int], normalize: bool = True
+) -> List[float]:
+    """
+    잘라낸 뒤 정규화합니다. 잘린 벡터는 더 이상 단위 벡터가 아니므로
+    반드시 자른 다음에 정규화해야 합니다.
+    """
+    if not embedding:
+        return []
+    prepared = truncate_embedding(embedding, dimension)
+    if normalize:
+        prepared = normalize_embedding(prepared)
+    return prepared
+
+
+def dense_vector_index_options(index_type: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    dense_vector의 index_options. flat 계열(flat, int8_flat, bbq_flat 등)은 HNSW 그래프가
+    없어 m / ef_construction을 넣으면 Elasticsearch가 매핑을 거부합니다.
+    """
+    if not index_type:
+        return None
+    index_options: Dict[str, Any] = {"type": index_type}
+    if index_type != "flat" and not index_type.endswith("_flat"):
+        index_options["m"] = settings.elasticsearch_vector_hnsw_m
+        index_options["ef_construction"] = settings.elasticsearch_vector_hnsw_ef_construction
+    return index_options
@@ -0,0 +1,186 @@
+import numpy as np
+import pytest
+
+from app.repository.local_index import LocalMaterialStore
+
+DIMENSION = 8
+
+
+def _vector(seed: int) -> list:
+    return np.random.default_rng(seed).standard_normal(DIMENSION).astype(np.float32).tolist()
+
+
+def _source(seed: int, concept: str = "상속", level: str = "BEGINNER", **fields) -> dict:
+    return {
+        "concept": concept,
+        "difficulty_level": level,
+        "title": f"자료 {seed}",
+        "content_text": f"자바 상속 예제 {seed}",
+        "url": f"https://example.com/{seed}",
+        "content_embedding": _vector(seed),
+        **fields,
+    }
+
+
+def _store(tmp_path, quantization: str = "none", similarity: str = "cosine") -> LocalMaterialStore:
+    return LocalMaterialStore(str(tmp_path / "index"), DIMENSION, similarity, quantization)
+
+
+def test_empty_store(tmp_path):
+    store = _store(tmp_path)
+
+    assert len(store) == 0
+    assert store.filter_mask({"concept": "상속"}).shape == (0,)
+    assert store.vectors.scores(_vector(0)).shape == (0,)
+    assert store.bm25.score("상속", store.alive).shape == (0,)
+
+
+def test_empty_store_save_and_load(tmp_path):
+    store = _store(tmp_path)
+    store.save()
+
+    loaded = LocalMaterialStore.load_or_create(store.path, DIMENSION, "cosine")
+
+    assert len(loaded) == 0
+    assert loaded.meta["count"] == 0
+
+
+def test_upsert_replaces_existing_document(tmp_path):
+    store = _store(tmp_path)
+    store.upsert("a", _source(1))
+    store.upsert("a", _source(2, concept="다형성"))
+
+    assert len(store) == 1
+    row = store.row_of("a")
+    assert store.source(row)["concept"] == "다형성"
+    assert store.filter_mask({"concept": "상속"}).sum() == 0
+    assert store.filter_mask({"concept": "다형성"}).sum() == 1
+    np.testing.assert_allclose(store.vectors.get(row), _vector(2), rtol=1e-6)
+
+
+def test_delete_hides_document_from_filters_and_bm25(tmp_path):
+    store = _store(tmp_path)
+    store.upsert("a", _source(1))
+    store.upsert("b", _source(2))
+
+    assert store.delete("a")
+    assert not store.delete("a")
+
+    assert len(store) == 1
+    assert store.row_of("a") is None
+    assert store.filter_mask({"concept": "상속"}).tolist() == [False, True]
+    scores = store.bm25.score("상속", store.alive)
+    assert scores[0] == 0.0
+    assert scores[1] > 0.0
+
+
+def test_filters_are_and_combined_on_keyword_fields(tmp_path):
+    store = _store(tmp_path)
+    store.upsert("a", _source(1, level="BEGINNER", tags=["oop", "java"]))
+    store.upsert("b", _source(2, level="ADVANCED", tags=["java"]))
+    store.upsert("c", _source(3, concept="다형성", level="BEGINNER"))
+
+    def ids(filters):
+        return [store.id_of(row) for row in np.flatnonzero(store.filter_mask(filters))]
+
+    assert ids({"concept": "상속"}) == ["a", "b"]
+    assert ids({"concept": "상속", "difficulty_level": "BEGINNER"}) == ["a"]
+    assert ids({"tags": "java"}) == ["a", "b"]
+    assert ids({"tags": "oop", "difficulty_level": "ADVANCED"}) == []
+    # keyword 필드에 .keyword 서브필드는 없음 (ES 매핑과 동일)
+    assert ids({"concept.keyword": "상속"}) == []
+
+
+def test_filter_on_non_keyword_field_compares_source_values(tmp_path):
+    store = _store(tmp_path)
+    store.upsert("a", _source(1, language="ko"))
+    store.upsert("b", _source(2, language="en"))
+
+    assert store.filter_mask({"language": "ko"}).tolist() == [True, False]
+
+
+def test_update_source_keeps_row_and_updates_effectiveness(tmp_path):
+    store = _store(tmp_path)
+    store.upsert("a", _source(1))
+
+    assert store.update_source("a", {"success_count": 3, "effectiveness_score": 0.7})
+    assert not store.update_source("missing", {"success_count": 1})
+
+    row = store.row_of("a")
+    assert store.source(row)["success_count"] == 3
+    assert store.effectiveness[row] == pytest.approx(0.7)
+
+
+def test_int8_quantization_preserves_ranking(tmp_path):
+    exact = _store(tmp_path / "float", similarity="dot_product")
+    quantized = _store(tmp_path / "int8", quantization="int8", similarity="dot_product")
+    for seed in range(50):
+        vector = np.asarray(_vector(seed))
+        source = _source(seed, content_embedding=(vector / np.linalg.norm(vector)).tolist())
+        exact.upsert(str(seed), source)
+        quantized.upsert(str(seed), source)
+
+    assert quantized.vectors._data.dtype == np.int8
+    query = np.asarray(_vector(1000))
+    query = query / np.linalg.norm(query)
+    exact_scores = exact.vectors.scores(query)
+    quantized_scores = quantized.vectors.scores(query)
+
+    np.testing.assert_allclose(quantized_scores, exact_scores, atol=0.01)
+    assert np.argsort(-quantized_scores)[:5].tolist() == np.argsort(-exact_scores)[:5].tolist()
+    row = quantized.row_of("7")
+    np.testing.assert_allclose(
+        quantized.vectors.get(row), exact.vectors.get(exact.row_of("7")), atol=0.01
+    )
+
+
+@pytest.mark.parametrize("quantization", ["none", "int8"])
+def test_save_and_load_compacts_and_memory_maps_vectors(tmp_path, quantization):
+    store = _store(tmp_path, quantization=quantization)
+    for seed in range(5):
+        store.upsert(f"doc-{seed}", _source(seed, effectiveness_score=seed / 10))
+    store.delete("doc-2")
+    store.save()
+    assert not store.dirty
+
+    loaded = LocalMaterialStore.load_or_create(store.path, DIMENSION, "cosine", quantization)
+
+    assert isinstance(loaded.vectors._data, np.memmap)
+    assert len(loaded) == 4
+    assert loaded.row_of("doc-2") is None
+    assert [loaded.id_of(row) for row in range(loaded.size)] == [
+        "doc-0",
+        "doc-1",
+        "doc-3",
+        "doc-4",
+    ]
+    query = _vector(3)
+    np.testing.assert_allclose(
+        loaded.vectors.scores(query),
+        store.vectors.scores(query)[store.alive],
+        rtol=1e-5,
+    )
+    assert loaded.effectiveness[loaded.row_of("doc-4")] == pytest.approx(0.4)
+    assert loaded.filter_mask({"concept": "상속"}).sum() == 4
+
+
+def test_loaded_store_accepts_new_documents(tmp_path):
+    store = _store(tmp_path)
+    store.upsert("a", _source(1))
+    store.save()
+
+    loaded = LocalMaterialStore.load_or_create(store.path, DIMENSION, "cosine")
+    # memory-map은 읽기 전용이므로 추가 시 메모리로 복사해야 함
+    loaded.upsert("b", _source(2))
+
+    assert len(loaded) == 2
+    np.testing.assert_allclose(loaded.vectors.get(loaded.row_of("b")), _vector(2), rtol=1e-6)
+
+
+def test_load_rejects_mismatched_dimension(tmp_path):
+    store = _store(tmp_path)
+    store.upsert("a", _source(1))
+    store.save()
+
+    with pytest.raises(ValueError):
+        LocalMaterialStore.load_or_create(store.path, DIMENSION * 2, "cosine")
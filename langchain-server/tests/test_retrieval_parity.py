@@ -0,0 +1,100 @@
+"""
+ES 백엔드와 로컬 백엔드의 검색 결과 일치도 테스트.
+
+설정된 Elasticsearch에 연결할 수 없으면 건너뜁니다.
+"""
+import asyncio
+import random
+import statistics
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("elasticsearch")
+
+try:
+    from app.core.config import settings
+    from app.core.elasticsearch_client import ElasticsearchClient
+    from app.repository.learning_material_repository import LearningMaterialRepository
+    from app.repository.local_index import LocalMaterialStore
+    from app.repository.local_learning_material_repository import LocalLearningMaterialRepository
+    from app.scripts.check_retrieval_parity import PARITY_INDEX, load, overlap, synthetic_documents
+    from app.utils.vector import prepare_embedding
+except Exception as e:  # 설정(.env)이나 의존성이 없는 환경
+    pytest.skip(f"검색 백엔드를 불러올 수 없습니다: {e}", allow_module_level=True)
+
+DIMENSION = 16
+DOCS = 300
+QUERIES = 20
+SIZE = 5
+MIN_OVERLAP = 0.8
+
+
+async def _run_parity(tmp_path) -> dict:
+    es = await ElasticsearchClient.get_client()
+    try:
+        reachable = await es.ping()
+    except Exception:
+        reachable = False
+    if not reachable:
+        await ElasticsearchClient.close()
+        pytest.skip("Elasticsearch에 연결할 수 없습니다")
+
+    # 검색 메서드는 임베딩을 직접 받으므로 차원/모델 정보만 있으면 충분
+    embedding_service = SimpleNamespace(embedding_dimension=DIMENSION, embedding_model="parity-test")
+    es_repo = LearningMaterialRepository(es, embedding_service)
+    es_repo.index_name = PARITY_INDEX
+    local_repo = LocalLearningMaterialRepository(
+        embedding_service,
+        store=LocalMaterialStore(
+            str(tmp_path / "local_index"),
+            dimension=DIMENSION,
+            similarity=settings.elasticsearch_vector_similarity,
+            quantization=settings.local_index_quantization,
+        ),
+    )
+    results: dict = {}
+    try:
+        docs = synthetic_documents(DOCS, DIMENSION, seed=7)
+        await load(es_repo, local_repo, docs)
+
+        np_rng = np.random.default_rng(11)
+        for _, source in random.Random(11).sample(docs, QUERIES):
+            noise = np_rng.normal(0, 0.02, DIMENSION)
+            embedding = prepare_embedding(
+                (np.asarray(source["content_embedding"]) + noise).tolist(), DIMENSION
+            )
+            filters = {"difficulty_level": source["difficulty_level"]}
+            pairs = {
+                "search_by_vector_similarity": (
+                    await es_repo.search_by_vector_similarity(embedding, SIZE),
+                    await local_repo.search_by_vector_similarity(embedding, SIZE),
+                ),
+                "search_by_vector_similarity+filter": (
+                    await es_repo.search_by_vector_similarity(embedding, SIZE, filters),
+                    await local_repo.search_by_vector_similarity(embedding, SIZE, filters),
+                ),
+                "search_by_keyword": (
+                    (await es_repo.search_by_keyword(source["title"], SIZE))[0],
+                    (await local_repo.search_by_keyword(source["title"], SIZE))[0],
+                ),
+                "search_materials_by_concept": (
+                    await es_repo.search_materials_by_concept(source["concept"], SIZE),
+                    await local_repo.search_materials_by_concept(source["concept"], SIZE),
+                ),
+            }
+            for name, (es_result, local_result) in pairs.items():
+                results.setdefault(name, []).append(overlap(es_result, local_result))
+    finally:
+        if await es.indices.exists(index=PARITY_INDEX):
+            await es.indices.delete(index=PARITY_INDEX)
+        await ElasticsearchClient.close()
+    return results
+
+
+def test_local_backend_matches_elasticsearch_top_k(tmp_path):
+    results = asyncio.run(_run_parity(tmp_path))
+
+    for name, values in results.items():
+        assert statistics.mean(values) >= MIN_OVERLAP, f"{name}: {statistics.mean(values):.3f}"